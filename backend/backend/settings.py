@@ -108,6 +108,24 @@ else:
         }
     }
 
+# Cache shared by all web workers (start.sh runs several per instance), so state
+# such as prefetched interview questions is seen by whichever worker serves the
+# next request: a database table in production (created by build.sh with
+# createcachetable), process-local memory for single-process development
+if os.environ.get('DATABASE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -206,10 +224,95 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Gemini client (llm_client): default per-call timeout, retries of transient
+# errors (rate limits, unavailable, deadline) and the first retry's backoff,
+# doubled on each further retry
+LLM_TIMEOUT_SECONDS = float(os.environ.get('LLM_TIMEOUT_SECONDS', '120'))
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', '2'))
+LLM_RETRY_BACKOFF_SECONDS = float(os.environ.get('LLM_RETRY_BACKOFF_SECONDS', '1.0'))
+
 # Media files (uploaded files)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Interview recording analysis queue
+# Recordings wait here (outside MEDIA_ROOT, so they are never served) until the
+# `run_analysis_worker` process picks them up, and are deleted once analyzed.
+ANALYSIS_SCRATCH_DIR = Path(os.environ.get('ANALYSIS_SCRATCH_DIR', BASE_DIR / 'analysis_scratch'))
+ANALYSIS_JOB_MAX_ATTEMPTS = int(os.environ.get('ANALYSIS_JOB_MAX_ATTEMPTS', '3'))
+# The worker refreshes a running job's heartbeat every ANALYSIS_JOB_HEARTBEAT_SECONDS
+# for as long as the analysis takes; a job whose heartbeat is older than
+# ANALYSIS_JOB_STALE_SECONDS has lost its worker and is requeued
+ANALYSIS_JOB_HEARTBEAT_SECONDS = float(os.environ.get('ANALYSIS_JOB_HEARTBEAT_SECONDS', '30'))
+ANALYSIS_JOB_STALE_SECONDS = int(os.environ.get('ANALYSIS_JOB_STALE_SECONDS', '300'))
+# Recordings longer than this (per their container header) are rejected on upload
+ANALYSIS_MAX_RECORDING_SECONDS = int(os.environ.get('ANALYSIS_MAX_RECORDING_SECONDS', '3600'))
+# Recordings longer than the threshold are split (with ffmpeg, when installed)
+# into segments of about ANALYSIS_SEGMENT_SECONDS, analyzed a few at a time
+ANALYSIS_SEGMENT_THRESHOLD_SECONDS = int(os.environ.get('ANALYSIS_SEGMENT_THRESHOLD_SECONDS', '900'))
+ANALYSIS_SEGMENT_SECONDS = int(os.environ.get('ANALYSIS_SEGMENT_SECONDS', '600'))
+ANALYSIS_SEGMENT_CONCURRENCY = int(os.environ.get('ANALYSIS_SEGMENT_CONCURRENCY', '3'))
+# Timeout of each recording analysis call to Gemini. These calls are never
+# retried: a retry would send the whole (paid) video prompt again
+ANALYSIS_LLM_TIMEOUT_SECONDS = float(os.environ.get('ANALYSIS_LLM_TIMEOUT_SECONDS', '900'))
+# Measure pauses, talk ratio and syllable rate locally (NumPy) and give them to
+# the model as grounding, stored in the analysis as measured_speech_timing
+SPEECH_TIMING_ENABLED = os.environ.get('SPEECH_TIMING_ENABLED', 'true').lower() == 'true'
+
+# Gemini file processing poller: each pending upload is checked after the min
+# interval, then at doubling intervals up to the max, until ACTIVE or timeout
+GEMINI_FILE_POLL_MIN_SECONDS = float(os.environ.get('GEMINI_FILE_POLL_MIN_SECONDS', '0.5'))
+GEMINI_FILE_POLL_MAX_SECONDS = float(os.environ.get('GEMINI_FILE_POLL_MAX_SECONDS', '8'))
+GEMINI_FILE_PROCESSING_TIMEOUT_SECONDS = int(os.environ.get('GEMINI_FILE_PROCESSING_TIMEOUT_SECONDS', '300'))
+
+# Resume extraction cache (least recently used entries are evicted past this size)
+RESUME_CACHE_MAX_ENTRIES = int(os.environ.get('RESUME_CACHE_MAX_ENTRIES', '1000'))
+
+# Resume text extraction: uploads over RESUME_MAX_BYTES are rejected, at most
+# RESUME_MAX_PAGES pages are read, and extraction stops once it has
+# RESUME_TEXT_MAX_CHARS characters. Opening a PDF and reading a short one is
+# limited to RESUME_BATCH_TIMEOUT_SECONDS; PDFs with RESUME_PARALLEL_MIN_PAGES
+# pages or more are read in batches of RESUME_PAGES_PER_TASK pages, each with the
+# same limit. From web requests this runs on a pool of RESUME_EXTRACTION_WORKERS
+RESUME_MAX_BYTES = int(os.environ.get('RESUME_MAX_BYTES', str(10 * 1024 * 1024)))
+RESUME_MAX_PAGES = int(os.environ.get('RESUME_MAX_PAGES', '30'))
+RESUME_TEXT_MAX_CHARS = int(os.environ.get('RESUME_TEXT_MAX_CHARS', '30000'))
+RESUME_PARALLEL_MIN_PAGES = int(os.environ.get('RESUME_PARALLEL_MIN_PAGES', '8'))
+RESUME_PAGES_PER_TASK = int(os.environ.get('RESUME_PAGES_PER_TASK', '4'))
+RESUME_BATCH_TIMEOUT_SECONDS = float(os.environ.get('RESUME_BATCH_TIMEOUT_SECONDS', '10'))
+RESUME_EXTRACTION_WORKERS = int(os.environ.get('RESUME_EXTRACTION_WORKERS', '2'))
+
+# Resume fields the local rule parser scores below this confidence (0-1) are
+# re-extracted by Gemini; the rest are used as parsed, without an AI call
+RESUME_RULES_MIN_CONFIDENCE = float(os.environ.get('RESUME_RULES_MIN_CONFIDENCE', '0.6'))
+
+# Estimated tokens of resume text an extraction prompt may carry; past this the
+# least important sections lose their last lines first
+RESUME_PROMPT_TOKEN_BUDGET = int(os.environ.get('RESUME_PROMPT_TOKEN_BUDGET', '6000'))
+
+# Interview question sets: 'llm' streams them from Gemini, and positions it has not
+# filled after an error or QUESTION_LLM_TIMEOUT_SECONDS (for the whole set) come
+# from the local question bank; 'bank' always uses the bank
+QUESTION_SOURCE = os.environ.get('QUESTION_SOURCE', 'llm').lower()
+QUESTION_LLM_TIMEOUT_SECONDS = float(os.environ.get('QUESTION_LLM_TIMEOUT_SECONDS', '20'))
+
+# Progressive question sets: generate_questions returns once the first
+# QUESTION_FIRST_BATCH questions are streamed (or from the question bank after
+# QUESTION_FIRST_BATCH_TIMEOUT_SECONDS); the rest are fetched from the set
+QUESTION_FIRST_BATCH = int(os.environ.get('QUESTION_FIRST_BATCH', '2'))
+QUESTION_FIRST_BATCH_TIMEOUT_SECONDS = float(os.environ.get('QUESTION_FIRST_BATCH_TIMEOUT_SECONDS', '6'))
+
+# Threads per web process for background follow-up work (e.g. recommendations)
+BACKGROUND_TASK_WORKERS = int(os.environ.get('BACKGROUND_TASK_WORKERS', '4'))
+
+# Speculative interview questions: how long a pre-generated follow-up is kept,
+# how close the final answer must be to the partial answer it was written for,
+# and how long a request waits for one still being generated before generating
+# a fresh question (never longer than LLM_TIMEOUT_SECONDS)
+QUESTION_PREFETCH_TTL_SECONDS = int(os.environ.get('QUESTION_PREFETCH_TTL_SECONDS', '120'))
+QUESTION_PREFETCH_MATCH_RATIO = float(os.environ.get('QUESTION_PREFETCH_MATCH_RATIO', '0.85'))
+QUESTION_PREFETCH_WAIT_SECONDS = float(os.environ.get('QUESTION_PREFETCH_WAIT_SECONDS', '10'))
+
 # Cookie settings
 SESSION_COOKIE_SECURE = not DEBUG  # True in production (HTTPS)
 SESSION_COOKIE_HTTPONLY = True
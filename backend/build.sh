@@ -10,4 +10,5 @@ export PIP_ONLY_BINARY=:all:
 pip install -r requirements.txt
 
 python manage.py collectstatic --noinput
-python manage.py migrate --noinput
\ No newline at end of file
+python manage.py migrate --noinput
+python manage.py createcachetable
\ No newline at end of file
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile, ResumeData, InterviewAnalysis
+from .models import UserProfile, ResumeData, InterviewAnalysis, AnalysisJob, QuestionSet
 
 
 @admin.register(UserProfile)
@@ -30,6 +30,14 @@ class ResumeDataAdmin(admin.ModelAdmin):
         ('File Information', {
             'fields': ('file_name', 'file_url', 'uploaded_at', 'updated_at')
         }),
+        ('Candidate Digest', {
+            'fields': ('digest',),
+            'classes': ('collapse',)
+        }),
+        ('AI Recommendations', {
+            'fields': ('recommendations', 'recommendations_fingerprint'),
+            'classes': ('collapse',)
+        }),
         ('Raw Data', {
             'fields': ('raw_text',),
             'classes': ('collapse',)
@@ -63,3 +71,18 @@ class InterviewAnalysisAdmin(admin.ModelAdmin):
         }),
     )
 
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'recording_filename', 'attempts', 'created_at', 'finished_at')
+    search_fields = ('user__name', 'user__email', 'recording_filename')
+    list_filter = ('status', 'created_at')
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
+
+
+@admin.register(QuestionSet)
+class QuestionSetAdmin(admin.ModelAdmin):
+    list_display = ('id', 'uid', 'goal', 'level', 'domain', 'status', 'total', 'created_at')
+    search_fields = ('uid', 'domain')
+    list_filter = ('status', 'goal', 'level', 'created_at')
+    readonly_fields = ('created_at', 'updated_at')
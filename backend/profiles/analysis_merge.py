@@ -0,0 +1,192 @@
+"""
+Merging per-segment recording analyses back into the single analysis schema.
+
+Values are combined by type, so the merge keeps working as the prompt's JSON
+structure evolves:
+- scores and measurements ("45%", "6.2 seconds", "142 WPM") are averaged,
+  weighted by segment duration; counts in SUM_FIELDS are added up
+- ordered levels (LEVEL_FIELDS) take the duration-weighted average level
+- lists are merged round-robin across segments and deduplicated (ignoring numbers)
+- free text (emotion_trend, notes, ...) becomes a timeline, one line per segment
+"""
+import json
+import re
+
+# Numbers that are totals over the recording rather than averages
+SUM_FIELDS = {'filler_word_count'}
+
+# Ordered levels, lowest first
+LEVEL_FIELDS = {
+    'attention_level': ['low', 'moderate', 'high'],
+    'suspicion_risk': ['low', 'moderate', 'high'],
+}
+
+# "min - max" ranges: the merged range spans all segments
+RANGE_FIELDS = {'response_delay_range'}
+
+MAX_LIST_ITEMS = 8
+
+NUMBER_WITH_UNIT = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*(%|seconds|s|WPM)?\s*$', re.IGNORECASE)
+NUMBER = re.compile(r'\d+(?:\.\d+)?')
+RANGE = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*([a-z%]*)\s*-\s*(-?\d+(?:\.\d+)?)\s*([a-z%]*)\s*$', re.IGNORECASE)
+
+
+def format_timestamp(seconds):
+    """mm:ss (or h:mm:ss) for a position in the recording"""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def merge_segment_analyses(results):
+    """
+    Merge [(segment, analysis), ...] in recording order into one analysis.
+    Segments are dicts with 'start' and 'end' (seconds), as from segmenter.split.
+    """
+    weights = [max(segment['end'] - segment['start'], 0.001) for segment, _ in results]
+    labels = [f"{format_timestamp(segment['start'])}-{format_timestamp(segment['end'])}" for segment, _ in results]
+    analyses = [analysis for _, analysis in results]
+
+    merged = _merge_dicts(analyses, weights, labels)
+    merged['emotion_timeline'] = [
+        {
+            'start': segment['start'],
+            'end': segment['end'],
+            'emotion_trend': analysis.get('emotion_trend', ''),
+            'confidence_score': analysis.get('confidence_score'),
+        }
+        for segment, analysis in results
+    ]
+    merged['segments_analyzed'] = len(results)
+    return merged
+
+
+def _merge_dicts(dicts, weights, labels):
+    keys = []
+    for d in dicts:
+        keys.extend(key for key in d if key not in keys)
+
+    merged = {}
+    for key in keys:
+        present = [
+            (d[key], weight, label)
+            for d, weight, label in zip(dicts, weights, labels)
+            if d.get(key) not in (None, '', [], {})
+        ]
+        if not present:
+            merged[key] = next(d[key] for d in dicts if key in d)
+            continue
+        values, value_weights, value_labels = (list(column) for column in zip(*present))
+        merged[key] = _merge_values(key, values, value_weights, value_labels)
+    return merged
+
+
+def _merge_values(key, values, weights, labels):
+    if len(values) == 1:
+        return values[0]
+    if key in LEVEL_FIELDS:
+        return _merge_levels(values, weights, LEVEL_FIELDS[key])
+    if key in RANGE_FIELDS:
+        merged_range = _merge_ranges(values)
+        if merged_range:
+            return merged_range
+
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        if key in SUM_FIELDS:
+            return sum(values)
+        average = _weighted_average(values, weights)
+        return round(average) if all(isinstance(v, int) for v in values) else round(average, 1)
+
+    if all(isinstance(v, dict) for v in values):
+        return _merge_dicts(values, weights, labels)
+
+    if all(isinstance(v, list) for v in values):
+        return _merge_lists(values)
+
+    if all(isinstance(v, str) for v in values):
+        measured = _merge_measurements(values, weights)
+        if measured is not None:
+            return measured
+        if len(set(values)) == 1:
+            return values[0]
+        return _timeline(values, labels)
+
+    return values[0]
+
+
+def _weighted_average(values, weights):
+    return sum(v * w for v, w in zip(values, weights)) / sum(weights)
+
+
+def _merge_measurements(values, weights):
+    """Weighted average of strings like "45%", "6.2 seconds", "142 WPM" sharing one unit"""
+    matches = [NUMBER_WITH_UNIT.match(v) for v in values]
+    if not all(matches):
+        return None
+    units = {(m.group(2) or '').lower() for m in matches}
+    if len(units) != 1:
+        return None
+
+    unit = matches[0].group(2) or ''
+    average = _weighted_average([float(m.group(1)) for m in matches], weights)
+    if unit == '%':
+        return f"{round(average)}%"
+    if unit.lower() == 'wpm':
+        return f"{round(average)} {unit}"
+    if unit.lower() == 's':
+        return f"{average:.1f}s"
+    return f"{average:.1f} {unit}".strip()
+
+
+def _merge_levels(values, weights, levels):
+    ranked = [
+        (levels.index(v.strip().lower()), w)
+        for v, w in zip(values, weights)
+        if isinstance(v, str) and v.strip().lower() in levels
+    ]
+    if not ranked:
+        return values[0]
+    average = _weighted_average([rank for rank, _ in ranked], [w for _, w in ranked])
+    return levels[round(average)]
+
+
+def _merge_ranges(values):
+    lows, highs = [], []
+    unit = ''
+    for value in values:
+        match = RANGE.match(value) if isinstance(value, str) else None
+        if not match:
+            return None
+        lows.append(float(match.group(1)))
+        highs.append(float(match.group(3)))
+        unit = unit or match.group(4) or match.group(2)
+    return f"{min(lows):g}{unit} - {max(highs):g}{unit}"
+
+
+def _merge_lists(lists):
+    """Round-robin across segments so each contributes its top items, without duplicates"""
+    merged = []
+    seen = set()
+    for position in range(max(len(items) for items in lists)):
+        for items in lists:
+            if position >= len(items):
+                continue
+            item = items[position]
+            key = _item_key(item)
+            if key not in seen:
+                seen.add(key)
+                merged.append(item)
+    return merged[:MAX_LIST_ITEMS]
+
+
+def _item_key(item):
+    """Items differing only in their numbers ("eye contact (63%)" / "(71%)") count as duplicates"""
+    if isinstance(item, dict):
+        item = item.get('topic') or json.dumps(item, sort_keys=True)
+    return ' '.join(NUMBER.sub('#', str(item).lower()).split())
+
+
+def _timeline(values, labels):
+    return "\n".join(f"[{label}] {value}" for value, label in zip(values, labels))
@@ -0,0 +1,99 @@
+"""
+Pulling the audio track out of an interview recording for audio-only analysis.
+
+The speech metrics (pace, pauses, filler words, tone) only need the audio, which
+is a small fraction of a video recording. With ffmpeg installed the audio stream
+is copied out without re-encoding into a container Gemini accepts; codecs that
+don't fit one are re-encoded to low-bitrate mono AAC. Without ffmpeg the
+recording is sent as it is.
+"""
+import hashlib
+import os
+import subprocess
+import tempfile
+
+from .segmenter import FFMPEG, FFMPEG_TIMEOUT_SECONDS, is_available
+
+# Audio codec (as reported by media_probe) -> container the stream can be copied into
+COPY_FORMATS = {
+    'A_OPUS': ('ogg', '.ogg', 'audio/ogg'),
+    'A_VORBIS': ('ogg', '.ogg', 'audio/ogg'),
+    'opus': ('ogg', '.ogg', 'audio/ogg'),
+    'mp4a': ('adts', '.aac', 'audio/aac'),
+    'A_AAC': ('adts', '.aac', 'audio/aac'),
+    'A_MPEG/L3': ('mp3', '.mp3', 'audio/mp3'),
+    'mp3': ('mp3', '.mp3', 'audio/mp3'),
+}
+
+# Re-encoding fallback: speech stays intelligible at this rate
+REENCODE_FORMAT = ('adts', '.aac', 'audio/aac')
+REENCODE_BITRATE = '48k'
+
+
+class AudioExtractionError(Exception):
+    """ffmpeg could not extract the audio track"""
+
+
+def audio_codec(media_info):
+    """Codec of the first audio track in a media_probe result, or None"""
+    for track in (media_info or {}).get('tracks', []):
+        if track['type'] == 'audio':
+            return track.get('codec')
+    return None
+
+
+def needs_extraction(media_info):
+    """True if the recording carries video that can be stripped before upload"""
+    if not media_info or not media_info.get('tracks'):
+        return True  # Unknown layout: let ffmpeg find out
+    return media_info['has_video'] and media_info['has_audio']
+
+
+def extract_audio(path, output_dir, media_info=None):
+    """
+    Write the recording's first audio track to a new file in output_dir and
+    return (path, mime_type). Raises AudioExtractionError if ffmpeg is missing
+    or fails.
+    """
+    if not is_available():
+        raise AudioExtractionError("ffmpeg not installed")
+    os.makedirs(output_dir, exist_ok=True)
+
+    copy_format = COPY_FORMATS.get(audio_codec(media_info))
+    if copy_format:
+        try:
+            return _run_extraction(path, output_dir, copy_format, ['-c:a', 'copy'])
+        except AudioExtractionError as e:
+            print(f"⚠️  Could not copy audio stream ({e}), re-encoding")
+
+    return _run_extraction(
+        path, output_dir, REENCODE_FORMAT, ['-c:a', 'aac', '-b:a', REENCODE_BITRATE, '-ac', '1']
+    )
+
+
+def audio_hash(content_hash):
+    """Content key for a recording's extracted audio, for reusing its upload"""
+    if not content_hash:
+        return None
+    return hashlib.sha256(f"{content_hash}:audio".encode('utf-8')).hexdigest()
+
+
+def _run_extraction(path, output_dir, output_format, codec_args):
+    muxer, extension, mime_type = output_format
+    fd, output_path = tempfile.mkstemp(prefix='audio-', suffix=extension, dir=output_dir)
+    os.close(fd)
+
+    command = [
+        FFMPEG, '-hide_banner', '-loglevel', 'error', '-y', '-i', path,
+        '-map', '0:a:0', '-vn', *codec_args, '-f', muxer, output_path,
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=FFMPEG_TIMEOUT_SECONDS)
+    except (OSError, subprocess.SubprocessError) as e:
+        os.remove(output_path)
+        raise AudioExtractionError(str(e))
+
+    if result.returncode != 0 or os.path.getsize(output_path) == 0:
+        os.remove(output_path)
+        raise AudioExtractionError(result.stderr.strip()[-500:] or f"ffmpeg exited with {result.returncode}")
+    return output_path, mime_type
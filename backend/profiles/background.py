@@ -0,0 +1,29 @@
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+# In-process pool for short follow-up work (LLM calls whose result is persisted)
+# that should not hold up the response. Long-running work belongs in the
+# AnalysisJob queue instead.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.BACKGROUND_TASK_WORKERS,
+    thread_name_prefix='profiles-background',
+)
+
+
+def submit(fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) on the background pool and return its Future"""
+    def run():
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            print(f"❌ Background task {getattr(fn, '__name__', fn)} failed: {e}")
+            traceback.print_exc()
+            raise
+        finally:
+            # Worker threads get their own DB connections; don't leak them
+            connections.close_all()
+
+    return _executor.submit(run)
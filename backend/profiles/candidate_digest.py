@@ -0,0 +1,149 @@
+"""
+The candidate digest: a compact, prompt-ready summary of a parsed resume.
+
+It is built once when a resume is uploaded and stored on ResumeData.digest.
+The recommendation and question prompts embed its `prompt` block as it is,
+and the profile API returns it instead of the whole resume. Bump
+DIGEST_VERSION when its contents change: an older digest is rebuilt from the
+resume fields the next time it is read.
+"""
+from .models import ResumeData
+from .prompt_builder import clip, compact_list, estimate_tokens, unique_items
+from .skill_matcher import match_skills, skill_category
+
+DIGEST_VERSION = 1
+
+# Resume fields the digest is built from
+DIGEST_FIELDS = (
+    'full_name', 'years_of_experience', 'skills', 'key_strengths', 'experience',
+    'projects', 'education', 'certifications',
+)
+
+TOP_SKILLS = 15
+RECENT_ROLES = 3
+RECENT_PROJECTS = 3
+# Estimated tokens kept of each role's description
+ROLE_DESCRIPTION_TOKENS = 30
+
+
+def digest_input(resume_data):
+    """The fields of a ResumeData the digest is built from"""
+    return {field: getattr(resume_data, field) for field in DIGEST_FIELDS}
+
+
+def build_digest(resume):
+    """Digest of parsed resume data (a parse_resume result or digest_input)"""
+    years = resume.get('years_of_experience')
+    years = years if isinstance(years, (int, float)) else 0
+    skills = unique_items(resume.get('skills'))
+    projects = [project for project in resume.get('projects') or [] if isinstance(project, dict)]
+    roles = [role for role in resume.get('experience') or [] if isinstance(role, dict)]
+    education = [entry for entry in resume.get('education') or [] if isinstance(entry, dict)]
+
+    digest = {
+        'version': DIGEST_VERSION,
+        'name': resume.get('full_name'),
+        'years_of_experience': years,
+        'seniority': seniority(years),
+        'top_skills': skills[:TOP_SKILLS],
+        'skill_count': len(skills),
+        'key_strengths': (resume.get('key_strengths') or [])[:5],
+        'domains': domain_vector(skills),
+        'recent_roles': [
+            {
+                'title': role.get('title'),
+                'company': role.get('company'),
+                'duration': role.get('duration'),
+                'description': clip(role['description'], ROLE_DESCRIPTION_TOKENS) if role.get('description') else None,
+            }
+            for role in roles[:RECENT_ROLES]
+        ],
+        'recent_projects': [
+            {'name': project.get('name'), 'technologies': (project.get('technologies') or [])[:5]}
+            for project in projects[:RECENT_PROJECTS]
+        ],
+        'project_count': len(projects),
+        'education': [
+            {'degree': entry.get('degree'), 'institution': entry.get('institution'), 'year': entry.get('year')}
+            for entry in education[:2]
+        ],
+        'certifications': (resume.get('certifications') or [])[:5],
+    }
+    digest['prompt'] = _prompt_block(digest)
+    digest['prompt_tokens'] = estimate_tokens(digest['prompt'])
+    return digest
+
+
+def seniority(years):
+    """Level band for years of experience, in the recommendation prompt's terms"""
+    if years < 2:
+        return 'Entry Level'
+    if years < 5:
+        return 'Mid Level'
+    return 'Senior Level'
+
+
+def domain_vector(skills):
+    """{taxonomy category: share of the candidate's skills}, largest first"""
+    counts = {}
+    for skill in match_skills(', '.join(skills)):
+        category = skill_category(skill)
+        if category:
+            counts[category] = counts.get(category, 0) + 1
+    total = sum(counts.values())
+    return {
+        category: round(count / total, 2)
+        for category, count in sorted(counts.items(), key=lambda item: -item[1])
+    }
+
+
+def public_digest(digest):
+    """The digest without its prompt block, for API responses"""
+    return {key: value for key, value in (digest or {}).items() if key not in ('prompt', 'prompt_tokens')} or None
+
+
+def ensure_digest(resume_data):
+    """The stored digest, rebuilt and saved first if missing or from an older version"""
+    if resume_data.digest and resume_data.digest.get('version') == DIGEST_VERSION:
+        return resume_data.digest
+    digest = build_digest(digest_input(resume_data))
+    ResumeData.objects.filter(id=resume_data.id).update(digest=digest)
+    resume_data.digest = digest
+    return digest
+
+
+async def aensure_digest(resume_data):
+    """Async version of ensure_digest, for the async views"""
+    if resume_data.digest and resume_data.digest.get('version') == DIGEST_VERSION:
+        return resume_data.digest
+    digest = build_digest(digest_input(resume_data))
+    await ResumeData.objects.filter(id=resume_data.id).aupdate(digest=digest)
+    resume_data.digest = digest
+    return digest
+
+
+def _prompt_block(digest):
+    lines = [
+        f"- Name: {digest['name'] or 'N/A'}",
+        f"- Experience: {digest['years_of_experience']} years ({digest['seniority']})",
+        f"- Skills: {', '.join(digest['top_skills'])}",
+    ]
+    if digest['key_strengths']:
+        lines.append(f"- Key Strengths: {compact_list(digest['key_strengths'])}")
+    if digest['domains']:
+        lines.append("- Domains: " + ', '.join(f"{name} {share:.0%}" for name, share in digest['domains'].items()))
+    for role in digest['recent_roles']:
+        heading = ' at '.join(part for part in (role['title'], role['company']) if part)
+        when = f" ({role['duration']})" if role['duration'] else ''
+        about = f": {role['description']}" if role['description'] else ''
+        lines.append(f"- Role: {heading}{when}{about}")
+    if digest['recent_projects']:
+        lines.append("- Recent Projects: " + '; '.join(
+            project['name'] + (f" ({', '.join(project['technologies'])})" if project['technologies'] else '')
+            for project in digest['recent_projects'] if project['name']
+        ))
+    for entry in digest['education']:
+        lines.append("- Education: " + ', '.join(str(part) for part in entry.values() if part))
+    if digest['certifications']:
+        lines.append(f"- Certifications: {compact_list(digest['certifications'])}")
+    return "\n".join(lines)
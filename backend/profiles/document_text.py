@@ -0,0 +1,243 @@
+"""
+Text extraction from resume documents (PDF, DOCX) within fixed budgets.
+
+Only the first RESUME_TEXT_MAX_CHARS characters of a resume are used, so
+extraction stops once it has that much text. No more than RESUME_MAX_PAGES
+pages of a PDF are read. Every PDF parse runs under a time limit (SIGALRM), so
+a pathological document can't pin a CPU: opening the PDF and reading a short
+one is one limited task, and documents with RESUME_PARALLEL_MIN_PAGES pages or
+more are read in limited batches of pages. From a web request thread, where
+SIGALRM can't be used, these tasks run on a process pool. Page and paragraph
+texts are collected in lists and joined once at the end.
+
+Pool tasks take the document bytes and plain arguments and don't touch Django
+settings, so the worker processes never need Django configured.
+"""
+import io
+import multiprocessing
+import signal
+import threading
+import zipfile
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import PyPDF2
+import docx
+from django.conf import settings
+
+# A DOCX whose document XML unpacks to more than this many times the byte cap is refused
+DOCX_MAX_EXPANSION = 20
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class DocumentTooLarge(ValueError):
+    """The document is over the resume byte cap"""
+
+
+class _BatchTimeout(BaseException):
+    """Not an Exception: PyPDF2 catches and logs those while parsing"""
+
+
+def extract_text(data, file_name):
+    """Extract text from resume bytes based on the file type"""
+    if len(data) > settings.RESUME_MAX_BYTES:
+        raise DocumentTooLarge(f"{file_name} is {len(data)} bytes (max {settings.RESUME_MAX_BYTES})")
+
+    name = file_name.lower()
+    if name.endswith('.pdf'):
+        return extract_pdf_text(data)
+    if name.endswith(('.docx', '.doc')):
+        return extract_docx_text(data)
+    return ""
+
+
+def extract_pdf_text(data):
+    """Text of a PDF's pages, up to the page and character caps"""
+    max_chars = settings.RESUME_TEXT_MAX_CHARS
+    try:
+        page_count, texts = _run_bounded(
+            _read_pdf, data, settings.RESUME_MAX_PAGES, max_chars,
+            settings.RESUME_PARALLEL_MIN_PAGES, settings.RESUME_BATCH_TIMEOUT_SECONDS,
+        )
+        pages = min(page_count, settings.RESUME_MAX_PAGES)
+        if page_count > pages:
+            print(f"📄 PDF has {page_count} pages, reading the first {pages}")
+        if texts is None:
+            texts = _extract_pages_in_batches(data, pages, max_chars)
+    except BrokenProcessPool as e:
+        # Likely this document crashed a worker; don't retry it in this process
+        print(f"⚠️  Extraction pool failed ({e}), skipping this PDF")
+        _reset_pool()
+        return ""
+
+    return "\n".join(texts)[:max_chars]
+
+
+def extract_docx_text(data):
+    """Text of a DOCX's paragraphs, up to the character cap"""
+    max_chars = settings.RESUME_TEXT_MAX_CHARS
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            xml_size = archive.getinfo('word/document.xml').file_size
+        if xml_size > settings.RESUME_MAX_BYTES * DOCX_MAX_EXPANSION:
+            print(f"Error extracting DOCX text: document XML unpacks to {xml_size} bytes")
+            return ""
+
+        texts = []
+        length = 0
+        for paragraph in docx.Document(io.BytesIO(data)).paragraphs:
+            texts.append(paragraph.text)
+            length += len(paragraph.text) + 1
+            if length >= max_chars:
+                break
+        return ("\n".join(texts) + "\n")[:max_chars]
+    except Exception as e:
+        print(f"Error extracting DOCX text: {e}")
+        return ""
+
+
+def _read_pdf(data, max_pages, max_chars, parallel_min_pages, timeout_seconds):
+    """
+    (page count, [text, ...] of its pages up to max_pages and max_chars), or
+    (page count, None) if it has parallel_min_pages pages or more to read,
+    which are left to _extract_pages_in_batches. Bounded by timeout_seconds
+    like a batch; a PDF that can't be opened in time has no pages.
+    """
+    page_count = 0
+    texts = []
+    length = 0
+    try:
+        with _time_limit(timeout_seconds):
+            reader = PyPDF2.PdfReader(io.BytesIO(data))
+            page_count = len(reader.pages)
+            pages = min(page_count, max_pages)
+            if pages >= parallel_min_pages:
+                return page_count, None
+            for number in range(pages):
+                text = reader.pages[number].extract_text() or ""
+                texts.append(text)
+                length += len(text) + 1
+                if length >= max_chars:
+                    break
+    except _BatchTimeout:
+        print(f"⚠️  PDF took over {timeout_seconds}s to read, skipping the rest")
+    except Exception as e:
+        print(f"Error extracting PDF text: {e}")
+    return page_count, texts
+
+
+def _extract_pdf_pages(data, first, last, max_chars, timeout_seconds=None):
+    """
+    [text, ...] of pages first..last-1, stopping once max_chars are collected.
+    timeout_seconds bounds the whole batch (see _time_limit); pages read
+    before the limit are kept.
+    """
+    texts = []
+    length = 0
+    try:
+        with _time_limit(timeout_seconds):
+            reader = PyPDF2.PdfReader(io.BytesIO(data))
+            for number in range(first, last):
+                text = reader.pages[number].extract_text() or ""
+                texts.append(text)
+                length += len(text) + 1
+                if length >= max_chars:
+                    break
+    except _BatchTimeout:
+        print(f"⚠️  PDF pages {first + 1}-{last} took over {timeout_seconds}s, skipping the rest")
+    except Exception as e:
+        print(f"Error extracting PDF text: {e}")
+    return texts
+
+
+def _can_alarm():
+    """SIGALRM time limits work only on a process's main thread, where signals are delivered"""
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def _time_limit(seconds):
+    """Raise _BatchTimeout in the block after `seconds`, where _can_alarm"""
+    if not seconds or not _can_alarm():
+        yield
+        return
+    previous = signal.signal(signal.SIGALRM, _raise_batch_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _raise_batch_timeout(signum, frame):
+    raise _BatchTimeout()
+
+
+def _run_bounded(task, *args):
+    """
+    task(*args) where its time limit holds: in this process on the main thread
+    (a management command or pool worker), otherwise (a web request thread)
+    on the extraction pool
+    """
+    if _can_alarm():
+        return task(*args)
+    return _get_pool().submit(task, *args).result()
+
+
+def _extract_pages_in_batches(data, pages, max_chars):
+    """
+    Batches of pages, each under the batch time limit, collected in page order
+    until max_chars is reached. They run on the pool in parallel unless this
+    process can enforce the limit itself.
+    """
+    batch_size = settings.RESUME_PAGES_PER_TASK
+    timeout_seconds = settings.RESUME_BATCH_TIMEOUT_SECONDS
+    batches = [(first, min(first + batch_size, pages)) for first in range(0, pages, batch_size)]
+
+    futures = []
+    if _can_alarm():
+        # Lazy, so batches past max_chars are never read
+        results = (_extract_pdf_pages(data, first, last, max_chars, timeout_seconds) for first, last in batches)
+    else:
+        futures = [
+            _get_pool().submit(_extract_pdf_pages, data, first, last, max_chars, timeout_seconds)
+            for first, last in batches
+        ]
+        results = (future.result() for future in futures)
+
+    texts = []
+    length = 0
+    try:
+        for batch in results:
+            texts.extend(batch)
+            length += sum(len(text) + 1 for text in batch)
+            if length >= max_chars:
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+    return texts
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the web process is multi-threaded
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.RESUME_EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
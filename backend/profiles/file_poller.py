@@ -0,0 +1,142 @@
+"""
+One shared poller for Gemini file processing state.
+
+Uploaded recordings stay PROCESSING for a while before they can be used in a
+prompt. Instead of every analysis sleeping in its own loop, callers register the
+file here and wait on a Future. A single daemon thread checks all pending files
+each cycle, polling new uploads quickly and backing off (doubling up to a cap)
+the longer a file stays PROCESSING, and resolves the Future as soon as the file
+turns ACTIVE or FAILED.
+"""
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+import google.generativeai as genai
+from django.conf import settings
+
+
+class FileProcessingError(Exception):
+    """The uploaded file failed processing or did not become ACTIVE in time"""
+
+
+class _Pending:
+    def __init__(self, name, timeout):
+        now = time.monotonic()
+        self.name = name
+        self.future = Future()
+        self.deadline = now + timeout
+        self.interval = settings.GEMINI_FILE_POLL_MIN_SECONDS
+        self.next_check = now + self.interval
+
+
+_pending = {}  # file name -> _Pending
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_thread = None
+
+
+def wait_for_active(gemini_file, timeout=None):
+    """
+    Return a Future resolving to the ACTIVE file (as returned by genai.get_file),
+    or failing with FileProcessingError. Several callers may wait on the same file.
+    Use await_active to block on it with a deadline.
+    """
+    if gemini_file.state.name == "ACTIVE":
+        future = Future()
+        future.set_result(gemini_file)
+        return future
+    if gemini_file.state.name == "FAILED":
+        future = Future()
+        future.set_exception(FileProcessingError(f"Video processing failed: {gemini_file.state}"))
+        return future
+
+    timeout = settings.GEMINI_FILE_PROCESSING_TIMEOUT_SECONDS if timeout is None else timeout
+
+    with _lock:
+        pending = _pending.get(gemini_file.name)
+        if pending is None:
+            pending = _Pending(gemini_file.name, timeout)
+            _pending[gemini_file.name] = pending
+        _ensure_thread()
+
+    _wakeup.set()
+    return pending.future
+
+
+def await_active(gemini_file, timeout=None):
+    """
+    Block until the file is ACTIVE and return it. Raises FileProcessingError if
+    it fails, or if the poller has not resolved it shortly after the deadline.
+    """
+    timeout = settings.GEMINI_FILE_PROCESSING_TIMEOUT_SECONDS if timeout is None else timeout
+    try:
+        # One poll interval of slack past the deadline the poller enforces itself
+        return wait_for_active(gemini_file, timeout).result(timeout=timeout + settings.GEMINI_FILE_POLL_MAX_SECONDS)
+    except FutureTimeoutError:
+        raise FileProcessingError("Video processing timeout exceeded") from None
+
+
+def pending_count():
+    with _lock:
+        return len(_pending)
+
+
+def _ensure_thread():
+    global _thread
+    if _thread is None or not _thread.is_alive():
+        _thread = threading.Thread(target=_run, name='gemini-file-poller', daemon=True)
+        _thread.start()
+
+
+def _run():
+    while True:
+        with _lock:
+            # Cleared before the scan, under the lock: a file registered after
+            # this point sets the event again, so its wakeup can't be lost
+            _wakeup.clear()
+            now = time.monotonic()
+            due = [p for p in _pending.values() if p.next_check <= now]
+            next_wake = min((p.next_check for p in _pending.values()), default=None)
+
+        for pending in due:
+            _check(pending)
+
+        if due:
+            continue
+
+        # Always a bounded wait, so the thread rescans even if a wakeup is missed
+        sleep = settings.GEMINI_FILE_POLL_MAX_SECONDS
+        if next_wake is not None:
+            sleep = min(sleep, max(0.0, next_wake - time.monotonic()))
+        _wakeup.wait(sleep)
+
+
+def _check(pending):
+    try:
+        gemini_file = genai.get_file(pending.name)
+    except Exception as e:
+        # Transient lookup errors just count as another PROCESSING poll
+        print(f"⚠️  Could not check {pending.name}: {e}")
+        state = "PROCESSING"
+    else:
+        state = gemini_file.state.name
+
+    if state == "ACTIVE":
+        _finish(pending, result=gemini_file)
+    elif state == "FAILED":
+        _finish(pending, error=FileProcessingError(f"Video processing failed: {gemini_file.state}"))
+    elif time.monotonic() >= pending.deadline:
+        _finish(pending, error=FileProcessingError("Video processing timeout exceeded"))
+    else:
+        pending.interval = min(pending.interval * 2, settings.GEMINI_FILE_POLL_MAX_SECONDS)
+        pending.next_check = min(time.monotonic() + pending.interval, pending.deadline)
+
+
+def _finish(pending, result=None, error=None):
+    with _lock:
+        _pending.pop(pending.name, None)
+    if error is not None:
+        pending.future.set_exception(error)
+    else:
+        pending.future.set_result(result)
@@ -1,29 +1,18 @@
 import os
-import json
+import re
+import time
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
-from dotenv import load_dotenv
-import vertexai
-
-# Load environment variables
-load_dotenv()
-
-# Configure Gemini API
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-USE_VERTEX_AI = os.getenv('USE_VERTEX_AI', 'false').lower() == 'true'
-GCP_PROJECT_ID = os.getenv('GCP_PROJECT_ID')
-GCP_LOCATION = os.getenv('GCP_LOCATION', 'us-central1')
-
-if USE_VERTEX_AI:
-    print(f"🔵 Using Vertex AI (Project: {GCP_PROJECT_ID}, Location: {GCP_LOCATION})")
-    try:
-
-        vertexai.init(project=GCP_PROJECT_ID, location=GCP_LOCATION)
-    except ImportError:
-        print("❌ vertexai package not installed. Run: pip install google-cloud-aiplatform")
-        USE_VERTEX_AI = False
-elif GEMINI_API_KEY:
-    print(f"🔑 Using Gemini API Key")
-    genai.configure(api_key=GEMINI_API_KEY)
+from django.conf import settings
+from django.db import connections
+from .llm_client import (
+    GEMINI_API_KEY, USE_VERTEX_AI, GCP_PROJECT_ID, GCP_LOCATION, VERTEX_UPLOAD_BUCKET, VERTEX_INLINE_MAX_BYTES,
+    is_configured, generate_text, generate_json, agenerate_json, stream_json,
+)
+from . import analysis_merge, schemas, audio_extract, file_poller, prompt_builder, remote_files, segmenter, speech_timing
+from .models import RemoteRecordingFile
 
 
 def extract_name_from_resume(resume_text):
@@ -32,13 +21,11 @@ def extract_name_from_resume(resume_text):
     Handles various resume formats accurately.
     """
     # Check if API key is configured
-    if not GEMINI_API_KEY or GEMINI_API_KEY == 'your_gemini_api_key_here':
+    if not is_configured():
         print("Gemini API key not configured, skipping AI extraction")
         return None
         
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
         prompt = f"""
 Extract ONLY the candidate's full name from this resume. 
 
@@ -50,12 +37,11 @@ RULES:
 - Return the name in proper case (Capital Letters)
 
 Resume text:
-{resume_text[:3000]}
+{prompt_builder.compact_resume(resume_text, prompt_builder.NAME_TOKEN_BUDGET)}
 
 Candidate's Full Name:"""
 
-        response = model.generate_content(prompt)
-        name = response.text.strip()
+        name = generate_text(prompt)
         
         # Clean up the response
         name = name.replace('Full Name:', '').strip()
@@ -68,43 +54,29 @@ Candidate's Full Name:"""
         return None
 
 
-def get_interview_recommendations(resume_data):
-    """
-    Use Gemini to analyze resume data and recommend:
-    1. Goal (Full Technical Interview / Focused Practice / Quick Mock)
-    2. Target Level (Entry/Mid/Senior)
-    3. Domain/Field
-    """
-    # Check if API key is configured
-    if not GEMINI_API_KEY or GEMINI_API_KEY == 'your_gemini_api_key_here':
-        print("Gemini API key not configured, returning defaults")
-        return {
-            "goal": "Focused Practice",
-            "target_level": "Entry Level",
-            "domain": "Software Development",
-            "reasoning": {
-                "goal_reason": "API key not configured",
-                "level_reason": "API key not configured",
-                "domain_reason": "API key not configured"
-            }
+def default_recommendations(reason):
+    """Recommendations used when Gemini is unavailable"""
+    return {
+        "goal": "Focused Practice",
+        "target_level": "Entry Level",
+        "domain": "Software Development",
+        "reasoning": {
+            "goal_reason": reason,
+            "level_reason": reason,
+            "domain_reason": reason
         }
-        
-    try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        # Prepare resume summary
-        resume_summary = f"""
+    }
+
+
+def build_recommendation_prompt(digest):
+    """Prompt asking Gemini for goal, level and domain recommendations for a candidate digest"""
+    # Prepare resume summary
+    resume_summary = f"""
 Resume Data:
-- Name: {resume_data.get('full_name', 'N/A')}
-- Email: {resume_data.get('email', 'N/A')}
-- Skills: {', '.join(resume_data.get('skills', [])[:20])}
-- Experience: {json.dumps(resume_data.get('experience', [])[:3], indent=2)}
-- Education: {json.dumps(resume_data.get('education', []), indent=2)}
-- Projects: {json.dumps(resume_data.get('projects', [])[:2], indent=2)}
-- Certifications: {', '.join(resume_data.get('certifications', [])[:5])}
+{digest['prompt']}
 """
 
-        prompt = f"""
+    prompt = f"""
 You are an expert career counselor and technical recruiter. Analyze the following resume data and provide recommendations.
 
 {resume_summary}
@@ -136,137 +108,173 @@ RULES:
 3. For "domain":
    - Identify the PRIMARY technical domain based on skills and experience
    - Use standard industry terms
-
-Return ONLY the JSON object, no other text.
 """
+    return prompt
 
-        response = model.generate_content(prompt)
-        result_text = response.text.strip()
-        
-        # Extract JSON from response (remove markdown if present)
-        if '```json' in result_text:
-            result_text = result_text.split('```json')[1].split('```')[0].strip()
-        elif '```' in result_text:
-            result_text = result_text.split('```')[1].split('```')[0].strip()
-        
-        recommendations = json.loads(result_text)
-        return recommendations
-        
-    except Exception as e:
-        print(f"Error getting recommendations with Gemini: {e}")
-        # Return default recommendations
-        return {
-            "goal": "Focused Practice",
-            "target_level": "Entry Level",
-            "domain": "Software Development",
-            "reasoning": {
-                "goal_reason": "Default recommendation",
-                "level_reason": "Default recommendation",
-                "domain_reason": "Default recommendation"
-            }
-        }
 
+def generate_interview_recommendations(digest):
+    """
+    Use Gemini to analyze resume data and recommend:
+    1. Goal (Full Technical Interview / Focused Practice / Quick Mock)
+    2. Target Level (Entry/Mid/Senior)
+    3. Domain/Field
+    
+    Raises on API or parsing errors; see get_interview_recommendations for the
+    variant that falls back to defaults.
+    """
+    return generate_json(build_recommendation_prompt(digest), schemas.RECOMMENDATIONS)
+
+
+async def agenerate_interview_recommendations(digest):
+    """Async version of generate_interview_recommendations"""
+    return await agenerate_json(build_recommendation_prompt(digest), schemas.RECOMMENDATIONS)
 
-def extract_all_resume_data(resume_text, email=None):
+
+def get_interview_recommendations(digest):
     """
-    Use Gemini AI to extract ALL information from resume in one comprehensive call.
-    Returns complete structured data ready for database storage.
+    Recommend goal, target level and domain for a candidate digest, falling back to
+    default recommendations if Gemini is not configured or fails.
     """
     # Check if API key is configured
-    if not GEMINI_API_KEY or GEMINI_API_KEY == 'your_gemini_api_key_here':
-        print("Gemini API key not configured, using fallback extraction")
-        return None
+    if not is_configured():
+        print("Gemini API key not configured, returning defaults")
+        return default_recommendations("API key not configured")
         
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        prompt = f"""
-You are an expert resume parser. Extract ALL information from this resume and return as valid JSON.
+        return generate_interview_recommendations(digest)
+    except Exception as e:
+        print(f"Error getting recommendations with Gemini: {e}")
+        # Return default recommendations
+        return default_recommendations("Default recommendation")
 
-CRITICAL: Return ONLY valid JSON. No markdown, no explanation, no code blocks.
 
-Extract the following:
+# Bump whenever the extraction prompt or model changes, so cached results are not reused
+RESUME_EXTRACTION_PROMPT_VERSION = '3'
 
-{{
-  "full_name": "candidate's full name (First Last format)",
-  "email": "email address from resume or '{email}'",
-  "phone": "phone number",
-  "location": "city, country",
-  "linkedin": "LinkedIn URL if present",
-  "github": "GitHub URL if present", 
-  "website": "personal website URL if present",
-  
-  "summary": "professional summary or objective (2-3 sentences describing their career goals/profile)",
-  "years_of_experience": 0,
-  
-  "skills": ["skill1", "skill2", "skill3"],
-  
-  "education": [
-    {{
+# Extraction prompt pieces per resume field: (JSON template, rule or None).
+# '{email}' is replaced with the email found in the resume text.
+RESUME_FIELD_PROMPTS = {
+    'full_name': (
+        '"full_name": "candidate\'s full name (First Last format)"',
+        "full_name: Extract the person's actual name, NOT job titles or skills",
+    ),
+    'email': (
+        '"email": "email address from resume or \'{email}\'"',
+        "If email is in resume, use it; otherwise use '{email}'",
+    ),
+    'phone': ('"phone": "phone number"', None),
+    'location': ('"location": "city, country"', None),
+    'linkedin': ('"linkedin": "LinkedIn URL if present"', None),
+    'github': ('"github": "GitHub URL if present"', None),
+    'website': ('"website": "personal website URL if present"', None),
+    'summary': (
+        '"summary": "professional summary or objective (2-3 sentences describing their career goals/profile)"',
+        "summary: Write a professional 2-3 sentence summary if not explicitly stated",
+    ),
+    'years_of_experience': (
+        '"years_of_experience": 0',
+        "years_of_experience: Calculate based on work history (0 if student/fresher)",
+    ),
+    'skills': (
+        '"skills": ["skill1", "skill2", "skill3"]',
+        "skills: List ALL technical skills, tools, languages, frameworks",
+    ),
+    'education': (
+        """"education": [
+    {
       "degree": "full degree name (e.g., Bachelor of Technology in Computer Science)",
       "institution": "university/college name",
       "year": "graduation year or expected year"
-    }}
-  ],
-  
-  "experience": [
-    {{
+    }
+  ]""",
+        "education: Include ALL degrees (high school, bachelor's, master's, etc.)",
+    ),
+    'experience': (
+        """"experience": [
+    {
       "title": "job title or position",
       "company": "company/organization name",
       "duration": "time period (e.g., Jan 2023 - Present)",
       "description": "key responsibilities and achievements"
-    }}
-  ],
-  
-  "projects": [
-    {{
+    }
+  ]""",
+        "experience: Include internships, jobs, volunteer work, leadership roles",
+    ),
+    'projects': (
+        """"projects": [
+    {
       "name": "project name",
       "description": "what the project does and your role",
       "technologies": ["tech1", "tech2"]
-    }}
-  ],
-  
-  "certifications": ["certification name 1", "certification name 2"],
-  
-  "languages": ["English", "Hindi"],
-  
-  "key_strengths": ["strength 1", "strength 2", "strength 3"]
+    }
+  ]""",
+        "projects: Include academic, personal, and professional projects",
+    ),
+    'certifications': (
+        '"certifications": ["certification name 1", "certification name 2"]',
+        "certifications: Include courses, certificates, online courses",
+    ),
+    'languages': ('"languages": ["English", "Hindi"]', "languages: Spoken/written languages"),
+    'key_strengths': (
+        '"key_strengths": ["strength 1", "strength 2", "strength 3"]',
+        "key_strengths: Top 3-5 technical/professional strengths",
+    ),
+}
+
+
+def resume_extraction_prompt(resume_text, email=None, fields=None):
+    """
+    The extraction prompt for all resume fields, or only for `fields`, with the
+    resume text compacted into RESUME_PROMPT_TOKEN_BUDGET estimated tokens
+    (the sections those fields come from packed first)
+    """
+    fields = list(fields or RESUME_FIELD_PROMPTS)
+    templates = ",\n  ".join(RESUME_FIELD_PROMPTS[field][0] for field in fields)
+    rules = "\n".join(f"- {RESUME_FIELD_PROMPTS[field][1]}" for field in fields if RESUME_FIELD_PROMPTS[field][1])
+    task = (
+        "Extract ALL information from this resume as JSON." if len(fields) == len(RESUME_FIELD_PROMPTS)
+        else "Extract ONLY the following fields from this resume (or the resume sections below) as JSON."
+    )
+
+    instructions = f"""
+You are an expert resume parser. {task}
+
+Extract the following:
+
+{{
+  {templates}
 }}
 
 RULES:
-- full_name: Extract the person's actual name, NOT job titles or skills
-- If email is in resume, use it; otherwise use '{email}'
-- summary: Write a professional 2-3 sentence summary if not explicitly stated
-- years_of_experience: Calculate based on work history (0 if student/fresher)
-- skills: List ALL technical skills, tools, languages, frameworks
-- education: Include ALL degrees (high school, bachelor's, master's, etc.)
-- experience: Include internships, jobs, volunteer work, leadership roles
-- projects: Include academic, personal, and professional projects
-- certifications: Include courses, certificates, online courses
-- languages: Spoken/written languages
-- key_strengths: Top 3-5 technical/professional strengths
-
-Resume Text:
-{resume_text}
-
-Return ONLY the JSON object:"""
-
-        response = model.generate_content(prompt)
-        result_text = response.text.strip()
-        
-        # Clean up response
-        if '```json' in result_text:
-            result_text = result_text.split('```json')[1].split('```')[0].strip()
-        elif '```' in result_text:
-            result_text = result_text.split('```')[1].split('```')[0].strip()
-        
-        # Remove any leading/trailing text
-        start_idx = result_text.find('{')
-        end_idx = result_text.rfind('}') + 1
-        if start_idx != -1 and end_idx > start_idx:
-            result_text = result_text[start_idx:end_idx]
+{rules}
+""".replace('{email}', str(email))
+    priority = prompt_builder.priority_for_fields(fields) if fields else prompt_builder.SECTION_PRIORITY
+    compacted = prompt_builder.compact_resume(resume_text, settings.RESUME_PROMPT_TOKEN_BUDGET, priority)
+    print(
+        f"✂️  Resume text for the prompt: ~{prompt_builder.estimate_tokens(resume_text)} → "
+        f"~{prompt_builder.estimate_tokens(compacted)} tokens"
+    )
+    return f"{instructions}\nResume Text:\n{compacted}"
+
+
+def extract_all_resume_data(resume_text, email=None, fields=None):
+    """
+    Use Gemini AI to extract ALL information from resume in one comprehensive call,
+    or only the given fields (the ones the local rule engine could not read).
+    Returns structured data ready for database storage.
+    """
+    # Check if API key is configured
+    if not is_configured():
+        print("Gemini API key not configured, using fallback extraction")
+        return None
         
-        extracted_data = json.loads(result_text)
+    try:
+        prompt = resume_extraction_prompt(resume_text, email, fields)
+        extracted_data = generate_json(prompt, schemas.resume_data_task(fields))
+        if fields:
+            print(f"✅ AI extracted {len(fields)} fields: {', '.join(fields)}")
+            return extracted_data
+
         print(f"✅ AI extracted name: {extracted_data.get('full_name')}")
         print(f"✅ AI extracted {len(extracted_data.get('skills', []))} skills")
         print(f"✅ AI extracted {len(extracted_data.get('education', []))} education entries")
@@ -281,142 +289,197 @@ Return ONLY the JSON object:"""
         return None
 
 
-def analyze_interview_recording(video_file, participant_count=1):
+def gemini_recording_file(recording_path, mime_type, content_hash=None):
     """
-    Analyze interview recording using Gemini 2.0 Flash (API Key or Vertex AI)
-    Based on working Streamlit implementation
+    Return an ACTIVE Gemini file for the recording. An identical recording
+    uploaded earlier is reused while Gemini still has it, skipping both the
+    upload and the processing wait; otherwise the file is uploaded, awaited and
+    remembered for next time.
     """
-    print("\n" + "="*80)
-    print("🎬 STARTING INTERVIEW ANALYSIS")
-    print("="*80)
+    remote = remote_files.lookup(content_hash, RemoteRecordingFile.BACKEND_GEMINI)
+    if remote:
+        try:
+            gemini_file = genai.get_file(remote.remote_name)
+        except Exception as e:
+            print(f"⚠️  Cached Gemini file {remote.remote_name} unavailable: {e}")
+            gemini_file = None
+
+        if gemini_file is not None and gemini_file.state.name != "FAILED":
+            print(f"♻️  Reusing uploaded file {gemini_file.name} ({gemini_file.state.name})")
+            return file_poller.await_active(gemini_file)
+        remote_files.forget(remote)
+
+    print(f"\n📤 UPLOADING TO GEMINI API...")
+    gemini_file = genai.upload_file(
+        recording_path, 
+        mime_type=mime_type
+    )
+    print(f"✅ File uploaded successfully!")
+    print(f"   - URI: {gemini_file.uri}")
+    print(f"   - Name: {gemini_file.name}")
+    print(f"   - State: {gemini_file.state.name}")
     
-    # Check if either Vertex AI or API key is configured
-    if USE_VERTEX_AI:
-        if not GCP_PROJECT_ID:
-            print("❌ FATAL: GCP_PROJECT_ID not configured for Vertex AI")
-            return {
-                "error": "GCP_PROJECT_ID not configured. Please set it in .env file."
-            }
-        print(f"✅ Using Vertex AI: {GCP_PROJECT_ID} ({GCP_LOCATION})")
-    elif not GEMINI_API_KEY or GEMINI_API_KEY == 'your_gemini_api_key_here':
-        print("❌ FATAL: Neither Vertex AI nor Gemini API key configured")
-        return {
-            "error": "API not configured. Set either USE_VERTEX_AI=true with GCP_PROJECT_ID, or GEMINI_API_KEY."
-        }
-    else:
-        print(f"✅ Using API Key: {GEMINI_API_KEY[:20]}...")
+    # Step 3: Wait for processing (API Key only)
+    print(f"\n⏳ WAITING FOR VIDEO PROCESSING...")
+    started = time.monotonic()
+    gemini_file = file_poller.await_active(gemini_file)
+    print(f"   ⏱️  Processed in {time.monotonic() - started:.1f}s")
     
-    try:
-        # Initialize variables
-        gemini_file = None
-        video_part = None
-        
-        # Step 1: Save uploaded file temporarily
-        print(f"📁 Video file info:")
-        print(f"   - Name: {video_file.name}")
-        print(f"   - Size: {video_file.size} bytes ({video_file.size / 1024 / 1024:.2f} MB)")
-        print(f"   - Content Type: {video_file.content_type}")
-        
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as tmp_file:
-            for chunk in video_file.chunks():
-                tmp_file.write(chunk)
-            temp_path = tmp_file.name
-        
-        print(f"✅ Saved to temporary file: {temp_path}")
-        
-        # Step 2: Upload file (different method for Vertex AI vs API Key)
-        if USE_VERTEX_AI:
-            print(f"\n📤 UPLOADING TO VERTEX AI...")
-            from vertexai.generative_models import Part
-            
-            # For Vertex AI, we upload directly to GCS or use local file
-            video_part = Part.from_data(
-                data=open(temp_path, 'rb').read(),
-                mime_type=video_file.content_type or 'video/webm'
-            )
-            print(f"✅ Video loaded for Vertex AI!")
-            
-        else:
-            print(f"\n📤 UPLOADING TO GEMINI API...")
-            gemini_file = genai.upload_file(
-                temp_path, 
-                mime_type=video_file.content_type or 'video/webm'
-            )
-            print(f"✅ File uploaded successfully!")
-            print(f"   - URI: {gemini_file.uri}")
-            print(f"   - Name: {gemini_file.name}")
-            print(f"   - State: {gemini_file.state.name}")
-            
-            # Step 3: Wait for processing (API Key only)
-            print(f"\n⏳ WAITING FOR VIDEO PROCESSING...")
-            import time
-            max_wait = 300  # 5 minutes
-            wait_time = 0
-            
-            while gemini_file.state.name == "PROCESSING":
-                print(f"   ⏱️  Still processing... ({wait_time}s elapsed)")
-                time.sleep(5)
-                wait_time += 5
-                gemini_file = genai.get_file(gemini_file.name)
-                
-                if wait_time > max_wait:
-                    raise Exception("Video processing timeout (5 minutes exceeded)")
-            
-            if gemini_file.state.name == "FAILED":
-                raise Exception(f"Video processing failed: {gemini_file.state}")
-            
-            print(f"✅ Video processing complete!")
-        
-        # Step 4: Generate analysis
-        print(f"\n🤖 GENERATING AI ANALYSIS...")
-        
-        if USE_VERTEX_AI:
-            from vertexai.generative_models import GenerativeModel
-            model = GenerativeModel('gemini-2.5-flash')
-        else:
-            model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        prompt = """
+    print(f"✅ Video processing complete!")
+    
+    remote_files.store(
+        content_hash, RemoteRecordingFile.BACKEND_GEMINI, gemini_file.name,
+        mime_type=mime_type, expires_at=gemini_file.expiration_time,
+    )
+    return gemini_file
+
+
+def vertex_video_part(recording_path, mime_type, content_hash=None):
+    """
+    Build the Vertex AI Part for a recording without loading large files into
+    memory: stream it to VERTEX_UPLOAD_BUCKET and reference it by URI, or send
+    it inline only when it is small enough (VERTEX_INLINE_MAX_BYTES).
+    Recordings already in the bucket (same content hash) are not uploaded again.
+    """
+    from vertexai.generative_models import Part
+
+    size = os.path.getsize(recording_path)
+
+    if VERTEX_UPLOAD_BUCKET:
+        from google.cloud import storage
+
+        client = storage.Client(project=GCP_PROJECT_ID)
+
+        remote = remote_files.lookup(content_hash, RemoteRecordingFile.BACKEND_VERTEX)
+        if remote:
+            if storage.Blob.from_string(remote.remote_name, client=client).exists():
+                print(f"♻️  Reusing uploaded recording {remote.remote_name}")
+                return Part.from_uri(remote.remote_name, mime_type=remote.mime_type or mime_type)
+            remote_files.forget(remote)
+
+        blob_name = f"interview-recordings/{os.path.basename(recording_path)}"
+        blob = client.bucket(VERTEX_UPLOAD_BUCKET).blob(
+            blob_name, chunk_size=8 * 1024 * 1024  # Resumable upload, 8 MB at a time
+        )
+        blob.upload_from_filename(recording_path, content_type=mime_type)
+        uri = f"gs://{VERTEX_UPLOAD_BUCKET}/{blob_name}"
+        print(f"✅ Uploaded to {uri}")
+        remote_files.store(content_hash, RemoteRecordingFile.BACKEND_VERTEX, uri, mime_type=mime_type)
+        return Part.from_uri(uri, mime_type=mime_type)
+
+    if size > VERTEX_INLINE_MAX_BYTES:
+        raise Exception(
+            f"Recording is {size / 1024 / 1024:.1f} MB, over the {VERTEX_INLINE_MAX_BYTES / 1024 / 1024:.0f} MB "
+            f"inline limit. Set VERTEX_UPLOAD_BUCKET to analyze large recordings with Vertex AI."
+        )
+
+    with open(recording_path, 'rb') as fh:
+        return Part.from_data(data=fh.read(), mime_type=mime_type)
+
+
+ANALYSIS_PROMPT_HEADER = """
 Analyze this interview recording with EXTREME ACCURACY. Detect subtle behavioral cues and provide honest, evidence-based assessment.
 
 **CRITICAL: BE BRUTALLY HONEST** - If the candidate shows nervousness, hesitation, or poor performance, REPORT IT ACCURATELY. Do not inflate scores.
+"""
 
-**OUTPUT FORMAT:** Return ONLY valid JSON (no markdown, no code blocks).
+# The JSON shape itself is enforced by each section's response schema
+ANALYSIS_PROMPT_FOOTER = """
+Fill EVERY field of the JSON structure."""
 
-**DETAILED ANALYSIS REQUIREMENTS:**
+PERFORMANCE_PROMPT = ANALYSIS_PROMPT_HEADER + """
+Assess ONLY the candidate's delivery: timing, pace, confidence and communication.
 
-1. **Eye Movement Analysis** (BE ACCURATE)
-   - Calculate actual percentage of direct eye contact vs looking away
-   - Detect: avoiding camera, looking down (reading/nervousness), looking around (distraction)
-   - Low eye contact = Low confidence. Report it honestly.
-   - Format: "Direct: 45%, Thinking: 20%, Reading/Avoidance: 30%, Distraction: 5%"
+**DETAILED ANALYSIS REQUIREMENTS:**
 
-2. **Response Delay & Timing** (DETECT HESITATION)
+1. **Response Delay & Timing** (DETECT HESITATION)
    - Measure actual pause length before speaking
    - Long pauses (>5s) = hesitation/uncertainty
    - Frequent "um", "uh" = lack of preparation
    - Rushed speech after long pause = nervousness
    - Be specific: "Average 6.2s delay indicating significant hesitation"
 
-3. **Speaking Pace Analysis** (DETECT NERVOUSNESS)
+2. **Speaking Pace Analysis** (DETECT NERVOUSNESS)
    - Fast pace (>180 WPM) = nervousness/rushing
    - Slow pace (<100 WPM) = uncertainty/lack of knowledge
    - Uneven pace = nervousness
    - Count every "um", "uh", "like", "you know", "basically"
    - 10+ filler words = poor communication
 
-4. **Confidence & Nervousness Detection** (BE HONEST)
+3. **Confidence & Nervousness Detection** (BE HONEST)
    - Confidence Score:
      * 0-40: Very nervous, lacking confidence
      * 41-60: Moderate nervousness, some hesitation
      * 61-80: Generally confident with minor nerves
      * 81-100: Highly confident and composed
-   - Detect: fidgeting, hand trembling, voice shaking, avoiding eye contact
-   - Detect: clearing throat, sighing, nervous laughter
+   - Detect: voice shaking, clearing throat, sighing, nervous laughter
    - Report actual emotional state, not what you think they want to hear
 
-5. **Cheating/Integrity Indicators** (CRITICAL DETECTION)
+4. **Communication Quality** (BE CRITICAL)
+   - Clarity: mumbling, trailing off, incomplete sentences = poor
+   - Structure: rambling, losing track, no clear point = poor
+   - Vocabulary: repetitive words, basic language, searching for words = weak
+   - Examples: vague generalities instead of specific examples = unprepared
+
+**JSON STRUCTURE (ALL FIELDS REQUIRED):**
+
+{
+  "response_delay_average": "6.2 seconds",
+  "response_delay_range": "2s - 15s",
+  "response_pattern": "Long hesitation before answers. Several pauses exceeded 10 seconds showing uncertainty.",
+  "response_timing": "Average 6.2s delay with maximum 15s pause at 02:34 during technical question. Indicates significant hesitation.",
+  
+  "speaking_pace_wpm": "142 WPM",
+  "speaking_pace": "Uneven pace: rushed during simple answers (180 WPM), slow during complex questions (100 WPM). Suggests nervousness.",
+  "filler_words": "Frequent: 18 total - 'um' (12x), 'uh' (4x), 'like' (2x). Indicates lack of preparation.",
+  "filler_word_count": 18,
+  
+  "confidence_score": 42,
+  "confidence_breakdown": {
+    "introduction": 38,
+    "technical_questions": 35,
+    "problem_solving": 45,
+    "behavioral_round": 50
+  },
+  "emotion_trend": "Started nervous (38%), remained anxious through technical section (35%), slight improvement in later sections but never fully comfortable.",
+  "voice_tone_analysis": "Shaky and uncertain. Voice trembling detected during complex questions. Frequent throat clearing.",
+  "communication_analysis": "Unclear articulation. Rambling responses lacking structure. Struggled to provide specific examples. 18 filler words indicate poor preparation.",
+  
+  "strengths": [
+    "Attempted to answer all questions despite difficulty",
+    "Showed basic understanding of fundamental concepts",
+    "Maintained presence throughout despite visible nervousness"
+  ],
+  
+  "improvements": [
+    "Practice answering questions out loud to reduce filler words (18 instances is very high)",
+    "Prepare specific examples beforehand - answers were too vague and generalized",
+    "Slow down and structure responses - current pace is uneven and rushed"
+  ]
+}
+
+**CRITICAL RULES:**
+1. BE HONEST - If performance is poor, say so with evidence
+2. LOW SCORES for hesitation and nervousness
+3. COUNT every filler word accurately
+4. MEASURE actual pauses and delays
+5. NO INFLATION - Report actual performance, not what you hope to see
+6. Use SPECIFIC numbers and percentages from actual observation
+7. If truly confident performance, score high. If nervous/hesitant, score low (40-60 range)
+""" + ANALYSIS_PROMPT_FOOTER
+
+INTEGRITY_PROMPT = ANALYSIS_PROMPT_HEADER + """
+Assess ONLY eye movement, body language and integrity indicators.
+
+**DETAILED ANALYSIS REQUIREMENTS:**
+
+1. **Eye Movement Analysis** (BE ACCURATE)
+   - Calculate actual percentage of direct eye contact vs looking away
+   - Detect: avoiding camera, looking down (reading/nervousness), looking around (distraction)
+   - Low eye contact = Low confidence. Report it honestly.
+   - Format: "Direct: 45%, Thinking: 20%, Reading/Avoidance: 30%, Distraction: 5%"
+
+2. **Cheating/Integrity Indicators** (CRITICAL DETECTION)
    - Reading from screen: prolonged downward gaze (>3s continuously)
    - Looking off-screen: checking notes, getting help
    - Unnatural pauses: waiting for someone to feed answers
@@ -429,18 +492,12 @@ Analyze this interview recording with EXTREME ACCURACY. Detect subtle behavioral
      * Audio anomalies = +15 points
      * Fluency inconsistencies = +10 points
 
-6. **Body Language** (DETECT DISCOMFORT)
+3. **Body Language** (DETECT DISCOMFORT)
    - Fidgeting: touching face, adjusting clothing, playing with hands
    - Posture: slouching, leaning away = low confidence
    - Facial expressions: forced smiles, frowning, blank stares
    - Head movements: excessive nodding, shaking, looking down
 
-7. **Communication Quality** (BE CRITICAL)
-   - Clarity: mumbling, trailing off, incomplete sentences = poor
-   - Structure: rambling, losing track, no clear point = poor
-   - Vocabulary: repetitive words, basic language, searching for words = weak
-   - Examples: vague generalities instead of specific examples = unprepared
-
 **JSON STRUCTURE (ALL FIELDS REQUIRED):**
 
 {
@@ -452,16 +509,8 @@ Analyze this interview recording with EXTREME ACCURACY. Detect subtle behavioral
     "distraction": "5%"
   },
   "gaze_behavior": "Frequent looking down (30%) suggests reading or nervousness. Limited direct eye contact (45%) indicates discomfort with camera.",
-  
-  "response_delay_average": "6.2 seconds",
-  "response_delay_range": "2s - 15s",
-  "response_pattern": "Long hesitation before answers. Several pauses exceeded 10 seconds showing uncertainty.",
-  "response_timing": "Average 6.2s delay with maximum 15s pause at 02:34 during technical question. Indicates significant hesitation.",
-  
-  "speaking_pace_wpm": "142 WPM",
-  "speaking_pace": "Uneven pace: rushed during simple answers (180 WPM), slow during complex questions (100 WPM). Suggests nervousness.",
-  "filler_words": "Frequent: 18 total - 'um' (12x), 'uh' (4x), 'like' (2x). Indicates lack of preparation.",
-  "filler_word_count": 18,
+  "eye_movement_pattern": "45% direct, 20% thinking, 30% reading/down, 5% distraction. Low direct contact indicates nervousness.",
+  "attention_level": "moderate",
   
   "cheating_risk_score": 35,
   "suspicion_risk": "moderate",
@@ -480,35 +529,22 @@ Analyze this interview recording with EXTREME ACCURACY. Detect subtle behavioral
     "fidgeting_level": "High - frequent hand movements, face touching",
     "hand_gestures": "Minimal - kept hands out of frame",
     "facial_expressions": "Tense, forced smiles, frowning during difficult questions"
-  },
-  
-  "confidence_score": 42,
-  "confidence_breakdown": {
-    "introduction": 38,
-    "technical_questions": 35,
-    "problem_solving": 45,
-    "behavioral_round": 50
-  },
-  "emotion_trend": "Started nervous (38%), remained anxious through technical section (35%), slight improvement in later sections but never fully comfortable.",
-  "voice_tone_analysis": "Shaky and uncertain. Voice trembling detected during complex questions. Frequent throat clearing.",
-  
-  "attention_level": "moderate",
-  "eye_movement_pattern": "45% direct, 20% thinking, 30% reading/down, 5% distraction. Low direct contact indicates nervousness.",
-  "communication_analysis": "Unclear articulation. Rambling responses lacking structure. Struggled to provide specific examples. 18 filler words indicate poor preparation.",
-  
-  "strengths": [
-    "Attempted to answer all questions despite difficulty",
-    "Showed basic understanding of fundamental concepts",
-    "Maintained presence throughout despite visible nervousness"
-  ],
-  
-  "improvements": [
-    "Practice answering questions out loud to reduce filler words (18 instances is very high)",
-    "Work on maintaining eye contact - 45% is below average, suggests nervousness",
-    "Prepare specific examples beforehand - answers were too vague and generalized",
-    "Slow down and structure responses - current pace is uneven and rushed"
-  ],
-  
+  }
+}
+
+**CRITICAL RULES:**
+1. BE HONEST - report what you observe, with evidence and timestamps
+2. HIGH RISK SCORES for suspicious behavior, LOW for natural behavior
+3. DETECT subtle behavioral cues: fidgeting, avoiding camera, reading
+4. Use SPECIFIC numbers and percentages from actual observation
+""" + ANALYSIS_PROMPT_FOOTER
+
+TECHNICAL_PROMPT = ANALYSIS_PROMPT_HEADER + """
+Assess ONLY the technical content of the candidate's answers: accuracy, depth and gaps.
+
+**JSON STRUCTURE (ALL FIELDS REQUIRED):**
+
+{
   "technical_analysis": "Based on interview responses and technical questions asked",
   "technical_accuracy": "Provided basic correct information but lacked depth. Missed key concepts in data structures explanation. Used incorrect terminology for algorithms (45% accuracy).",
   "technical_accuracy_score": 45,
@@ -548,77 +584,310 @@ Analyze this interview recording with EXTREME ACCURACY. Detect subtle behavioral
 }
 
 **CRITICAL RULES:**
-1. BE HONEST - If performance is poor, say so with evidence
-2. LOW SCORES for hesitation, nervousness, poor eye contact
-3. HIGH RISK SCORES for suspicious behavior
-4. COUNT every filler word accurately
-5. MEASURE actual pauses and delays
-6. DETECT subtle behavioral cues: fidgeting, voice trembling, avoiding camera
-7. NO INFLATION - Report actual performance, not what you hope to see
-8. Every field MUST be filled - no skipping
-9. Use SPECIFIC numbers and percentages from actual observation
-10. If truly confident performance, score high. If nervous/hesitant, score low (40-60 range)
-
-**OUTPUT FORMAT RULES:**
-- Return ONLY valid JSON - no markdown, no code blocks, no explanations
-- NO trailing commas in objects or arrays
-- ALL keys must be in "double quotes"
-- NO comments (//, /* */)
-- Ensure all braces {{ }} and brackets [ ] are properly closed
-
-Return ONLY the complete JSON object with ALL fields filled."""
+1. BE HONEST - judge correctness against what was actually said
+2. NO INFLATION - a vague answer is not an accurate one
+3. Base missing_concepts and tips on gaps that showed up in the answers
+""" + ANALYSIS_PROMPT_FOOTER
+
+# Independent prompts run in parallel against the same uploaded recording;
+# their JSON objects are merged into one analysis
+ANALYSIS_SECTIONS = {
+    'performance': PERFORMANCE_PROMPT,
+    'integrity': INTEGRITY_PROMPT,
+    'technical': TECHNICAL_PROMPT,
+}
+ANALYSIS_SECTION_TASKS = {
+    'performance': schemas.PERFORMANCE_ANALYSIS,
+    'integrity': schemas.INTEGRITY_ANALYSIS,
+    'technical': schemas.TECHNICAL_ANALYSIS,
+}
+SECTIONS_BY_MODE = {
+    'full': ['performance', 'integrity', 'technical'],
+    'audio': ['performance', 'technical'],
+}
+# Sections that get the measured speech timing as grounding
+TIMING_SECTIONS = {'performance', 'integrity'}
+
+AUDIO_PROMPT_PREFIX = """This is an AUDIO-ONLY interview recording. Assess only what can be heard, and do not comment on eye contact, body language or anything else that needs video.
+"""
+
+# Fields that need the video; filled with placeholders in audio-only analyses
+AUDIO_ONLY_PLACEHOLDERS = {
+    'eye_movement_pattern': 'Not assessed (audio-only analysis)',
+    'attention_level': '',
+    'suspicion_risk': '',
+    'integrity_notes': 'Not assessed (audio-only analysis). Request a full analysis for integrity and eye-movement indicators.',
+}
+
+
+# Measurement instructions made redundant by measured speech timing
+MEASURED_TIMING_SECTION = re.compile(r'\n\d+\. \*\*Response Delay & Timing\*\*.*?(?=\n\d+\. \*\*)', re.DOTALL)
+
+
+def ground_prompt(prompt, timing_metrics):
+    """
+    Put locally measured speech timing in front of the prompt, dropping the
+    instructions that asked the model to measure pauses itself
+    """
+    grounding = speech_timing.grounding_text(timing_metrics)
+    if not grounding:
+        return prompt
+    return grounding + MEASURED_TIMING_SECTION.sub('', prompt, count=1)
+
+
+def analysis_prompts(analysis_mode='full', timing_metrics=None, prefix=''):
+    """
+    {section: prompt} for the sections an analysis mode needs, with the audio
+    note, the given prefix (e.g. the segment position) and measured timing
+    grounding applied
+    """
+    if analysis_mode == 'audio':
+        prefix = prefix + AUDIO_PROMPT_PREFIX
+    prompts = {}
+    for section in SECTIONS_BY_MODE[analysis_mode]:
+        prompt = ANALYSIS_SECTIONS[section]
+        if section in TIMING_SECTIONS:
+            prompt = ground_prompt(prompt, timing_metrics)
+        prompts[section] = prefix + prompt
+    return prompts
+
+
+def analyze_recording_file(recording_path, mime_type, content_hash=None, prompts=None, on_field=None):
+    """
+    Upload (or reuse) one recording file, run the section prompts ({section:
+    prompt}, default: all of ANALYSIS_SECTIONS) against it in parallel and
+    return the merged analysis JSON. Sections that fail are listed in
+    'failed_sections' instead of failing the analysis; raises if all fail.
+
+    With on_field, responses are streamed and on_field(key, value) is called
+    (from the section's thread) as each top-level field arrives.
+    """
+    prompts = prompts or dict(ANALYSIS_SECTIONS)
+    
+    # Initialize variables
+    gemini_file = None
+    video_part = None
+    
+    # Step 1: Recording is already on disk (analysis scratch directory)
+    print(f"📁 Video file info:")
+    print(f"   - Path: {recording_path}")
+    size = os.path.getsize(recording_path)
+    print(f"   - Size: {size} bytes ({size / 1024 / 1024:.2f} MB)")
+    print(f"   - Content Type: {mime_type}")
+    
+    # Step 2: Upload file (different method for Vertex AI vs API Key)
+    if USE_VERTEX_AI:
+        print(f"\n📤 UPLOADING TO VERTEX AI...")
+        video_part = vertex_video_part(recording_path, mime_type, content_hash)
+        print(f"✅ Video loaded for Vertex AI!")
+    
+    else:
+        # Step 3 (waiting for processing) happens inside, API Key only
+        gemini_file = gemini_recording_file(recording_path, mime_type, content_hash)
+    
+    # Step 4: Generate analysis, one request per section against the same file
+    print(f"\n🤖 GENERATING AI ANALYSIS ({', '.join(prompts)})...")
+    
+    def analyze_section(section, prompt):
+        started = time.monotonic()
+        task = ANALYSIS_SECTION_TASKS[section]
+        # Send prompt with video (different for Vertex AI vs API Key);
+        # JSON mode returns the section's schema, validated on parse (Step 5)
+        contents = [video_part, prompt] if USE_VERTEX_AI else [prompt, gemini_file]
+        try:
+            # One bounded attempt: a retry would send the whole video prompt again
+            call_options = {
+                'use_vertex': USE_VERTEX_AI,
+                'timeout': settings.ANALYSIS_LLM_TIMEOUT_SECONDS,
+                'max_retries': 0,
+            }
+            if on_field:
+                section_data = stream_json(contents, task, on_field, **call_options)
+            else:
+                section_data = generate_json(contents, task, **call_options)
+        finally:
+            # on_field may have written to the database from this pool thread
+            connections.close_all()
+        print(f"✅ {section} analysis generated in {time.monotonic() - started:.1f}s ({len(section_data)} fields)")
+        return section_data
+    
+    with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+        futures = {section: executor.submit(analyze_section, section, prompt) for section, prompt in prompts.items()}
+    
+    analysis_data = {}
+    failed_sections = []
+    for section, future in futures.items():
+        try:
+            analysis_data.update(future.result())
+        except Exception as e:
+            print(f"❌ {section} analysis failed: {e}")
+            failed_sections.append(section)
+    
+    if len(failed_sections) == len(prompts):
+        raise Exception(f"All analysis sections failed ({', '.join(failed_sections)})")
+    if failed_sections:
+        analysis_data['failed_sections'] = failed_sections
+    return analysis_data
+
+
+SEGMENT_PROMPT_PREFIX = """This clip is segment {index} of {count} of a longer interview recording, covering {start} to {end} of the full interview.
+Analyze only what happens in this clip, and give any timestamps relative to the start of the clip.
+"""
+
+
+def analyze_in_segments(recording_path, mime_type, duration_seconds, content_hash=None,
+                        analysis_mode='full', timing=None):
+    """
+    Map-reduce analysis of a long recording: split it at silences (cutting on
+    keyframes), analyze up to ANALYSIS_SEGMENT_CONCURRENCY segments at a time
+    and merge the per-segment results. A failed segment is left out of the
+    merge instead of failing the whole analysis. With a SpeechTiming (timing),
+    each segment's prompts are grounded with that segment's measured timing.
+    """
+    segment_dir = tempfile.mkdtemp(prefix='segments-', dir=settings.ANALYSIS_SCRATCH_DIR)
+    try:
+        segments = segmenter.split(recording_path, duration_seconds, segment_dir)
+        print(f"✂️  Split into {len(segments)} segments")
+
+        def analyze_segment(segment):
+            prefix = SEGMENT_PROMPT_PREFIX.format(
+                index=segment['index'] + 1,
+                count=len(segments),
+                start=analysis_merge.format_timestamp(segment['start']),
+                end=analysis_merge.format_timestamp(segment['end']),
+            )
+            timing_metrics = timing.metrics(segment['start'], segment['end'], relative=True) if timing else None
+            try:
+                return analyze_recording_file(
+                    segment['path'], mime_type, segmenter.segment_hash(content_hash, segment),
+                    analysis_prompts(analysis_mode, timing_metrics, prefix),
+                )
+            finally:
+                # Pool threads get their own DB connections (remote file cache)
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=settings.ANALYSIS_SEGMENT_CONCURRENCY) as executor:
+            futures = [(segment, executor.submit(analyze_segment, segment)) for segment in segments]
+
+        results = []
+        for segment, future in futures:
+            try:
+                results.append((segment, future.result()))
+            except Exception as e:
+                print(f"❌ Segment {segment['index'] + 1} failed: {e}")
+
+        if not results:
+            raise Exception("All recording segments failed to analyze")
+
+        print(f"🧩 Merging {len(results)}/{len(segments)} segment analyses")
+        return analysis_merge.merge_segment_analyses(results)
+    finally:
+        shutil.rmtree(segment_dir, ignore_errors=True)
+
+
+def analyze_interview_recording(recording_path, content_type=None, participant_count=1, content_hash=None,
+                                duration_seconds=None, analysis_mode='full', media_info=None, on_field=None):
+    """
+    Analyze interview recording using Gemini 2.0 Flash (API Key or Vertex AI)
+    Based on working Streamlit implementation
+
+    The recording is read in place from recording_path; the caller owns the file
+    and is responsible for removing it. content_hash (SHA-256 of the recording)
+    lets an earlier upload of the same content be reused. Recordings longer than
+    ANALYSIS_SEGMENT_THRESHOLD_SECONDS (duration_seconds) are analyzed in segments.
+
+    The recording is uploaded once and the performance, integrity and technical
+    prompts run against it in parallel (see analyze_recording_file); a failed
+    section leaves its fields out rather than failing the analysis.
+
+    analysis_mode 'audio' analyzes only the audio track (extracted with ffmpeg
+    when the recording has video) with the performance and technical prompts,
+    leaving the integrity and eye-movement fields unassessed.
+
+    With SPEECH_TIMING_ENABLED, pauses, talk ratio and syllable rate are first
+    measured locally (speech_timing), given to the model as grounding and stored
+    in the result as measured_speech_timing.
+
+    on_field(key, value) is called with each analysis field as soon as the
+    model has produced it (recordings analyzed in one piece only), so partial
+    results can be shown while the rest is still generating.
+
+    Local processing steps that could not run (speech timing, audio extraction,
+    segmentation, e.g. without ffmpeg) are listed in the result as
+    skipped_features, {feature: reason}, so the client can tell the user.
+    """
+    print("\n" + "="*80)
+    print("🎬 STARTING INTERVIEW ANALYSIS")
+    print("="*80)
+    
+    # Check if either Vertex AI or API key is configured
+    if USE_VERTEX_AI:
+        if not GCP_PROJECT_ID:
+            print("❌ FATAL: GCP_PROJECT_ID not configured for Vertex AI")
+            return {
+                "error": "GCP_PROJECT_ID not configured. Please set it in .env file."
+            }
+        print(f"✅ Using Vertex AI: {GCP_PROJECT_ID} ({GCP_LOCATION})")
+    elif not is_configured():
+        print("❌ FATAL: Neither Vertex AI nor Gemini API key configured")
+        return {
+            "error": "API not configured. Set either USE_VERTEX_AI=true with GCP_PROJECT_ID, or GEMINI_API_KEY."
+        }
+    else:
+        print(f"✅ Using API Key: {GEMINI_API_KEY[:20]}...")
+    
+    audio_path = None
+    skipped_features = {}
+    try:
+        mime_type = content_type or 'video/webm'
         
-        # Send prompt with video (different for Vertex AI vs API Key)
-        if USE_VERTEX_AI:
-            response = model.generate_content([video_part, prompt])
-        else:
-            response = model.generate_content([prompt, gemini_file])
-            
-        print(f"✅ AI analysis generated!")
-        print(f"\n📄 RAW RESPONSE (first 500 chars):")
-        print(response.text[:500] + "..." if len(response.text) > 500 else response.text)
+        timing = speech_timing.analyze(recording_path, media_info) if settings.SPEECH_TIMING_ENABLED else None
+        if settings.SPEECH_TIMING_ENABLED and timing is None:
+            skipped_features['speech_timing'] = (
+                speech_timing.unavailable_reason(media_info) or "audio could not be decoded"
+            )
+        timing_metrics = timing.metrics() if timing else None
+        if timing_metrics and on_field:
+            on_field('measured_speech_timing', timing_metrics)
         
-        # Step 5: Parse JSON response
-        print(f"\n🔧 PARSING JSON...")
-        import json
-        import re
+        if analysis_mode == 'audio':
+            if audio_extract.needs_extraction(media_info):
+                try:
+                    audio_path, mime_type = audio_extract.extract_audio(
+                        recording_path, settings.ANALYSIS_SCRATCH_DIR, media_info
+                    )
+                    print(f"🎧 Extracted audio track: {os.path.getsize(audio_path) / 1024 / 1024:.2f} MB "
+                          f"(recording {os.path.getsize(recording_path) / 1024 / 1024:.2f} MB)")
+                    recording_path = audio_path
+                    content_hash = audio_extract.audio_hash(content_hash)
+                except audio_extract.AudioExtractionError as e:
+                    print(f"⚠️  Could not extract audio ({e}), sending the full recording")
+                    skipped_features['audio_extraction'] = str(e)
         
-        # Clean response text
-        response_text = response.text.strip()
+        analysis_data = None
+        if segmenter.should_segment(duration_seconds):
+            try:
+                analysis_data = analyze_in_segments(
+                    recording_path, mime_type, duration_seconds, content_hash, analysis_mode, timing
+                )
+            except segmenter.SegmentationError as e:
+                print(f"⚠️  Could not split recording ({e}), analyzing it in one piece")
+                skipped_features['segmentation'] = str(e)
         
-        # Remove markdown code blocks if present
-        response_text = re.sub(r'^```json\s*', '', response_text)
-        response_text = re.sub(r'^```\s*', '', response_text)
-        response_text = re.sub(r'\s*```$', '', response_text)
+        if analysis_data is None:
+            analysis_data = analyze_recording_file(
+                recording_path, mime_type, content_hash, analysis_prompts(analysis_mode, timing_metrics), on_field
+            )
         
-        # Extract JSON
-        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-        if json_match:
-            json_text = json_match.group()
-            
-            # Additional cleaning for common AI JSON errors
-            # Remove trailing commas before closing braces/brackets
-            json_text = re.sub(r',(\s*[}\]])', r'\1', json_text)
-            # Remove comments (// or /* */)
-            json_text = re.sub(r'//.*?$', '', json_text, flags=re.MULTILINE)
-            json_text = re.sub(r'/\*.*?\*/', '', json_text, flags=re.DOTALL)
-            
-            try:
-                analysis_data = json.loads(json_text)
-                print(f"✅ JSON parsed successfully!")
-                print(f"   - Emotion Trend: {analysis_data.get('emotion_trend', 'N/A')[:50]}...")
-                print(f"   - Confidence Score: {analysis_data.get('confidence_score', 'N/A')}")
-                print(f"   - Attention Level: {analysis_data.get('attention_level', 'N/A')}")
-                print(f"   - Suspicion Risk: {analysis_data.get('suspicion_risk', 'N/A')}")
-            except json.JSONDecodeError as e:
-                print(f"❌ JSON parsing failed: {e}")
-                print(f"📄 Cleaned JSON (first 1000 chars):")
-                print(json_text[:1000])
-                raise Exception(f"Invalid JSON from Gemini: {e}")
-        else:
-            print("❌ Could not extract JSON from response")
-            print(f"Response text: {response_text[:200]}")
-            raise Exception("Could not extract JSON from Gemini response")
+        if timing_metrics:
+            analysis_data['measured_speech_timing'] = timing_metrics
+        if skipped_features:
+            analysis_data['skipped_features'] = skipped_features
+        
+        if analysis_mode == 'audio':
+            for field, placeholder in AUDIO_ONLY_PLACEHOLDERS.items():
+                analysis_data.setdefault(field, placeholder)
+        analysis_data['analysis_mode'] = analysis_mode
         
         # Step 6: Add ranking data
         analysis_data['ranking_position'] = 1
@@ -640,14 +909,6 @@ Return ONLY the complete JSON object with ALL fields filled."""
         
         analysis_data['percentile_band'] = percentile_band
         
-        # Step 7: Clean up temporary file
-        import os
-        try:
-            os.remove(temp_path)
-            print(f"🗑️  Cleaned up temp file: {temp_path}")
-        except:
-            pass
-        
         print("\n" + "="*80)
         print("✅ ANALYSIS COMPLETE - REAL AI DATA (Streamlit Method)")
         print("="*80 + "\n")
@@ -665,6 +926,13 @@ Return ONLY the complete JSON object with ALL fields filled."""
         print("="*80 + "\n")
         
         return generate_mock_analysis(participant_count)
+    
+    finally:
+        if audio_path:
+            try:
+                os.remove(audio_path)
+            except OSError:
+                pass
 
 
 def generate_mock_analysis(participant_count):
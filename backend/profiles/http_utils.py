@@ -0,0 +1,37 @@
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def parse_json_body(request):
+    """
+    Request payload for plain (non-DRF) views: the JSON body, or the form fields
+    for form-encoded posts. Mirrors what DRF's request.data gives the sync views.
+    Raises ValueError for a malformed JSON body; callers answer it with a 400.
+    """
+    if request.content_type == 'application/json':
+        return json.loads(request.body or b'{}')
+    return request.POST.dict()
+
+
+def blocking_view(view):
+    """
+    Serve a sync view from the event loop's thread pool instead of the one
+    thread Django runs every sync view on under ASGI. Without this, a resume
+    upload or a recording hash blocks every other sync request on the worker.
+    Each pool thread keeps its own DB connection, which is expired here the way
+    request_started/request_finished do for the request thread.
+    """
+    def run(request, *args, **kwargs):
+        close_old_connections()
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            close_old_connections()
+
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        return await sync_to_async(run, thread_sensitive=False)(request, *args, **kwargs)
+    return wrapped
@@ -1,132 +1,255 @@
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
-from django.views.decorators.csrf import csrf_exempt
-from .interview_ai import generate_interview_question, analyze_answer, generate_round_transition, generate_final_message
 import json
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from .interview_ai import (
+    agenerate_interview_question, astream_interview_question, aanalyze_answer, agenerate_round_transition,
+    agenerate_final_message,
+)
+from .http_utils import parse_json_body
+from . import question_prefetch
+
+# These views are native async: each one awaits the Gemini round trip instead of
+# holding a worker thread, so one ASGI worker can serve many interview turns at once.
+
+
+def format_history(conversation_history):
+    """Format conversation history for the prompt"""
+    return "\n".join([
+        f"{'AI' if msg['type'] == 'ai' else 'Candidate'}: {msg['message']}"
+        for msg in conversation_history[-10:]  # Last 10 messages for context
+    ])
+
+
+def sse_event(event, data):
+    """Frame one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
 @csrf_exempt
-def generate_question(request):
+@require_POST
+async def generate_question(request):
     """
     Generate dynamic interview question using Gemini AI
     """
     try:
-        data = request.data
+        try:
+            data = parse_json_body(request)
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
         conversation_history = data.get('conversation_history', [])
         user_profile = data.get('user_profile', {})
         current_round = data.get('current_round', 'Technical')
         previous_answer = data.get('previous_answer', None)
-        
-        # Format conversation history
-        history_text = "\n".join([
-            f"{'AI' if msg['type'] == 'ai' else 'Candidate'}: {msg['message']}"
-            for msg in conversation_history[-10:]  # Last 10 messages for context
-        ])
-        
-        question = generate_interview_question(
-            history_text,
-            user_profile,
-            current_round,
-            previous_answer
-        )
-        
-        return Response({
+
+        session_id = data.get('session_id')
+
+        history_text = format_history(conversation_history)
+
+        question = None
+        if previous_answer:
+            question = await question_prefetch.atake(session_id, history_text, current_round, previous_answer)
+        prefetched = question is not None
+
+        if not prefetched:
+            question = await agenerate_interview_question(
+                history_text,
+                user_profile,
+                current_round,
+                previous_answer
+            )
+
+        return JsonResponse({
             'success': True,
             'question': question,
-            'round': current_round
+            'round': current_round,
+            'prefetched': prefetched
         })
-        
+
     except Exception as e:
-        return Response({
+        return JsonResponse({
             'success': False,
             'error': str(e),
             'question': 'Can you tell me about a challenging project you worked on?'
         }, status=500)
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
 @csrf_exempt
-def analyze_response(request):
+@require_POST
+async def generate_question_stream(request):
+    """
+    Stream the next interview question over Server-Sent Events.
+    Sends `token` events ({"text": ...}) as Gemini produces them, then a final
+    `question` event with the same payload generate_question returns.
+    """
+    try:
+        data = parse_json_body(request)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
+
+    conversation_history = data.get('conversation_history', [])
+    user_profile = data.get('user_profile', {})
+    current_round = data.get('current_round', 'Technical')
+    previous_answer = data.get('previous_answer', None)
+    session_id = data.get('session_id')
+    history_text = format_history(conversation_history)
+
+    async def events():
+        parts = []
+        try:
+            question = None
+            if previous_answer:
+                question = await question_prefetch.atake(session_id, history_text, current_round, previous_answer)
+
+            if question is not None:
+                # Already generated while the candidate was answering
+                parts.append(question)
+                yield sse_event('token', {'text': question})
+            else:
+                async for chunk in astream_interview_question(
+                    history_text,
+                    user_profile,
+                    current_round,
+                    previous_answer
+                ):
+                    parts.append(chunk)
+                    yield sse_event('token', {'text': chunk})
+
+            yield sse_event('question', {
+                'success': True,
+                'question': ''.join(parts).strip(),
+                'round': current_round,
+                'prefetched': question is not None
+            })
+        except Exception as e:
+            yield sse_event('question', {
+                'success': False,
+                'error': str(e),
+                'question': ''.join(parts).strip() or 'Can you tell me about a challenging project you worked on?',
+                'round': current_round
+            })
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let proxies buffer the stream
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def prefetch_question(request):
+    """
+    Start generating the follow-up to the candidate's answer so far, while they
+    are still answering. Returns immediately; the question is picked up by
+    generate_question / generate_question_stream if the final answer matches.
+    """
+    try:
+        data = parse_json_body(request)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
+
+    scheduled = await sync_to_async(question_prefetch.prefetch)(
+        data.get('session_id'),
+        format_history(data.get('conversation_history', [])),
+        data.get('user_profile', {}),
+        data.get('current_round', 'Technical'),
+        data.get('partial_answer', '')
+    )
+
+    return JsonResponse({
+        'success': True,
+        'scheduled': scheduled
+    }, status=202)
+
+
+@csrf_exempt
+@require_POST
+async def analyze_response(request):
     """
     Analyze candidate's answer using Gemini AI
     """
     try:
-        data = request.data
+        try:
+            data = parse_json_body(request)
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
         question = data.get('question', '')
         answer = data.get('answer', '')
         context = data.get('context', '')
-        
-        analysis = analyze_answer(question, answer, context)
-        
-        return Response({
+
+        analysis = await aanalyze_answer(question, answer, context)
+
+        return JsonResponse({
             'success': True,
             'analysis': analysis
         })
-        
+
     except Exception as e:
-        return Response({
+        return JsonResponse({
             'success': False,
             'error': str(e),
             'analysis': 'Response recorded.'
         }, status=500)
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
 @csrf_exempt
-def transition_round(request):
+@require_POST
+async def transition_round(request):
     """
     Generate transition message between rounds
     """
+    next_round = ''
     try:
-        data = request.data
+        try:
+            data = parse_json_body(request)
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
         current_round = data.get('current_round', '')
         next_round = data.get('next_round', '')
         performance_summary = data.get('performance_summary', 'Good performance')
-        
-        transition = generate_round_transition(
+
+        transition = await agenerate_round_transition(
             current_round,
             next_round,
             performance_summary
         )
-        
-        return Response({
+
+        return JsonResponse({
             'success': True,
             'message': transition
         })
-        
+
     except Exception as e:
-        return Response({
+        return JsonResponse({
             'success': False,
             'error': str(e),
             'message': f"Let's move on to the {next_round} round."
         }, status=500)
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
 @csrf_exempt
-def conclude_interview(request):
+@require_POST
+async def conclude_interview(request):
     """
     Generate final interview message
     """
     try:
-        data = request.data
+        try:
+            data = parse_json_body(request)
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
         overall_performance = data.get('overall_performance', 'Thank you for participating')
-        
-        final_message = generate_final_message(overall_performance)
-        
-        return Response({
+
+        final_message = await agenerate_final_message(overall_performance)
+
+        return JsonResponse({
             'success': True,
             'message': final_message
         })
-        
+
     except Exception as e:
-        return Response({
+        return JsonResponse({
             'success': False,
             'error': str(e),
             'message': 'Thank you for your time today!'
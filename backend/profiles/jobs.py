@@ -0,0 +1,269 @@
+import hashlib
+import os
+import threading
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import AnalysisJob, InterviewAnalysis
+from .gemini_analyzer import analyze_interview_recording
+from . import media_probe
+
+
+def recording_hash(recording_file):
+    """SHA-256 of an uploaded recording (computed during upload when possible)"""
+    content_hash = getattr(recording_file, 'sha256', None)
+    if content_hash:
+        return content_hash
+
+    sha256 = hashlib.sha256()
+    for chunk in recording_file.chunks():
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def probe_recording(recording_file):
+    """Container format, duration and tracks of an uploaded recording (see media_probe)"""
+    if hasattr(recording_file, 'temporary_file_path'):
+        return media_probe.probe(recording_file.temporary_file_path())
+    return media_probe.probe_file(recording_file, recording_file.size)
+
+
+def find_duplicate_job(user, content_hash, participant_count=1, analysis_mode=AnalysisJob.MODE_FULL):
+    """
+    The user's most recent job for identical recording content that is still
+    pending or already produced an analysis, so a resubmission or client retry
+    can be answered without uploading and analyzing the recording again.
+    """
+    return (
+        AnalysisJob.objects
+        .filter(
+            user=user, content_hash=content_hash, participant_count=participant_count,
+            analysis_mode=analysis_mode,
+        )
+        .exclude(status=AnalysisJob.STATUS_FAILED)
+        .exclude(status=AnalysisJob.STATUS_DONE, analysis__isnull=True)
+        .order_by('-created_at')
+        .first()
+    )
+
+
+def enqueue_recording_analysis(user, recording_file, participant_count=1, content_hash=None, media_info=None,
+                               analysis_mode=AnalysisJob.MODE_FULL):
+    """
+    Persist an uploaded recording to the scratch directory and queue it for the
+    analysis worker. Returns the created AnalysisJob.
+
+    Uploads already on disk (see upload_handlers.ScratchFileUploadHandler) are
+    moved into place with a rename; anything else is copied chunk by chunk.
+    """
+    scratch_dir = Path(settings.ANALYSIS_SCRATCH_DIR)
+    scratch_dir.mkdir(parents=True, exist_ok=True)
+
+    suffix = Path(recording_file.name or '').suffix or '.webm'
+    recording_path = scratch_dir / f"{uuid.uuid4().hex}{suffix}"
+
+    if not _move_temporary_upload(recording_file, recording_path):
+        with open(recording_path, 'wb') as destination:
+            for chunk in recording_file.chunks():
+                destination.write(chunk)
+
+    try:
+        return AnalysisJob.objects.create(
+            user=user,
+            recording_path=str(recording_path),
+            recording_filename=recording_file.name,
+            content_type=recording_file.content_type,
+            participant_count=participant_count,
+            content_hash=content_hash,
+            duration_seconds=(media_info or {}).get('duration_seconds'),
+            media_info=media_info,
+            analysis_mode=analysis_mode,
+        )
+    except Exception:
+        # Don't strand the recording if the job row can't be written
+        os.remove(recording_path)
+        raise
+
+
+def _move_temporary_upload(recording_file, recording_path):
+    """Rename a temporary upload to recording_path; False if it has to be copied"""
+    if not hasattr(recording_file, 'temporary_file_path'):
+        return False
+    try:
+        os.replace(recording_file.temporary_file_path(), recording_path)
+    except OSError:
+        # Different filesystem (FILE_UPLOAD_TEMP_DIR elsewhere): fall back to a copy
+        return False
+    return True
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest queued job to running and return it.
+    Uses a conditional UPDATE so several workers can poll the same table
+    (SQLite or PostgreSQL) without picking up the same job twice.
+    """
+    candidates = AnalysisJob.objects.filter(status=AnalysisJob.STATUS_QUEUED).order_by('created_at')
+
+    for job_id in candidates.values_list('id', flat=True)[:10]:
+        now = timezone.now()
+        claimed = AnalysisJob.objects.filter(id=job_id, status=AnalysisJob.STATUS_QUEUED).update(
+            status=AnalysisJob.STATUS_RUNNING,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return AnalysisJob.objects.select_related('user').get(id=job_id)
+
+    return None
+
+
+def requeue_stale_jobs():
+    """
+    Return jobs stuck in 'running' (worker crashed or was killed) to the queue,
+    or fail them once they have used up their attempts. A job is stuck when its
+    heartbeat (see JobHeartbeat) has stopped, however long it has been running.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.ANALYSIS_JOB_STALE_SECONDS)
+    stale = AnalysisJob.objects.filter(status=AnalysisJob.STATUS_RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+
+    failed = stale.filter(attempts__gte=settings.ANALYSIS_JOB_MAX_ATTEMPTS).update(
+        status=AnalysisJob.STATUS_FAILED,
+        error='Analysis worker stopped responding',
+        finished_at=timezone.now(),
+    )
+    requeued = stale.update(status=AnalysisJob.STATUS_QUEUED, partial_result=None)
+
+    return requeued, failed
+
+
+def save_interview_analysis(user, recording_filename, participant_count, analysis_result, duration_seconds=None):
+    """Create the InterviewAnalysis row from a flat analysis result dict"""
+    return InterviewAnalysis.objects.create(
+        user=user,
+        recording_filename=recording_filename,
+        recording_duration_seconds=round(duration_seconds or 0),
+
+        # Map new fields to old model fields
+        emotion_trend=analysis_result.get('emotion_trend', ''),
+        confidence_score=analysis_result.get('confidence_score', 0),
+        communication_analysis=analysis_result.get('communication_analysis', ''),
+        strengths=analysis_result.get('strengths', []),
+        improvements=analysis_result.get('improvements', []),
+
+        # Integrity analysis
+        eye_movement_pattern=analysis_result.get('eye_movement_pattern', ''),
+        attention_level=analysis_result.get('attention_level', ''),
+        suspicion_risk=analysis_result.get('suspicion_risk', ''),
+        integrity_notes=analysis_result.get('integrity_notes', ''),
+
+        # Ranking
+        ranking_position=analysis_result.get('ranking_position', 1),
+        total_participants=analysis_result.get('total_participants', participant_count),
+        percentile_band=analysis_result.get('percentile_band', ''),
+
+        # Store FULL raw response - this includes all the new detailed fields
+        raw_ai_response=analysis_result
+    )
+
+
+class PartialResults:
+    """
+    Collects analysis fields as they stream in (from several section threads)
+    and keeps the job's partial_result up to date for the status endpoint
+    """
+
+    def __init__(self, job):
+        self.job_id = job.id
+        self.fields = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, key, value):
+        with self.lock:
+            self.fields[key] = value
+            AnalysisJob.objects.filter(id=self.job_id).update(partial_result=dict(self.fields))
+
+
+class JobHeartbeat:
+    """
+    Refreshes a running job's heartbeat_at from a background thread while the
+    analysis runs, so requeue_stale_jobs can tell a long analysis (several
+    LLM calls of up to ANALYSIS_LLM_TIMEOUT_SECONDS each) from a dead worker
+    """
+
+    def __init__(self, job):
+        self.job_id = job.id
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._beat, name=f'job-{job.id}-heartbeat', daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def _beat(self):
+        try:
+            while not self.stopped.wait(settings.ANALYSIS_JOB_HEARTBEAT_SECONDS):
+                try:
+                    AnalysisJob.objects.filter(id=self.job_id, status=AnalysisJob.STATUS_RUNNING).update(
+                        heartbeat_at=timezone.now()
+                    )
+                except Exception as e:
+                    print(f"⚠️  Job {self.job_id}: heartbeat failed: {e}")
+        finally:
+            connection.close()  # This thread's own connection
+
+
+def run_job(job):
+    """
+    Run the Gemini analysis for a claimed job and record the outcome.
+    The scratch recording is always removed once the job has finished.
+    """
+    print(f"🎬 Job {job.id}: analyzing {job.recording_filename} for {job.user.name} ({job.user.email})")
+
+    try:
+        with JobHeartbeat(job):
+            analysis_result = analyze_interview_recording(
+                job.recording_path, job.content_type, job.participant_count, job.content_hash, job.duration_seconds,
+                analysis_mode=job.analysis_mode, media_info=job.media_info, on_field=PartialResults(job),
+            )
+
+        if 'error' in analysis_result:
+            raise Exception(analysis_result['error'])
+
+        interview_analysis = save_interview_analysis(
+            job.user, job.recording_filename, job.participant_count, analysis_result, job.duration_seconds
+        )
+
+        job.analysis = interview_analysis
+        job.status = AnalysisJob.STATUS_DONE
+        job.error = None
+        print(f"✅ Job {job.id}: analysis saved with ID {interview_analysis.id}")
+
+    except Exception as e:
+        print(f"❌ Job {job.id} failed: {e}")
+        job.status = AnalysisJob.STATUS_FAILED
+        job.error = str(e)
+
+    finally:
+        try:
+            os.remove(job.recording_path)
+        except OSError:
+            pass
+
+    job.finished_at = timezone.now()
+    job.partial_result = None  # Superseded by the saved analysis (or the error)
+    job.save(update_fields=['analysis', 'status', 'error', 'finished_at', 'partial_result'])
+    return job
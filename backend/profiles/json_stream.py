@@ -0,0 +1,166 @@
+"""
+Incremental parsing of a JSON object or array as it streams out of the model.
+
+The parsers are fed text chunks and report each top-level member of the object
+(or element of the array) as soon as its value is complete, without waiting
+for the closing brace or bracket. They scan every character once, tracking
+only string/escape state and nesting depth; a completed value is handed to
+json.loads on its own.
+"""
+import json
+
+
+class IncrementalJsonObjectParser:
+    """
+    Feed chunks of a JSON object with feed(); each call returns the
+    [(key, value), ...] members completed by that chunk, in order.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.position = 0        # Next character to scan
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.key = None          # Key of the member being read at depth 1
+        self.key_start = None    # Buffer offset of that key's opening quote
+        self.value_start = None  # Buffer offset where its value begins
+        self.done = False
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        completed = []
+
+        buffer = self.buffer
+        for index in range(self.position, len(buffer)):
+            char = buffer[index]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.key is None and self.value_start is None:
+                        self.key = json.loads(buffer[self.key_start:index + 1])
+                continue
+
+            if self.done or char.isspace():
+                continue
+
+            if char == '"':
+                self.in_string = True
+                if self.depth == 1 and self.key is None:
+                    self.key_start = index
+                    continue
+
+            if self.depth == 1:
+                if char == ':' and self.key is not None and self.value_start is None:
+                    self.value_start = index + 1
+                    continue
+                if char in ',}':
+                    member = self._complete_member(buffer, index)
+                    if member:
+                        completed.append(member)
+                    if char == '}':
+                        self.depth = 0
+                        self.done = True
+                    continue
+
+            if char in '{[':
+                self.depth += 1
+            elif char in '}]':
+                self.depth -= 1
+
+        self.position = len(buffer)
+        return completed
+
+    def _complete_member(self, buffer, end):
+        """The (key, value) member ending just before `end`, if one was being read"""
+        key, value_start = self.key, self.value_start
+        self.key = self.key_start = self.value_start = None
+        if key is None or value_start is None:
+            return None
+        try:
+            return key, json.loads(buffer[value_start:end])
+        except json.JSONDecodeError:
+            return None
+
+    @property
+    def text(self):
+        """Everything fed so far"""
+        return self.buffer
+
+
+class IncrementalJsonArrayParser:
+    """
+    Feed chunks of a JSON array with feed(); each call returns the elements
+    completed by that chunk, in order.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.position = 0          # Next character to scan
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.element_start = None  # Buffer offset where the element being read begins
+        self.done = False
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        completed = []
+
+        buffer = self.buffer
+        for index in range(self.position, len(buffer)):
+            char = buffer[index]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+
+            if self.done or char.isspace():
+                continue
+
+            if self.depth == 1:
+                if char in ',]':
+                    element = self._complete_element(buffer, index)
+                    if element is not None:
+                        completed.append(element)
+                    if char == ']':
+                        self.depth = 0
+                        self.done = True
+                    continue
+                if self.element_start is None:
+                    self.element_start = index
+
+            if char == '"':
+                self.in_string = True
+            elif char in '{[':
+                self.depth += 1
+            elif char in '}]':
+                self.depth -= 1
+
+        self.position = len(buffer)
+        return completed
+
+    def _complete_element(self, buffer, end):
+        """The element ending just before `end`, if one was being read"""
+        start, self.element_start = self.element_start, None
+        if start is None:
+            return None
+        try:
+            return json.loads(buffer[start:end])
+        except json.JSONDecodeError:
+            return None
+
+    @property
+    def text(self):
+        """Everything fed so far"""
+        return self.buffer
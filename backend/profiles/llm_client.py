@@ -0,0 +1,349 @@
+"""
+Shared Gemini client layer.
+
+Loads configuration once per process and keeps one long-lived model handle per
+(backend, model name, generation config), so every call site reuses the same
+gRPC channel instead of rebuilding a client on each interview turn. All calls go
+through `generate` (or `agenerate` from async views), which apply the same timeout,
+retry policy and timing instrumentation everywhere. The defaults are the LLM_*
+settings; callers pass `timeout` / `max_retries` to override them per call.
+"""
+import os
+import json
+import time
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from django.conf import settings
+from dotenv import load_dotenv
+
+from .json_stream import IncrementalJsonArrayParser, IncrementalJsonObjectParser
+
+# Load environment variables
+load_dotenv()
+
+GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+USE_VERTEX_AI = os.getenv('USE_VERTEX_AI', 'false').lower() == 'true'
+GCP_PROJECT_ID = os.getenv('GCP_PROJECT_ID')
+GCP_LOCATION = os.getenv('GCP_LOCATION', 'us-central1')
+
+# Vertex AI recordings: streamed to this GCS bucket when set; otherwise sent
+# inline, which only works up to the request size limit
+VERTEX_UPLOAD_BUCKET = os.getenv('VERTEX_UPLOAD_BUCKET')
+VERTEX_INLINE_MAX_BYTES = int(os.getenv('VERTEX_INLINE_MAX_BYTES', str(20 * 1024 * 1024)))
+
+DEFAULT_MODEL = 'gemini-2.5-flash'
+
+# Errors worth retrying: rate limiting and transient server/network failures
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
+if USE_VERTEX_AI:
+    print(f"🔵 Using Vertex AI (Project: {GCP_PROJECT_ID}, Location: {GCP_LOCATION})")
+    try:
+        import vertexai
+        vertexai.init(project=GCP_PROJECT_ID, location=GCP_LOCATION)
+    except ImportError:
+        print("❌ vertexai package not installed. Run: pip install google-cloud-aiplatform")
+        USE_VERTEX_AI = False
+
+if GEMINI_API_KEY:
+    print(f"🔑 Using Gemini API Key")
+    genai.configure(api_key=GEMINI_API_KEY)
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+# Async gRPC channels are bound to the event loop that created them, so async
+# handles are kept per loop (one loop per ASGI worker in production)
+_async_models = weakref.WeakKeyDictionary()
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+# The Vertex SDK takes no per-request timeout, so sync Vertex calls run here and
+# are waited on with one; a call that times out finishes in the background and
+# its response is dropped
+_vertex_calls = ThreadPoolExecutor(max_workers=8, thread_name_prefix='vertex-call')
+
+
+def is_configured():
+    """True when a real Gemini API key is available"""
+    return bool(GEMINI_API_KEY) and GEMINI_API_KEY != 'your_gemini_api_key_here'
+
+
+def get_model(model_name=DEFAULT_MODEL, generation_config=None, use_vertex=False):
+    """
+    Return the shared model handle for this (backend, model, generation_config).
+    Handles are created on first use and reused for the life of the process.
+    """
+    key = _model_key(model_name, generation_config, use_vertex)
+
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            model = _build_model(model_name, generation_config, use_vertex)
+            _models[key] = model
+
+    return model
+
+
+def get_async_model(model_name=DEFAULT_MODEL, generation_config=None, use_vertex=False):
+    """
+    Async counterpart of `get_model`, returning a handle whose async client is
+    bound to the running event loop. Must be called from a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    key = _model_key(model_name, generation_config, use_vertex)
+
+    loop_models = _async_models.setdefault(loop, {})
+    model = loop_models.get(key)
+    if model is None:
+        model = _build_model(model_name, generation_config, use_vertex)
+        if not use_vertex:
+            model._async_client = _make_async_client()
+        loop_models[key] = model
+
+    return model
+
+
+def _make_async_client():
+    """
+    A new async Gemini client for the running loop. genai shares one process-wide
+    async client by default, which breaks once a second loop (runserver runs each
+    async view on its own) reuses its channel. The SDK has no public way to make
+    another, so this uses its client manager; requirements.txt pins the SDK and
+    LlmClientTests fails if that hook goes away. Without it, the model falls
+    back to the shared client, which is fine with one loop per ASGI worker.
+    """
+    from google.generativeai import client as genai_client
+    manager = getattr(genai_client, '_client_manager', None)
+    if manager is None or not hasattr(manager, 'make_client'):
+        print("⚠️  google-generativeai has no client manager; async calls share one client")
+        return None
+    return manager.make_client('generative_async')
+
+
+def _model_key(model_name, generation_config, use_vertex):
+    config_key = json.dumps(generation_config, sort_keys=True, default=str) if generation_config else None
+    return ('vertex' if use_vertex else 'gemini', model_name, config_key)
+
+
+def _build_model(model_name, generation_config, use_vertex):
+    if use_vertex:
+        from vertexai.generative_models import GenerationConfig, GenerativeModel
+        if isinstance(generation_config, dict):
+            # Vertex passes plain dicts to the API as-is; GenerationConfig
+            # converts response_schema to its proto form
+            generation_config = GenerationConfig(**generation_config)
+        return GenerativeModel(model_name, generation_config=generation_config)
+    return genai.GenerativeModel(model_name, generation_config=generation_config)
+
+
+def generate(contents, model_name=DEFAULT_MODEL, generation_config=None, use_vertex=False,
+             timeout=None, max_retries=None, **kwargs):
+    """
+    Call generate_content on the shared model handle with the common timeout and
+    retry policy. Retries transient errors with exponential backoff and re-raises
+    everything else unchanged, so callers keep their existing error handling.
+    """
+    model = get_model(model_name, generation_config, use_vertex)
+    timeout = settings.LLM_TIMEOUT_SECONDS if timeout is None else timeout
+    max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+
+    if not use_vertex:
+        kwargs.setdefault('request_options', {'timeout': timeout})
+
+    attempt = 0
+    while True:
+        attempt += 1
+        started = time.monotonic()
+        try:
+            if use_vertex:
+                response = _vertex_generate(model, contents, timeout, **kwargs)
+            else:
+                response = model.generate_content(contents, **kwargs)
+        except RETRYABLE_ERRORS as e:
+            _record(model_name, time.monotonic() - started, error=True)
+            if attempt > max_retries:
+                raise
+            delay = settings.LLM_RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1))
+            print(f"⚠️  {model_name} call failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        except Exception:
+            _record(model_name, time.monotonic() - started, error=True)
+            raise
+
+        _record(model_name, time.monotonic() - started)
+        return response
+
+
+def generate_text(contents, **kwargs):
+    """Same as `generate`, returning the stripped response text"""
+    return generate(contents, **kwargs).text.strip()
+
+
+def generate_json(contents, task, **kwargs):
+    """
+    Run a JSON task (see schemas.JsonTask) in the model's JSON response mode
+    and return the parsed, validated result
+    """
+    return task.parse(generate(contents, generation_config=task.generation_config, **kwargs).text)
+
+
+async def agenerate(contents, model_name=DEFAULT_MODEL, generation_config=None, use_vertex=False,
+                    timeout=None, max_retries=None, **kwargs):
+    """
+    Async version of `generate` using the async Gemini client, so an ASGI
+    worker can keep many calls in flight without a thread per call.
+    """
+    model = get_async_model(model_name, generation_config, use_vertex)
+    timeout = settings.LLM_TIMEOUT_SECONDS if timeout is None else timeout
+    max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+
+    if not use_vertex:
+        kwargs.setdefault('request_options', {'timeout': timeout})
+
+    attempt = 0
+    while True:
+        attempt += 1
+        started = time.monotonic()
+        try:
+            if use_vertex:
+                response = await _avertex_generate(model, contents, timeout, **kwargs)
+            else:
+                response = await model.generate_content_async(contents, **kwargs)
+        except RETRYABLE_ERRORS as e:
+            _record(model_name, time.monotonic() - started, error=True)
+            if attempt > max_retries:
+                raise
+            delay = settings.LLM_RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1))
+            print(f"⚠️  {model_name} call failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            continue
+        except Exception:
+            _record(model_name, time.monotonic() - started, error=True)
+            raise
+
+        _record(model_name, time.monotonic() - started)
+        return response
+
+
+async def agenerate_text(contents, **kwargs):
+    """Same as `agenerate`, returning the stripped response text"""
+    return (await agenerate(contents, **kwargs)).text.strip()
+
+
+def stream_json(contents, task, on_field, **kwargs):
+    """
+    Like `generate_json` for object-shaped tasks, but streams the response and
+    calls on_field(key, value) for each top-level field as soon as it is
+    complete. Returns the full validated result.
+    """
+    response = generate(contents, generation_config=task.generation_config, stream=True, **kwargs)
+
+    parser = IncrementalJsonObjectParser()
+    for chunk in response:
+        text = chunk.text
+        if text:
+            for key, value in parser.feed(text):
+                on_field(key, value)
+    return task.parse(parser.text)
+
+
+def stream_json_items(contents, task, on_item, **kwargs):
+    """
+    Like `generate_json` for array-shaped tasks, but streams the response and
+    calls on_item(item) for each element as soon as it is complete. Returns the
+    full validated result.
+    """
+    response = generate(contents, generation_config=task.generation_config, stream=True, **kwargs)
+
+    parser = IncrementalJsonArrayParser()
+    for chunk in response:
+        text = chunk.text
+        if text:
+            for item in parser.feed(text):
+                on_item(item)
+    return task.parse(parser.text)
+
+
+async def agenerate_json(contents, task, **kwargs):
+    """Async version of `generate_json`"""
+    return task.parse((await agenerate(contents, generation_config=task.generation_config, **kwargs)).text)
+
+
+async def astream_text(contents, model_name=DEFAULT_MODEL, generation_config=None, use_vertex=False,
+                       timeout=None, max_retries=None, **kwargs):
+    """
+    Async generator yielding response text chunks as the model produces them.
+    Opening the stream is retried like `agenerate`; errors after the first
+    chunk are raised to the caller, since part of the answer was already sent.
+    """
+    kwargs['stream'] = True
+    started = time.monotonic()
+    response = await agenerate(contents, model_name, generation_config, use_vertex, timeout, max_retries, **kwargs)
+
+    first_chunk = True
+    async for chunk in response:
+        if first_chunk:
+            print(f"⚡ {model_name} first token after {time.monotonic() - started:.2f}s")
+            first_chunk = False
+        text = chunk.text
+        if text:
+            yield text
+
+
+def _vertex_generate(model, contents, timeout, **kwargs):
+    """
+    generate_content on a Vertex handle, raising DeadlineExceeded after `timeout`
+    like the Gemini API does. A streamed call is bounded until it starts streaming.
+    """
+    future = _vertex_calls.submit(model.generate_content, contents, **kwargs)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        raise google_exceptions.DeadlineExceeded(f"Vertex AI call exceeded {timeout}s") from None
+
+
+async def _avertex_generate(model, contents, timeout, **kwargs):
+    """Async version of `_vertex_generate`; the timed out call is cancelled"""
+    try:
+        return await asyncio.wait_for(model.generate_content_async(contents, **kwargs), timeout)
+    except asyncio.TimeoutError:
+        raise google_exceptions.DeadlineExceeded(f"Vertex AI call exceeded {timeout}s") from None
+
+
+def _record(model_name, elapsed, error=False):
+    with _stats_lock:
+        stats = _stats.setdefault(model_name, {'calls': 0, 'errors': 0, 'total_seconds': 0.0})
+        stats['calls'] += 1
+        stats['total_seconds'] += elapsed
+        if error:
+            stats['errors'] += 1
+
+
+def get_stats():
+    """Per-model call counts, error counts and average latency for this process"""
+    with _stats_lock:
+        return {
+            model_name: {
+                **stats,
+                'avg_seconds': stats['total_seconds'] / stats['calls'] if stats['calls'] else 0.0,
+            }
+            for model_name, stats in _stats.items()
+        }
@@ -0,0 +1,344 @@
+import base64
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+import zipfile
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.doc')
+
+# Set in each pool worker by _init_worker
+_llm_slot = None
+
+
+def _init_worker(llm_slot):
+    """Pool initializer: configure Django in the (spawned) worker process"""
+    global _llm_slot
+    _llm_slot = llm_slot
+    # Documents are already spread across processes; don't nest extraction pools
+    os.environ['RESUME_PARALLEL_MIN_PAGES'] = str(sys.maxsize)
+    import django
+    django.setup()
+
+
+def _parse_item(item):
+    """Pool task: read and parse one resume -> (key, parsed data or None, timings, error)"""
+    from django.db import close_old_connections
+    from profiles.candidate_digest import build_digest
+    from profiles.resume_parser import parse_resume
+
+    close_old_connections()
+    timings = {}
+    started = time.perf_counter()
+    try:
+        data = _read_item(item)
+        timings['read'] = time.perf_counter() - started
+        parsed = parse_resume(io.BytesIO(data), item['file_name'], llm_slot=_llm_slot, timings=timings)
+    except Exception as e:
+        return item['key'], None, timings, str(e)
+    timings['parse'] = time.perf_counter() - started
+    if not parsed.get('raw_text'):
+        return item['key'], None, timings, 'no text could be extracted'
+    parsed['digest'] = build_digest(parsed)
+    return item['key'], parsed, timings, None
+
+
+def _read_item(item):
+    if 'path' in item:
+        with open(item['path'], 'rb') as f:
+            return f.read()
+    if 'zip' in item:
+        with zipfile.ZipFile(item['zip']) as archive:
+            return archive.read(item['member'])
+    return base64.b64decode(item['content_base64'])
+
+
+def _directory_items(root):
+    for directory, _, names in os.walk(root):
+        for name in sorted(names):
+            if name.lower().endswith(RESUME_EXTENSIONS):
+                path = os.path.join(directory, name)
+                key = os.path.relpath(path, root)
+                yield {'key': key, 'uid': _uid_from_name(name), 'file_name': name, 'path': path}
+
+
+def _zip_items(zip_path):
+    with zipfile.ZipFile(zip_path) as archive:
+        names = [info.filename for info in archive.infolist() if not info.is_dir()]
+    for member in names:
+        name = os.path.basename(member)
+        if name.lower().endswith(RESUME_EXTENSIONS):
+            yield {'key': member, 'uid': _uid_from_name(name), 'file_name': name, 'zip': zip_path, 'member': member}
+
+
+def _ndjson_items(ndjson_path):
+    base_dir = os.path.dirname(os.path.abspath(ndjson_path))
+    with open(ndjson_path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            item = {
+                'key': f"line {line_number}",
+                'uid': record.get('uid'),
+                'email': record.get('email'),
+            }
+            if 'content_base64' in record:
+                item['file_name'] = record['file_name']
+                item['content_base64'] = record['content_base64']
+            else:
+                item['path'] = os.path.join(base_dir, record['path'])
+                item['file_name'] = record.get('file_name') or os.path.basename(record['path'])
+            yield item
+
+
+def _uid_from_name(name):
+    return os.path.splitext(name)[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-import resumes for existing user profiles from a directory, a .zip or an .ndjson manifest. '
+        'Files are matched to users by file name (<uid>.pdf) or by the email in the resume; ndjson lines '
+        'are {"uid": ..., "path": ...} or {"uid": ..., "file_name": ..., "content_base64": ...}. '
+        'Interview recommendations are generated on first use rather than at import.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Directory, .zip archive or .ndjson manifest of resumes')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Parser processes (default: 4)',
+        )
+        parser.add_argument(
+            '--llm-concurrency',
+            type=int,
+            default=2,
+            help='Maximum AI extraction calls in flight across all workers (default: 2)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Resumes written per bulk_create/bulk_update batch (default: 50)',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='File recording imported resumes, so a rerun skips them (default: <source>.checkpoint)',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore an existing checkpoint and import everything again',
+        )
+
+    def handle(self, *args, **options):
+        source = options['source'].rstrip('/')
+        workers = max(options['workers'], 1)
+        batch_size = max(options['batch_size'], 1)
+        checkpoint_path = options['checkpoint'] or f"{source}.checkpoint"
+
+        items = self._items(source)
+        done = set() if options['restart'] else self._read_checkpoint(checkpoint_path)
+        pending = [item for item in items if item['key'] not in done]
+        self.stdout.write(
+            f"📂 {len(items)} resumes in {source}, {len(items) - len(pending)} already imported, "
+            f"{len(pending)} to go"
+        )
+        if not pending:
+            return
+
+        context = multiprocessing.get_context('spawn')
+        llm_slot = context.BoundedSemaphore(max(options['llm_concurrency'], 1))
+        items_by_key = {item['key']: item for item in pending}
+
+        self.stage_seconds = defaultdict(float)
+        self.stage_counts = defaultdict(int)
+        self.imported = 0
+        self.failures = []
+        started = time.perf_counter()
+
+        def new_pool():
+            return ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                       initializer=_init_worker, initargs=(llm_slot,))
+
+        pool = new_pool()
+        try:
+            with open(checkpoint_path, 'w' if options['restart'] else 'a', encoding='utf-8') as checkpoint:
+                queue = iter(pending)
+                in_flight = {}  # future -> item key
+                batch = []
+                while True:
+                    # Keep a few tasks per worker queued, not the whole source in memory
+                    for item in queue:
+                        in_flight[pool.submit(_parse_item, item)] = item['key']
+                        if len(in_flight) >= workers * 4:
+                            break
+                    if not in_flight:
+                        break
+
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    pool_broken = False
+                    for future in finished:
+                        item_key = in_flight.pop(future)
+                        try:
+                            key, parsed, timings, error = future.result()
+                        except BrokenProcessPool:
+                            # A worker died (out of memory, a crash in a PDF library); every
+                            # task still on the pool fails with it
+                            pool_broken = True
+                            self.failures.append((item_key, 'parser process died'))
+                            continue
+                        except Exception as e:
+                            self.failures.append((item_key, str(e)))
+                            continue
+                        self._record_timings(timings)
+                        if error:
+                            self.failures.append((key, error))
+                            continue
+                        batch.append((items_by_key[key], parsed))
+
+                    if pool_broken:
+                        for item_key in in_flight.values():
+                            self.failures.append((item_key, 'parser process died'))
+                        in_flight = {}
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        pool = new_pool()
+                        self.stdout.write(self.style.WARNING("⚠️  A parser process died, restarted the pool"))
+
+                    if len(batch) >= batch_size:
+                        self._write_batch(batch, checkpoint)
+                        batch = []
+                        self._report_progress(started, len(pending))
+
+                if batch:
+                    self._write_batch(batch, checkpoint)
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+        elapsed = time.perf_counter() - started
+        self._report(elapsed)
+
+    def _items(self, source):
+        if os.path.isdir(source):
+            return list(_directory_items(source))
+        if source.lower().endswith('.zip'):
+            return list(_zip_items(source))
+        if source.lower().endswith(('.ndjson', '.jsonl')):
+            return list(_ndjson_items(source))
+        raise CommandError(f"{source} is not a directory, .zip or .ndjson file")
+
+    def _read_checkpoint(self, path):
+        if not os.path.exists(path):
+            return set()
+        with open(path, encoding='utf-8') as f:
+            return {line.rstrip('\n') for line in f if line.strip()}
+
+    def _write_batch(self, batch, checkpoint):
+        """Match a batch of parsed resumes to users and write them with two bulk queries"""
+        # Imported here: pool workers load this module before Django is set up
+        from profiles.models import ResumeData, UserProfile
+
+        started = time.perf_counter()
+        users_by_uid = UserProfile.objects.in_bulk([item['uid'] for item, _ in batch if item.get('uid')])
+        emails = {
+            (item.get('email') or parsed.get('email') or '').lower()
+            for item, parsed in batch
+        } - {''}
+        users_by_email = {user.email.lower(): user for user in UserProfile.objects.filter(email__in=emails)}
+
+        resumes = {}  # user uid -> parsed
+        keys_by_uid = defaultdict(list)
+        for item, parsed in batch:
+            user = users_by_uid.get(item.get('uid')) or users_by_email.get(
+                (item.get('email') or parsed.get('email') or '').lower()
+            )
+            if user is None:
+                self.failures.append((item['key'], 'no matching user profile'))
+                continue
+            resumes[user.uid] = parsed  # A later file for the same user wins
+            keys_by_uid[user.uid].append(item['key'])
+
+        existing = {resume.user_id: resume for resume in ResumeData.objects.filter(user_id__in=resumes)}
+        now = timezone.now()
+        to_create, to_update = [], []
+        fields = set()
+        for uid, parsed in resumes.items():
+            fields.update(parsed)
+            resume = existing.get(uid)
+            if resume is None:
+                to_create.append(ResumeData(user_id=uid, **parsed))
+                continue
+            for field, value in parsed.items():
+                setattr(resume, field, value)
+            resume.updated_at = now
+            to_update.append(resume)
+
+        update_fields = sorted(fields | {'updated_at'})
+        try:
+            with transaction.atomic():
+                ResumeData.objects.bulk_create(to_create)
+                if to_update:
+                    ResumeData.objects.bulk_update(to_update, update_fields)
+            written = list(resumes)
+        except DatabaseError as e:
+            # One bad row (e.g. a value over a column's max_length) fails the whole
+            # bulk query; save row by row so the rest of the batch still lands
+            self.stdout.write(self.style.WARNING(f"⚠️  Batch write failed ({e}), writing resumes one by one"))
+            written = []
+            for resume, creating in [(resume, True) for resume in to_create] + [(resume, False) for resume in to_update]:
+                try:
+                    with transaction.atomic():
+                        if creating:
+                            resume.save(force_insert=True)
+                        else:
+                            resume.save(update_fields=update_fields)
+                except DatabaseError as row_error:
+                    self.failures.extend((key, str(row_error)) for key in keys_by_uid[resume.user_id])
+                else:
+                    written.append(resume.user_id)
+
+        # Only once the resumes are committed, so an interrupted run redoes them
+        checkpoint.writelines(f"{key}\n" for uid in written for key in keys_by_uid[uid])
+        checkpoint.flush()
+        os.fsync(checkpoint.fileno())
+
+        self.imported += len(written)
+        self._record_timings({'db_write': time.perf_counter() - started})
+
+    def _record_timings(self, timings):
+        for stage, seconds in timings.items():
+            self.stage_seconds[stage] += seconds
+            self.stage_counts[stage] += 1
+
+    def _report_progress(self, started, total):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"   {self.imported}/{total} imported ({self.imported / elapsed:.2f} docs/sec)")
+
+    def _report(self, elapsed):
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Imported {self.imported} resumes in {elapsed:.1f}s "
+            f"({self.imported / elapsed if elapsed else 0:.2f} docs/sec)"
+        ))
+        self.stdout.write("⏱️  Stage timings (total / mean):")
+        for stage in ('read', 'extract_text', 'rules', 'llm_wait', 'llm', 'parse', 'db_write'):
+            if self.stage_counts[stage]:
+                total = self.stage_seconds[stage]
+                self.stdout.write(
+                    f"   {stage:<13}{total:8.2f}s  {total / self.stage_counts[stage]:7.3f}s × {self.stage_counts[stage]}"
+                )
+        if self.failures:
+            self.stdout.write(self.style.WARNING(f"⚠️  {len(self.failures)} resumes not imported (rerun retries them):"))
+            for key, error in self.failures:
+                self.stdout.write(f"   {key}: {error}")
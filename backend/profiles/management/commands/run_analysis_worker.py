@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from profiles.jobs import claim_next_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Process queued interview recording analyses (run alongside the web server)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between checks when the queue is empty (default: 2)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of running forever',
+        )
+
+    def handle(self, *args, **options):
+        poll_interval = options['poll_interval']
+        self.stdout.write(self.style.SUCCESS('🚀 Analysis worker started'))
+
+        try:
+            while True:
+                close_old_connections()
+
+                requeued, failed = requeue_stale_jobs()
+                if requeued or failed:
+                    self.stdout.write(f"♻️  Stale jobs: {requeued} requeued, {failed} failed")
+
+                job = claim_next_job()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                run_job(job)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('👋 Analysis worker stopped'))
@@ -0,0 +1,490 @@
+"""
+Header-only probe for interview recordings.
+
+Reads just the container headers (plus the tail of the file for WebM recordings
+without a Duration) to find the real format, duration and track layout of a
+recording without decoding it or reading it in full. Supports MP4/MOV, WebM and
+Matroska, AVI, WAV and MP3.
+
+`probe(path)` returns a dict:
+    {
+        'format': 'webm',            # or None if the bytes are not a known format
+        'doc_type': 'webm',          # Matroska DocType, WebM/Matroska only
+        'duration_seconds': 312.4,   # None when the container doesn't say
+        'tracks': [{'type': 'video', 'codec': 'V_VP8', 'width': 1280, 'height': 720},
+                   {'type': 'audio', 'codec': 'A_OPUS', 'channels': 1, 'sample_rate': 48000}],
+        'has_video': True,
+        'has_audio': True,
+    }
+"""
+import os
+import struct
+
+HEAD_BYTES = 64 * 1024
+
+# Growing tail windows searched for the last WebM cluster (clusters of a
+# high-bitrate video can be a few MB)
+TAIL_WINDOWS = (64 * 1024, 1024 * 1024, 8 * 1024 * 1024)
+
+# Declared upload content types each detected format may arrive as
+FORMAT_CONTENT_TYPES = {
+    'mp4': {'video/mp4', 'audio/mp4', 'video/quicktime'},
+    'webm': {'video/webm', 'audio/webm'},
+    'matroska': {'video/webm', 'audio/webm', 'video/x-matroska'},
+    'avi': {'video/avi', 'video/x-msvideo'},
+    'wav': {'audio/wav', 'audio/x-wav', 'audio/wave'},
+    'mp3': {'audio/mp3', 'audio/mpeg'},
+}
+
+
+def probe(path):
+    """Probe the recording at `path` (see module docstring for the result)"""
+    with open(path, 'rb') as f:
+        return probe_file(f, os.path.getsize(path))
+
+
+def probe_file(f, file_size):
+    """Probe an open binary file object of the given size"""
+    head = _read_at(f, 0, HEAD_BYTES)
+    info = {
+        'format': detect_format(head),
+        'duration_seconds': None,
+        'tracks': [],
+    }
+
+    parsers = {
+        'mp4': _probe_mp4,
+        'webm': _probe_matroska,
+        'matroska': _probe_matroska,
+        'avi': _probe_avi,
+        'wav': _probe_wav,
+        'mp3': _probe_mp3,
+    }
+    parser = parsers.get(info['format'])
+    if parser:
+        try:
+            parser(f, file_size, head, info)
+        except (struct.error, IndexError, ValueError) as e:
+            # Damaged or truncated header: keep whatever was found so far
+            print(f"⚠️  Could not fully parse {info['format']} header: {e}")
+
+    if info['duration_seconds'] is not None:
+        info['duration_seconds'] = round(info['duration_seconds'], 3)
+    info['has_video'] = any(track['type'] == 'video' for track in info['tracks'])
+    info['has_audio'] = any(track['type'] == 'audio' for track in info['tracks'])
+    return info
+
+
+def detect_format(head):
+    """Container format from the magic bytes at the start of the file, or None"""
+    if head[4:8] == b'ftyp':
+        return 'mp4'
+    if head[:4] == b'\x1a\x45\xdf\xa3':
+        return 'webm' if b'webm' in head[:64] else 'matroska'
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return 'wav'
+    if head[:4] == b'RIFF' and head[8:12] == b'AVI ':
+        return 'avi'
+    if head[:3] == b'ID3' or _parse_mp3_header(head[:4]):
+        return 'mp3'
+    return None
+
+
+def matches_content_type(info, content_type):
+    """True if the detected format is one the declared content type can carry"""
+    return content_type in FORMAT_CONTENT_TYPES.get(info['format'], ())
+
+
+def _read_at(f, offset, size):
+    f.seek(offset)
+    return f.read(size)
+
+
+# MP4 / MOV: walk box headers with seeks, reading only moov's small boxes
+
+def _iter_boxes(f, start, end):
+    offset = start
+    while offset + 8 <= end:
+        header = _read_at(f, offset, 16)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack('>I4s', header[:8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack('>Q', header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size:
+            return
+        yield box_type.decode('latin-1'), offset + header_size, min(offset + size, end)
+        offset += size
+
+
+def _find_box(f, start, end, path):
+    for name in path:
+        for box_type, box_start, box_end in _iter_boxes(f, start, end):
+            if box_type == name:
+                start, end = box_start, box_end
+                break
+        else:
+            return None
+    return start, end
+
+
+def _probe_mp4(f, file_size, head, info):
+    moov = _find_box(f, 0, file_size, ['moov'])
+    if moov is None:
+        return
+
+    mvhd = _find_box(f, *moov, ['mvhd'])
+    if mvhd:
+        data = _read_at(f, mvhd[0], 32)
+        if data[0] == 1:
+            timescale, duration = struct.unpack('>IQ', data[20:32])
+        else:
+            timescale, duration = struct.unpack('>II', data[12:20])
+        if timescale:
+            info['duration_seconds'] = duration / timescale
+
+    for box_type, trak_start, trak_end in _iter_boxes(f, *moov):
+        if box_type != 'trak':
+            continue
+        mdia = _find_box(f, trak_start, trak_end, ['mdia'])
+        hdlr = mdia and _find_box(f, *mdia, ['hdlr'])
+        if not hdlr:
+            continue
+        handler = _read_at(f, hdlr[0] + 8, 4)
+        track_type = {b'vide': 'video', b'soun': 'audio'}.get(handler)
+        if track_type is None:
+            continue
+
+        track = {'type': track_type, 'codec': None}
+        stsd = _find_box(f, *mdia, ['minf', 'stbl', 'stsd'])
+        if stsd:
+            entry = _read_at(f, stsd[0] + 8, 40)
+            track['codec'] = entry[4:8].decode('latin-1')
+            if track_type == 'video':
+                track['width'], track['height'] = struct.unpack('>HH', entry[32:36])
+            else:
+                track['channels'] = struct.unpack('>H', entry[24:26])[0]
+                track['sample_rate'] = struct.unpack('>I', entry[32:36])[0] >> 16
+        info['tracks'].append(track)
+
+
+# WebM / Matroska: EBML elements in the head; last cluster in the tail
+
+EBML_DOC_TYPE = 0x4282
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_TYPE = 0x83
+CODEC_ID = 0x86
+VIDEO = 0xE0
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+AUDIO = 0xE1
+SAMPLING_FREQUENCY = 0xB5
+CHANNELS = 0x9F
+CLUSTER = 0x1F43B675
+CLUSTER_TIMECODE = 0xE7
+SIMPLE_BLOCK = 0xA3
+BLOCK_GROUP = 0xA0
+BLOCK = 0xA1
+
+
+def _read_vint(data, pos, keep_marker=False):
+    """Matroska variable-length integer at data[pos] -> (value, length); value None if unknown size"""
+    first = data[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        length += 1
+        mask >>= 1
+    if length > 8:
+        raise ValueError("Invalid EBML variable-length integer")
+
+    value = first if keep_marker else first & (mask - 1)
+    all_ones = value == mask - 1
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+        all_ones = all_ones and byte == 0xFF
+    if len(data) < pos + length:
+        raise ValueError("Truncated EBML variable-length integer")
+    if not keep_marker and all_ones:
+        value = None
+    return value, length
+
+
+def _iter_elements(data, start, end):
+    """Yield (id, data_start, data_end) for EBML elements in data[start:end]"""
+    pos = start
+    while pos < end:
+        element_id, id_length = _read_vint(data, pos, keep_marker=True)
+        size, size_length = _read_vint(data, pos + id_length)
+        data_start = pos + id_length + size_length
+        data_end = end if size is None else data_start + size
+        yield element_id, data_start, data_end
+        if data_end > end:
+            return
+        pos = data_end
+
+
+def _uint(data):
+    return int.from_bytes(data, 'big')
+
+
+def _float(data):
+    return struct.unpack('>f' if len(data) == 4 else '>d', data)[0]
+
+
+def _probe_matroska(f, file_size, head, info):
+    timecode_scale = 1000000  # Matroska default: millisecond timecodes
+    try:
+        timecode_scale = _probe_matroska_head(head, info, timecode_scale)
+    except (ValueError, IndexError, struct.error) as e:
+        print(f"⚠️  Could not fully parse Matroska header: {e}")
+
+    if info['duration_seconds'] is None:
+        # Live recordings (e.g. browser MediaRecorder) don't write a Duration:
+        # take the timecode of the last block in the file instead
+        last_timecode = _last_block_timecode(f, file_size)
+        if last_timecode is not None:
+            info['duration_seconds'] = last_timecode * timecode_scale / 1e9
+
+
+def _probe_matroska_head(head, info, timecode_scale):
+    """Parse the EBML header, Info and Tracks from the head; returns the timecode scale"""
+    end = len(head)
+
+    for element_id, start, stop in _iter_elements(head, 0, end):
+        if element_id == 0x1A45DFA3:
+            for child_id, child_start, child_stop in _iter_elements(head, start, min(stop, end)):
+                if child_id == EBML_DOC_TYPE:
+                    info['doc_type'] = head[child_start:child_stop].decode('ascii', 'replace')
+                    info['format'] = 'webm' if info['doc_type'] == 'webm' else 'matroska'
+        elif element_id == SEGMENT:
+            for child_id, child_start, child_stop in _iter_elements(head, start, min(stop, end)):
+                if child_stop > end:
+                    break
+                if child_id == INFO:
+                    duration = None
+                    for prop_id, prop_start, prop_stop in _iter_elements(head, child_start, child_stop):
+                        if prop_id == TIMECODE_SCALE:
+                            timecode_scale = _uint(head[prop_start:prop_stop])
+                        elif prop_id == DURATION:
+                            duration = _float(head[prop_start:prop_stop])
+                    if duration:
+                        info['duration_seconds'] = duration * timecode_scale / 1e9
+                elif child_id == TRACKS:
+                    info['tracks'] = _matroska_tracks(head, child_start, child_stop)
+                elif child_id == CLUSTER:
+                    break
+            break
+
+    return timecode_scale
+
+
+def _matroska_tracks(data, start, end):
+    tracks = []
+    for entry_id, entry_start, entry_end in _iter_elements(data, start, end):
+        if entry_id != TRACK_ENTRY:
+            continue
+        track = {'type': None, 'codec': None}
+        for prop_id, prop_start, prop_stop in _iter_elements(data, entry_start, entry_end):
+            value = data[prop_start:prop_stop]
+            if prop_id == TRACK_TYPE:
+                track['type'] = {1: 'video', 2: 'audio'}.get(_uint(value), 'other')
+            elif prop_id == CODEC_ID:
+                track['codec'] = value.decode('ascii', 'replace')
+            elif prop_id == VIDEO:
+                for sub_id, sub_start, sub_stop in _iter_elements(data, prop_start, prop_stop):
+                    if sub_id == PIXEL_WIDTH:
+                        track['width'] = _uint(data[sub_start:sub_stop])
+                    elif sub_id == PIXEL_HEIGHT:
+                        track['height'] = _uint(data[sub_start:sub_stop])
+            elif prop_id == AUDIO:
+                for sub_id, sub_start, sub_stop in _iter_elements(data, prop_start, prop_stop):
+                    if sub_id == SAMPLING_FREQUENCY:
+                        track['sample_rate'] = int(_float(data[sub_start:sub_stop]))
+                    elif sub_id == CHANNELS:
+                        track['channels'] = _uint(data[sub_start:sub_stop])
+        tracks.append(track)
+    return tracks
+
+
+def _last_block_timecode(f, file_size):
+    cluster_id = CLUSTER.to_bytes(4, 'big')
+
+    for window in TAIL_WINDOWS:
+        offset = max(0, file_size - window)
+        tail = _read_at(f, offset, window)
+
+        pos = tail.rfind(cluster_id)
+        while pos != -1:
+            timecode = _cluster_end_timecode(tail, pos)
+            if timecode is not None:
+                return timecode
+            pos = tail.rfind(cluster_id, 0, pos)
+
+        if offset == 0:
+            break
+    return None
+
+
+def _cluster_end_timecode(data, pos):
+    """Cluster timecode plus its last block's relative timecode, or None if not a real cluster"""
+    try:
+        _, id_length = _read_vint(data, pos, keep_marker=True)
+        _, size_length = _read_vint(data, pos + id_length)
+        children = _iter_elements(data, pos + id_length + size_length, len(data))
+
+        # Muxers write the cluster Timecode first; anything else is a false match
+        child_id, child_start, child_stop = next(children)
+        if child_id != CLUSTER_TIMECODE or child_stop - child_start > 8:
+            return None
+        cluster_timecode = _uint(data[child_start:child_stop])
+    except (StopIteration, ValueError, IndexError):
+        return None
+
+    last_relative = 0
+    try:
+        for child_id, child_start, child_stop in children:
+            if child_id == BLOCK_GROUP:
+                for sub_id, sub_start, _ in _iter_elements(data, child_start, min(child_stop, len(data))):
+                    if sub_id == BLOCK:
+                        child_start = sub_start
+                        child_id = SIMPLE_BLOCK
+                        break
+            if child_id == SIMPLE_BLOCK:
+                _, track_length = _read_vint(data, child_start)
+                relative = struct.unpack('>h', data[child_start + track_length:child_start + track_length + 2])[0]
+                last_relative = max(last_relative, relative)
+    except (ValueError, IndexError, struct.error):
+        pass  # Window ends mid-element; the blocks read so far are enough
+    return cluster_timecode + last_relative
+
+
+# RIFF (WAV, AVI)
+
+def _iter_riff_chunks(f, start, end):
+    offset = start
+    while offset + 8 <= end:
+        header = _read_at(f, offset, 12)
+        if len(header) < 8:
+            return
+        chunk_id, size = struct.unpack('<4sI', header[:8])
+        yield chunk_id, offset + 8, size, header[8:12]
+        offset += 8 + size + (size & 1)
+
+
+def _probe_wav(f, file_size, head, info):
+    byte_rate = None
+    for chunk_id, start, size, _ in _iter_riff_chunks(f, 12, file_size):
+        if chunk_id == b'fmt ':
+            audio_format, channels, sample_rate, byte_rate = struct.unpack('<HHII', _read_at(f, start, 12))
+            codec = {1: 'pcm', 3: 'pcm_float', 6: 'alaw', 7: 'mulaw'}.get(audio_format, f'0x{audio_format:04x}')
+            info['tracks'].append({'type': 'audio', 'codec': codec, 'channels': channels, 'sample_rate': sample_rate})
+        elif chunk_id == b'data':
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF: use the file size
+            if size in (0, 0xFFFFFFFF) or start + size > file_size:
+                size = file_size - start
+            if byte_rate:
+                info['duration_seconds'] = size / byte_rate
+            return
+
+
+def _probe_avi(f, file_size, head, info):
+    for chunk_id, start, size, list_type in _iter_riff_chunks(f, 12, file_size):
+        if chunk_id == b'LIST' and list_type == b'hdrl':
+            for sub_id, sub_start, sub_size, sub_list_type in _iter_riff_chunks(f, start + 4, start + size):
+                if sub_id == b'avih':
+                    usec_per_frame, _, _, _, total_frames = struct.unpack('<5I', _read_at(f, sub_start, 20))
+                    info['duration_seconds'] = total_frames * usec_per_frame / 1e6
+                elif sub_id == b'LIST' and sub_list_type == b'strl':
+                    strh = _read_at(f, sub_start + 12, 8)
+                    track_type = {b'vids': 'video', b'auds': 'audio'}.get(strh[:4], 'other')
+                    codec = strh[4:8].decode('latin-1').strip('\x00 ') or None
+                    info['tracks'].append({'type': track_type, 'codec': codec})
+            return
+
+
+# MP3: first frame header, Xing/Info/VBRI frame count for VBR files
+
+MP3_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 25: [11025, 12000, 8000]}
+
+
+def _parse_mp3_header(header):
+    """(version, layer, bitrate_kbps, sample_rate, mono) for a valid frame header, else None"""
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = {0: 25, 2: 2, 3: 1}.get((header[1] >> 3) & 3)
+    layer = {1: 3, 2: 2, 3: 1}.get((header[1] >> 1) & 3)
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 3
+    if version is None or layer is None or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    bitrate = MP3_BITRATES[(1 if version == 1 else 2, layer)][bitrate_index]
+    sample_rate = MP3_SAMPLE_RATES[version][sample_rate_index]
+    return version, layer, bitrate, sample_rate, header[3] >> 6 == 3
+
+
+def _find_mp3_frame(data, start):
+    pos = data.find(b'\xff', start)
+    while pos != -1 and pos + 4 <= len(data):
+        if _parse_mp3_header(data[pos:pos + 4]):
+            return pos
+        pos = data.find(b'\xff', pos + 1)
+    return None
+
+
+def _probe_mp3(f, file_size, head, info):
+    audio_start = 0
+    if head[:3] == b'ID3':
+        tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+        audio_start = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+        head = _read_at(f, audio_start, HEAD_BYTES)
+    else:
+        head = head[audio_start:]
+
+    frame = _find_mp3_frame(head, 0)
+    if frame is None:
+        return
+    version, layer, bitrate, sample_rate, mono = _parse_mp3_header(head[frame:frame + 4])
+    samples_per_frame = 384 if layer == 1 else 1152 if layer == 2 or version == 1 else 576
+    info['tracks'].append({
+        'type': 'audio',
+        'codec': f'mp{layer}',
+        'channels': 1 if mono else 2,
+        'sample_rate': sample_rate,
+    })
+
+    # VBR files carry the total frame count in a Xing/Info or VBRI header
+    side_info = (17 if mono else 32) if version == 1 else (9 if mono else 17)
+    xing = frame + 4 + side_info
+    frames = None
+    if head[xing:xing + 4] in (b'Xing', b'Info'):
+        flags = struct.unpack('>I', head[xing + 4:xing + 8])[0]
+        if flags & 1:
+            frames = struct.unpack('>I', head[xing + 8:xing + 12])[0]
+    elif head[frame + 36:frame + 40] == b'VBRI':
+        frames = struct.unpack('>I', head[frame + 50:frame + 54])[0]
+
+    if frames:
+        info['duration_seconds'] = frames * samples_per_frame / sample_rate
+    else:
+        audio_bytes = file_size - audio_start - frame
+        if _read_at(f, max(0, file_size - 128), 3) == b'TAG':
+            audio_bytes -= 128
+        info['duration_seconds'] = audio_bytes * 8 / (bitrate * 1000)
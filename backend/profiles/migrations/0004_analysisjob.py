@@ -0,0 +1,37 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_interviewanalysis'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='queued', max_length=20)),
+                ('recording_path', models.CharField(max_length=500)),
+                ('recording_filename', models.CharField(blank=True, max_length=255, null=True)),
+                ('content_type', models.CharField(blank=True, max_length=100, null=True)),
+                ('participant_count', models.IntegerField(default=1)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('analysis', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='job', to='profiles.interviewanalysis')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_jobs', to='profiles.userprofile')),
+            ],
+            options={
+                'db_table': 'analysis_jobs',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
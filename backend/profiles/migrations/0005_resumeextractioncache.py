@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_analysisjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeExtractionCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_hash', models.CharField(db_index=True, max_length=64)),
+                ('text_hash', models.CharField(max_length=64)),
+                ('prompt_version', models.CharField(max_length=20)),
+                ('raw_text', models.TextField(blank=True, default='')),
+                ('ai_data', models.JSONField(blank=True, null=True)),
+                ('hit_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'resume_extraction_cache',
+                'unique_together': {('text_hash', 'prompt_version')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_resumeextractioncache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumedata',
+            name='recommendations',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='resumedata',
+            name='recommendations_fingerprint',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_resumedata_recommendations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisjob',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.CreateModel(
+            name='RemoteRecordingFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64)),
+                ('backend', models.CharField(choices=[('gemini', 'Gemini Files API'), ('vertex', 'Vertex AI (GCS)')], max_length=20)),
+                ('remote_name', models.CharField(max_length=500)),
+                ('mime_type', models.CharField(blank=True, max_length=100, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('hit_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'remote_recording_files',
+                'unique_together': {('content_hash', 'backend')},
+            },
+        ),
+    ]
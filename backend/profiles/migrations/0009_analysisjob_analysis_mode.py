@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0008_analysisjob_media_info'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisjob',
+            name='analysis_mode',
+            field=models.CharField(choices=[('full', 'Full (video and audio)'), ('audio', 'Audio only (communication metrics)')], default='full', max_length=10),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0009_analysisjob_analysis_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisjob',
+            name='partial_result',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
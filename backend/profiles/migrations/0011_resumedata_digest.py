@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0010_analysisjob_partial_result'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumedata',
+            name='digest',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
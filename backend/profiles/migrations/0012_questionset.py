@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:26
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0011_resumedata_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionSet',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('uid', models.CharField(db_index=True, max_length=255)),
+                ('goal', models.CharField(max_length=50)),
+                ('level', models.CharField(max_length=50)),
+                ('domain', models.CharField(max_length=100)),
+                ('total', models.IntegerField()),
+                ('questions', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('generating', 'Generating'), ('done', 'Done')], default='generating', max_length=20)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'question_sets',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.utils import timezone
 
@@ -65,6 +67,13 @@ class ResumeData(models.Model):
     # Raw text from resume
     raw_text = models.TextField(blank=True, null=True)
     
+    # Compact candidate summary built at upload and reused by prompts and the profile API (candidate_digest)
+    digest = models.JSONField(default=dict, blank=True)
+    
+    # AI interview recommendations, valid while the fingerprint matches the resume content
+    recommendations = models.JSONField(default=dict, blank=True)
+    recommendations_fingerprint = models.CharField(max_length=64, blank=True, null=True)
+    
     # File info
     file_name = models.CharField(max_length=255, blank=True, null=True)
     file_url = models.URLField(blank=True, null=True)
@@ -121,3 +130,156 @@ class InterviewAnalysis(models.Model):
     def __str__(self):
         return f"Interview Analysis for {self.user.name} on {self.analyzed_at.strftime('%Y-%m-%d')}"
 
+
+
+class AnalysisJob(models.Model):
+    """
+    Queued recording analysis, processed outside the request cycle by the
+    `run_analysis_worker` management command
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    MODE_FULL = 'full'
+    MODE_AUDIO = 'audio'
+    MODE_CHOICES = [
+        (MODE_FULL, 'Full (video and audio)'),
+        (MODE_AUDIO, 'Audio only (communication metrics)'),
+    ]
+
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='analysis_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+
+    # Uploaded recording waiting on local disk for the worker
+    recording_path = models.CharField(max_length=500)
+    recording_filename = models.CharField(max_length=255, blank=True, null=True)
+    content_type = models.CharField(max_length=100, blank=True, null=True)
+    participant_count = models.IntegerField(default=1)
+    content_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)  # SHA-256 of the recording
+    duration_seconds = models.FloatField(blank=True, null=True)  # From the container header (media_probe)
+    media_info = models.JSONField(blank=True, null=True)  # Format and track layout from media_probe
+    analysis_mode = models.CharField(max_length=10, choices=MODE_CHOICES, default=MODE_FULL)
+
+    # Analysis fields received so far while the model is still generating
+    partial_result = models.JSONField(blank=True, null=True)
+
+    # Result (set once the worker has written the InterviewAnalysis row)
+    analysis = models.OneToOneField(
+        InterviewAnalysis, on_delete=models.SET_NULL, blank=True, null=True, related_name='job'
+    )
+    error = models.TextField(blank=True, null=True)
+    attempts = models.IntegerField(default=0)
+
+    # Timestamps
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(blank=True, null=True)  # Refreshed by the worker while running
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'analysis_jobs'
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"Analysis job {self.id} ({self.status}) for {self.user.name}"
+
+
+class ResumeExtractionCache(models.Model):
+    """
+    Content-addressed cache of resume text extraction and AI-structured data.
+    Keyed by the normalized text hash and the extraction prompt version, with the
+    uploaded file hash indexed so identical re-uploads skip text extraction too.
+    """
+    file_hash = models.CharField(max_length=64, db_index=True)
+    text_hash = models.CharField(max_length=64)
+    prompt_version = models.CharField(max_length=20)
+
+    raw_text = models.TextField(blank=True, default='')
+    ai_data = models.JSONField(blank=True, null=True)
+
+    hit_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = 'resume_extraction_cache'
+        unique_together = ('text_hash', 'prompt_version')
+
+    def __str__(self):
+        return f"Resume cache {self.text_hash[:12]} (v{self.prompt_version})"
+
+
+class RemoteRecordingFile(models.Model):
+    """
+    A recording already uploaded for analysis (Gemini Files API or GCS for
+    Vertex AI), keyed by content hash so identical recordings are not uploaded
+    and processed again while the remote copy is still available.
+    """
+    BACKEND_GEMINI = 'gemini'
+    BACKEND_VERTEX = 'vertex'
+    BACKEND_CHOICES = [
+        (BACKEND_GEMINI, 'Gemini Files API'),
+        (BACKEND_VERTEX, 'Vertex AI (GCS)'),
+    ]
+
+    content_hash = models.CharField(max_length=64)
+    backend = models.CharField(max_length=20, choices=BACKEND_CHOICES)
+
+    remote_name = models.CharField(max_length=500)  # Gemini file name (files/...) or gs:// URI
+    mime_type = models.CharField(max_length=100, blank=True, null=True)
+    expires_at = models.DateTimeField(blank=True, null=True)  # Gemini deletes files after 48 hours
+
+    hit_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'remote_recording_files'
+        unique_together = ('content_hash', 'backend')
+
+    def __str__(self):
+        return f"{self.backend} recording {self.content_hash[:12]} -> {self.remote_name}"
+
+
+class QuestionSet(models.Model):
+    """
+    An interview question set delivered progressively: generate_questions
+    returns the first questions as soon as they exist, and the rest are
+    written here as the model generates them, for the client to fetch
+    """
+    STATUS_GENERATING = 'generating'
+    STATUS_DONE = 'done'
+    STATUS_CHOICES = [
+        (STATUS_GENERATING, 'Generating'),
+        (STATUS_DONE, 'Done'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Firebase UID; questions can be generated before a profile exists
+    uid = models.CharField(max_length=255, db_index=True)
+    goal = models.CharField(max_length=50)
+    level = models.CharField(max_length=50)
+    domain = models.CharField(max_length=100)
+
+    total = models.IntegerField()
+    questions = models.JSONField(default=list, blank=True)  # Ready questions, in interview order
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_GENERATING)
+    error = models.TextField(blank=True, null=True)  # Why the model's questions were replaced by bank ones
+
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'question_sets'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Question set {self.id} ({len(self.questions)}/{self.total}, {self.status})"
@@ -0,0 +1,140 @@
+"""
+Compacting resume text and profile data before it goes into a prompt.
+
+Extracted resume text carries a lot that costs input tokens without helping
+the model: runs of whitespace, page headers and footers repeated on every
+page, bullet glyphs, page numbers. compact_resume normalizes the text, drops
+repeated lines, splits it into sections (resume_rules.split_sections) and
+packs whole lines of the most important sections for the task into its token
+budget, so a long resume loses its least useful lines rather than being cut
+at an arbitrary character.
+
+Token counts are estimated locally (estimate_tokens); no API call is made.
+"""
+import re
+
+from .resume_rules import FIELD_SECTIONS, SECTION_HEADINGS, split_sections
+
+# Estimated tokens of resume text per task (the name prompt used to get resume_text[:3000])
+NAME_TOKEN_BUDGET = 750
+
+# Section order when everything is wanted: what the extraction and interview prompts lean on most first
+SECTION_PRIORITY = (
+    'header', 'summary', 'experience', 'skills', 'education', 'projects',
+    'certifications', 'languages', 'other',
+)
+
+# Roughly one token per short word, per chunk of a long word, per 3 digits and per symbol
+TOKEN_PIECES = re.compile(r'[^\W\d_]{1,6}|\d{1,3}|[^\w\s]')
+INVISIBLE = re.compile('[\u00ad\u200b-\u200f\u2060\ufeff\x00-\x08\x0b\x0c\x0e-\x1f]')
+# Tabs and wide gaps separate columns; keep them apart as " | "
+COLUMN_GAP = re.compile(r'[ \t]*\t[ \t]*| {3,}')
+SPACES = re.compile('[ \u00a0\u2000-\u200a\u202f\u3000]+')
+BULLET_GLYPHS = re.compile(r'^[•▪●◦‣∙·➢➤►▶✓✔❖■□○◆◇*]+\s*')
+PAGE_FOOTER = re.compile(r'^(?:page\s*)?\d{1,3}(?:\s*(?:/|of)\s*\d{1,3})?$', re.IGNORECASE)
+# Lines this short repeat legitimately (dates, "Python", "Remote"); only longer ones are deduplicated
+MIN_DEDUP_CHARS = 24
+
+
+def estimate_tokens(text):
+    """Fast local estimate of the number of model tokens in text"""
+    return len(TOKEN_PIECES.findall(text)) if text else 0
+
+
+def normalize_lines(text):
+    """
+    Clean, non-empty lines of text: invisible characters removed, whitespace
+    collapsed, bullet glyphs turned into "- ", page numbers dropped and lines
+    of MIN_DEDUP_CHARS or more kept only the first time they appear.
+    """
+    lines = []
+    seen = set()
+    for line in INVISIBLE.sub('', text).splitlines():
+        line = BULLET_GLYPHS.sub('- ', line.strip())
+        line = SPACES.sub(' ', COLUMN_GAP.sub(' | ', line)).strip(' |')
+        if not line or PAGE_FOOTER.match(line):
+            continue
+        if len(line) >= MIN_DEDUP_CHARS:
+            key = line.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def compact_resume(text, budget, priority=SECTION_PRIORITY):
+    """
+    Resume text normalized and packed into about `budget` estimated tokens.
+    Sections are filled in priority order, each with as many of its lines as
+    still fit, and come out in the order they appear in the resume.
+    """
+    sections = split_sections("\n".join(normalize_lines(text)))
+    ranked = sorted(sections, key=lambda name: priority.index(name) if name in priority else len(priority))
+
+    kept = {}
+    remaining = budget
+    for name in ranked:
+        lines = sections[name]
+        heading = _section_heading(name)
+        if not lines or (heading and estimate_tokens(heading) + 1 >= remaining):
+            continue
+        if heading:
+            remaining -= estimate_tokens(heading) + 1
+        kept[name] = []
+        for line in lines:
+            cost = estimate_tokens(line) + 1
+            if cost > remaining:
+                break
+            kept[name].append(line)
+            remaining -= cost
+
+    return "\n\n".join(
+        "\n".join(([_section_heading(name)] if name != 'header' else []) + kept[name])
+        for name in sections if kept.get(name)
+    )
+
+
+def priority_for_fields(fields):
+    """Section order for a prompt asking only for these resume fields"""
+    wanted = [section for field in fields for section in FIELD_SECTIONS.get(field, ())]
+    return tuple(dict.fromkeys(wanted + list(SECTION_PRIORITY)))
+
+
+def unique_items(items, limit=None):
+    """Items as clean strings, with blanks and case-insensitive repeats dropped"""
+    seen = set()
+    kept = []
+    for item in items or []:
+        item = SPACES.sub(' ', str(item or '')).strip()
+        if item and item.lower() not in seen:
+            seen.add(item.lower())
+            kept.append(item)
+    return kept[:limit]
+
+
+def compact_list(items, limit=None):
+    """Comma-separated unique_items"""
+    return ', '.join(unique_items(items, limit))
+
+
+def clip(text, max_tokens):
+    """text cut at a word boundary to about max_tokens estimated tokens"""
+    text = ' '.join(str(text).split())
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    words = []
+    used = 0
+    for word in text.split(' '):
+        used += estimate_tokens(word)
+        if used > max_tokens:
+            break
+        words.append(word)
+    return ' '.join(words) + ' …'
+
+
+def _section_heading(name):
+    """The heading a section is written under in the compacted text"""
+    if name == 'header':
+        return ''
+    return SECTION_HEADINGS[name][0].upper() if name != 'other' else 'ADDITIONAL INFORMATION'
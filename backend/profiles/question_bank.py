@@ -0,0 +1,191 @@
+"""
+A local bank of interview questions, ranked against the candidate with TF-IDF.
+
+The bank (data/question_bank.json) is loaded and indexed once per process:
+by domain and difficulty, plus a TF-IDF matrix over each question's text and
+topics. A question set is picked by filling the
+difficulty mix for the interview level (easy questions first) with the
+questions most similar to the candidate's skills, strengths and project
+technologies, while spreading the picks over question types and topics.
+It takes milliseconds, so it serves interviews when the LLM is slow,
+switched off or failing.
+
+Without NumPy the bank still works, but the questions are not ranked against
+the candidate.
+"""
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # Questions are picked in bank order without NumPy
+    np = None
+
+BANK_PATH = os.path.join(os.path.dirname(__file__), 'data', 'question_bank.json')
+
+QUESTION_FIELDS = ('question', 'type', 'difficulty', 'topics', 'expected_answer_points')
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+# Share of each difficulty in a question set, per interview level
+LEVEL_DIFFICULTY_MIX = {
+    'internship': {'easy': 0.6, 'medium': 0.4, 'hard': 0.0},
+    'entry': {'easy': 0.4, 'medium': 0.45, 'hard': 0.15},
+    'mid': {'easy': 0.2, 'medium': 0.5, 'hard': 0.3},
+    'senior': {'easy': 0.1, 'medium': 0.4, 'hard': 0.5},
+}
+
+# Score taken off a question for each already-picked question of its type / sharing a topic
+TYPE_PENALTY = 0.05
+TOPIC_PENALTY = 0.1
+# Topics count this many times over the question text in the TF-IDF vectors
+TOPIC_WEIGHT = 2
+
+TOKEN = re.compile(r'[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]')
+STOPWORDS = frozenset(
+    'a an and are as at be between both by can do does each explain for from give has how i if in into is it '
+    'its of on one or over the their them then this to use used using want was what when where which while '
+    'who why with would you your'.split()
+)
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+def tokenize(text):
+    return [token.rstrip('.') for token in TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def level_key(level):
+    """Normalize a level id ('entry') or label ('Mid Level') to a LEVEL_DIFFICULTY_MIX key"""
+    level = (level or '').lower()
+    for key in ('intern', 'senior', 'mid'):
+        if key in level:
+            return 'internship' if key == 'intern' else key
+    return 'entry'
+
+
+def difficulty_plan(level, count):
+    """Difficulty of each question in a set of `count`, easiest first"""
+    mix = LEVEL_DIFFICULTY_MIX[level_key(level)]
+    shares = {difficulty: mix[difficulty] * count for difficulty in DIFFICULTIES}
+    counts = {difficulty: int(share) for difficulty, share in shares.items()}
+    # Largest remainder rounding, so the counts add up to `count`
+    for difficulty in sorted(DIFFICULTIES, key=lambda d: counts[d] - shares[d])[:count - sum(counts.values())]:
+        counts[difficulty] += 1
+    return [difficulty for difficulty in DIFFICULTIES for _ in range(counts[difficulty])]
+
+
+def candidate_terms(digest):
+    """Query text for a candidate digest: skills, strengths and project technologies"""
+    if not digest:
+        return ''
+    technologies = [tech for project in digest.get('recent_projects', []) for tech in project.get('technologies', [])]
+    return ' '.join(map(str, [*digest.get('top_skills', []), *digest.get('key_strengths', []), *technologies]))
+
+
+class QuestionBank:
+    """Questions indexed by domain and difficulty, with a TF-IDF matrix"""
+
+    def __init__(self, questions):
+        self.questions = questions
+        self.by_domain = {}
+        self.by_difficulty = {}
+        for index, question in enumerate(questions):
+            self.by_domain.setdefault(question['domain'], []).append(index)
+            self.by_difficulty.setdefault(question['difficulty'], []).append(index)
+        self._topics = [{topic.lower() for topic in question.get('topics', [])} for question in questions]
+        self._build_tfidf()
+
+    @classmethod
+    def load(cls, path=BANK_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _build_tfidf(self):
+        documents = [
+            tokenize(question['question']) + tokenize(' '.join(question.get('topics', []))) * TOPIC_WEIGHT
+            for question in self.questions
+        ]
+        document_frequency = Counter(token for tokens in documents for token in set(tokens))
+        self.vocabulary = {token: column for column, token in enumerate(sorted(document_frequency))}
+        # Smoothed idf, as scikit-learn computes it
+        self.idf = [
+            math.log((1 + len(documents)) / (1 + document_frequency[token])) + 1 for token in sorted(document_frequency)
+        ]
+        if np is None:
+            self.matrix = None
+            return
+
+        self.idf = np.array(self.idf)
+        self.matrix = np.zeros((len(documents), len(self.vocabulary)))
+        for row, tokens in enumerate(documents):
+            for token, count in Counter(tokens).items():
+                self.matrix[row, self.vocabulary[token]] = count
+        self.matrix *= self.idf
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        self.matrix /= np.where(norms, norms, 1)
+
+    def similarity(self, text):
+        """Cosine similarity of every question to text; zeros without NumPy or matching terms"""
+        if np is None:
+            return [0.0] * len(self.questions)
+        query = np.zeros(len(self.vocabulary))
+        for token, count in Counter(tokenize(text)).items():
+            column = self.vocabulary.get(token)
+            if column is not None:
+                query[column] = count
+        query *= self.idf
+        norm = np.linalg.norm(query)
+        if not norm:
+            return np.zeros(len(self.questions))
+        return self.matrix @ (query / norm)
+
+    def select(self, domain, level, count, digest=None):
+        """
+        `count` questions for the domain at the level's difficulty mix, easiest
+        first, most relevant to the candidate digest within each difficulty
+        """
+        scores = self.similarity(candidate_terms(digest))
+        in_domain = self.by_domain.get(domain) or list(range(len(self.questions)))
+        picked = []
+        type_counts = Counter()
+        topics_seen = Counter()
+
+        for difficulty in difficulty_plan(level, count):
+            wanted = set(self.by_difficulty.get(difficulty, ()))
+            pool = [index for index in in_domain if index in wanted and index not in picked]
+            # Past the domain's questions of this difficulty, take any other difficulty, then other domains
+            pool = pool or [index for index in in_domain if index not in picked]
+            pool = pool or [index for index in range(len(self.questions)) if index not in picked]
+            if not pool:
+                break
+            best = max(pool, key=lambda index: (
+                scores[index]
+                - TYPE_PENALTY * type_counts[self.questions[index]['type']]
+                - TOPIC_PENALTY * sum(topics_seen[topic] for topic in self._topics[index]),
+                -index,
+            ))
+            picked.append(best)
+            type_counts[self.questions[best]['type']] += 1
+            topics_seen.update(self._topics[best])
+
+        picked.sort(key=lambda index: DIFFICULTIES.index(self.questions[index]['difficulty']))
+        return [{field: self.questions[index][field] for field in QUESTION_FIELDS} for index in picked]
+
+
+def get_bank():
+    """The process-wide QuestionBank, loaded on first use"""
+    global _bank
+    with _bank_lock:
+        if _bank is None:
+            _bank = QuestionBank.load()
+        return _bank
+
+
+def bank_questions(domain, level, count, digest=None):
+    """A personalized question set from the local bank"""
+    return get_bank().select(domain, level, count, digest)
@@ -0,0 +1,182 @@
+"""
+Speculative pre-generation of the next interview question.
+
+While the candidate is still talking, the interview screen sends the answer so
+far to the prefetch endpoint whenever they pause. We start generating the
+follow-up for that partial answer right away and keep it in the cache for a
+short while, keyed by interview session, round and conversation so far. When
+the final answer arrives and matches what we speculated on, the question is
+served from the cache (or from the still-running call) instead of starting a
+fresh Gemini round trip.
+
+Finished speculations live in the shared cache (settings.CACHES), so any web
+worker can serve them. A speculation still being generated can only be waited
+on in the worker that started it; elsewhere it is a miss.
+"""
+import asyncio
+import hashlib
+import re
+import threading
+from concurrent.futures import Future
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .interview_ai import INTERVIEW_MODEL, build_question_prompt
+from .llm_client import generate_text, is_configured
+from . import background
+
+# Speculations kept per session/round/history; older ones are dropped
+MAX_CANDIDATES = 3
+
+# (cache key, normalized answer) -> Future, for generations still in flight
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+_stats = {'prefetched': 0, 'hits': 0, 'misses': 0, 'errors': 0}
+_stats_lock = threading.Lock()
+
+
+def normalize_answer(text):
+    """Lowercase, drop punctuation and collapse whitespace for matching"""
+    text = re.sub(r'[^\w\s]', ' ', (text or '').lower())
+    return ' '.join(text.split())
+
+
+def answers_match(speculated, final):
+    """True if the follow-up written for `speculated` still fits the final answer"""
+    if not speculated or not final:
+        return False
+    if speculated == final:
+        return True
+    # The cheap upper bounds rule out most misses before the quadratic ratio()
+    matcher = SequenceMatcher(None, speculated, final)
+    threshold = settings.QUESTION_PREFETCH_MATCH_RATIO
+    return (
+        matcher.real_quick_ratio() >= threshold
+        and matcher.quick_ratio() >= threshold
+        and matcher.ratio() >= threshold
+    )
+
+
+def cache_key(session_id, current_round, history_text):
+    digest = hashlib.sha256(f"{current_round}\n{history_text}".encode('utf-8')).hexdigest()
+    return f"question-prefetch:{session_id}:{digest}"
+
+
+def prefetch(session_id, history_text, user_profile, current_round, partial_answer):
+    """
+    Start generating the follow-up to `partial_answer` in the background.
+    Returns False if nothing was scheduled (not configured, or already known).
+    """
+    answer = normalize_answer(partial_answer)
+    if not session_id or not answer or not is_configured():
+        return False
+
+    key = cache_key(session_id, current_round, history_text)
+    candidates = cache.get(key) or []
+    if any(candidate['answer'] == answer for candidate in candidates):
+        return False
+
+    with _inflight_lock:
+        if (key, answer) in _inflight:
+            return False
+        future = Future()
+        _inflight[(key, answer)] = future
+
+    prompt = build_question_prompt(history_text, user_profile, current_round, partial_answer)
+    background.submit(_generate, key, answer, prompt, future)
+    _bump('prefetched')
+    return True
+
+
+def _generate(key, answer, prompt, future):
+    question = None
+    try:
+        question = generate_text(prompt, model_name=INTERVIEW_MODEL)
+        candidates = [c for c in (cache.get(key) or []) if c['answer'] != answer]
+        candidates.append({'answer': answer, 'question': question})
+        cache.set(key, candidates[-MAX_CANDIDATES:], settings.QUESTION_PREFETCH_TTL_SECONDS)
+    except Exception as e:
+        print(f"Error pre-generating question: {e}")
+        _bump('errors')
+    finally:
+        with _inflight_lock:
+            _inflight.pop((key, answer), None)
+        # Always resolved, so waiters in atake never hang on a failed speculation
+        future.set_result(question)
+
+
+async def atake(session_id, history_text, current_round, final_answer):
+    """
+    Return the pre-generated question matching `final_answer`, waiting for it if
+    it's still being generated, or None if there is no usable speculation or it
+    isn't ready within QUESTION_PREFETCH_WAIT_SECONDS.
+    """
+    if not session_id:
+        return None
+
+    key = cache_key(session_id, current_round, history_text)
+    answer = normalize_answer(final_answer)
+
+    # Matching runs SequenceMatcher over whole answers, so keep it off the event loop
+    candidates = await cache.aget(key) or []
+    question, future = await asyncio.to_thread(_match, key, candidates, answer)
+
+    if future is not None:
+        # Shielded so a timeout here doesn't cancel the speculation for other waiters
+        wait_seconds = min(settings.QUESTION_PREFETCH_WAIT_SECONDS, settings.LLM_TIMEOUT_SECONDS)
+        try:
+            question = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), wait_seconds)
+        except asyncio.TimeoutError:
+            print(f"⚠️  Pre-generated question not ready after {wait_seconds:.0f}s, generating a fresh one")
+
+    if question:
+        await cache.adelete(key)
+        _bump('hits')
+        print(f"⚡ Served pre-generated question ({_hit_rate():.0%} hit rate)")
+        return question
+
+    _bump('misses')
+    return None
+
+
+def _match(key, candidates, answer):
+    """
+    (question, None) for a finished speculation matching `answer`, (None, future)
+    for one still being generated, or (None, None)
+    """
+    for candidate in reversed(candidates):
+        if answers_match(candidate['answer'], answer):
+            return candidate['question'], None
+    return None, _find_inflight(key, answer)
+
+
+def _find_inflight(key, answer):
+    with _inflight_lock:
+        for (inflight_key, inflight_answer), future in _inflight.items():
+            if inflight_key == key and answers_match(inflight_answer, answer):
+                return future
+    return None
+
+
+def _bump(counter):
+    with _stats_lock:
+        _stats[counter] += 1
+
+
+def _hit_rate():
+    with _stats_lock:
+        return _rate(_stats)
+
+
+def _rate(stats):
+    served = stats['hits'] + stats['misses']
+    return stats['hits'] / served if served else 0.0
+
+
+def get_stats():
+    """Prefetch/hit/miss counters for this process"""
+    with _stats_lock:
+        return {**_stats, 'hit_rate': _rate(_stats)}
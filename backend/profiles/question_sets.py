@@ -0,0 +1,118 @@
+"""
+Progressive delivery of interview question sets.
+
+An interview only needs its first question to start, so generate_questions
+doesn't wait for the whole set. The set is streamed from the model on the
+background pool and each question is written to a QuestionSet row as soon as
+it is complete. The view returns once the first QUESTION_FIRST_BATCH questions
+are in, and the client fetches the rest from the row.
+
+If the model has not produced them within QUESTION_FIRST_BATCH_TIMEOUT_SECONDS,
+the first batch comes from the local question bank and the model's questions
+for those positions are skipped when they arrive. If the model fails or runs
+past QUESTION_LLM_TIMEOUT_SECONDS, the remaining positions are filled from the
+bank. Either way a set is always
+completed.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .llm_client import is_configured
+from .models import QuestionSet
+from .question_bank import bank_questions
+from .question_generator import QUESTION_COUNTS, stream_interview_questions
+from . import background
+
+
+class _Progress:
+    """
+    The questions of one set as they arrive, from the model and the bank.
+    Every change is written to the QuestionSet row under the lock, so the row
+    never goes back to an older list.
+    """
+
+    def __init__(self, question_set, bank_set):
+        self.question_set = question_set
+        self.bank_set = bank_set  # The bank's questions for the whole set, used position by position
+        self.first_batch = min(settings.QUESTION_FIRST_BATCH, question_set.total)
+        self.questions = []
+        self.model_count = 0
+        self.first_ready = Future()
+        self.lock = threading.Lock()
+
+    def add_from_model(self, question):
+        """A question streamed from the model; dropped if the bank already filled its position"""
+        if not isinstance(question, dict) or not question.get('question'):
+            return
+        with self.lock:
+            self.model_count += 1
+            if self.model_count <= len(self.questions) or len(self.questions) >= self.question_set.total:
+                return
+            self.questions.append(question)
+            self._save()
+
+    def fill_from_bank(self, upto):
+        """Fill positions up to `upto` with bank questions -> the questions ready now"""
+        with self.lock:
+            if len(self.questions) < upto:
+                self.questions.extend(self.bank_set[len(self.questions):upto])
+                self._save()
+            return list(self.questions)
+
+    def finish(self, error=None):
+        """Complete the set from the bank and mark it done"""
+        with self.lock:
+            self.questions.extend(self.bank_set[len(self.questions):self.question_set.total])
+            self._save(status=QuestionSet.STATUS_DONE, error=error)
+
+    def _save(self, **fields):
+        QuestionSet.objects.filter(id=self.question_set.id).update(questions=list(self.questions), **fields)
+        if len(self.questions) >= self.first_batch and not self.first_ready.done():
+            self.first_ready.set_result(list(self.questions))
+
+
+def _generate(progress, goal, level, domain, digest):
+    """Background task: stream the model's questions into the set"""
+    error = None
+    try:
+        stream_interview_questions(goal, level, domain, digest, progress.add_from_model)
+    except Exception as e:
+        print(f"❌ Error streaming questions with AI, finishing the set from the question bank: {e}")
+        error = str(e)
+    progress.finish(error)
+
+
+async def astart_question_set(uid, goal, level, domain, digest=None):
+    """
+    Create a question set and return (question_set, first questions). The rest
+    are generated in the background into the QuestionSet row.
+    """
+    total = QUESTION_COUNTS.get(goal, 5)
+    bank_set = bank_questions(domain, level, total, digest)
+
+    if not is_configured() or settings.QUESTION_SOURCE == 'bank':
+        print("Serving questions from the local question bank")
+        question_set = await QuestionSet.objects.acreate(
+            uid=uid, goal=goal, level=level, domain=domain, total=total,
+            questions=bank_set, status=QuestionSet.STATUS_DONE,
+        )
+        return question_set, bank_set
+
+    question_set = await QuestionSet.objects.acreate(uid=uid, goal=goal, level=level, domain=domain, total=total)
+    progress = _Progress(question_set, bank_set)
+    background.submit(_generate, progress, goal, level, domain, digest)
+
+    first_ready = asyncio.wrap_future(progress.first_ready)
+    # asyncio.wait, not wait_for: a timeout must not cancel the shared future
+    await asyncio.wait({first_ready}, timeout=settings.QUESTION_FIRST_BATCH_TIMEOUT_SECONDS)
+    if first_ready.done():
+        return question_set, first_ready.result()
+
+    print(f"⏱️  No questions from the model after {settings.QUESTION_FIRST_BATCH_TIMEOUT_SECONDS}s, "
+          f"starting with the question bank")
+    questions = await sync_to_async(progress.fill_from_bank)(progress.first_batch)
+    return question_set, questions
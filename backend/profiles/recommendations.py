@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import ResumeData
+from .gemini_analyzer import (
+    default_recommendations, generate_interview_recommendations, agenerate_interview_recommendations,
+    get_interview_recommendations,
+)
+from .llm_client import is_configured
+from .candidate_digest import aensure_digest, ensure_digest
+from . import background
+
+# (resume id, fingerprint) -> Future, so concurrent requests share one LLM call.
+# Across web workers, the one generating holds a lease in the shared cache
+# (settings.CACHES) and the others wait for its stored result.
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+# How often a worker waiting on another worker's lease checks it again
+LEASE_POLL_SECONDS = 0.5
+
+
+def resume_fingerprint(digest):
+    """Stable hash of the candidate digest the recommendations are based on"""
+    payload = json.dumps(digest, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def ensure_recommendations(resume_data):
+    """
+    Return recommendations for the current resume content, generating and
+    storing them only if the stored ones are missing or stale. A write racing
+    a newer upload is harmless: readers always compare the fingerprint with
+    the resume content they loaded.
+    """
+    digest = ensure_digest(resume_data)
+    fingerprint = resume_fingerprint(digest)
+
+    if resume_data.recommendations and resume_data.recommendations_fingerprint == fingerprint:
+        return resume_data.recommendations
+
+    if not is_configured():
+        # Defaults are not worth persisting; they'd mask real ones later
+        return get_interview_recommendations(digest)
+
+    key = (resume_data.id, fingerprint)
+    future, owner = _claim(key)
+    if not owner:
+        # Another request/background task is already generating these
+        return future.result()
+
+    try:
+        recommendations = _generate_once(resume_data, digest, fingerprint)
+        future.set_result(recommendations)
+        return recommendations
+    except BaseException as e:
+        # Waiters on the shared future must not block forever on a failed or cancelled owner
+        _fail(future, e)
+        raise
+    finally:
+        _release(key)
+
+
+async def aensure_recommendations(resume_data):
+    """Async version of ensure_recommendations, for the async views"""
+    digest = await aensure_digest(resume_data)
+    fingerprint = resume_fingerprint(digest)
+
+    if resume_data.recommendations and resume_data.recommendations_fingerprint == fingerprint:
+        return resume_data.recommendations
+
+    if not is_configured():
+        return get_interview_recommendations(digest)
+
+    key = (resume_data.id, fingerprint)
+    future, owner = _claim(key)
+    if not owner:
+        return await asyncio.wrap_future(future)
+
+    try:
+        recommendations = await _agenerate_once(resume_data, digest, fingerprint)
+        future.set_result(recommendations)
+        return recommendations
+    except BaseException as e:
+        # Waiters on the shared future must not block forever on a failed or cancelled owner
+        _fail(future, e)
+        raise
+    finally:
+        _release(key)
+
+
+def _generate_once(resume_data, digest, fingerprint):
+    """
+    Generate and store the recommendations under the cross-worker lease, or
+    return the ones another worker stored while this one waited for the lease
+    """
+    lease = _lease_key(resume_data.id, fingerprint)
+    while not cache.add(lease, True, _lease_seconds()):
+        time.sleep(LEASE_POLL_SECONDS)
+
+    try:
+        stored = _stored_query(resume_data.id, fingerprint).first()
+        if stored is not None:
+            return _use(resume_data, stored, fingerprint)
+
+        try:
+            recommendations = generate_interview_recommendations(digest)
+        except Exception as e:
+            print(f"Error getting recommendations with Gemini: {e}")
+            return default_recommendations("Default recommendation")
+
+        ResumeData.objects.filter(id=resume_data.id).update(
+            recommendations=recommendations,
+            recommendations_fingerprint=fingerprint,
+        )
+        return _use(resume_data, recommendations, fingerprint)
+    finally:
+        cache.delete(lease)
+
+
+async def _agenerate_once(resume_data, digest, fingerprint):
+    """Async version of `_generate_once`"""
+    lease = _lease_key(resume_data.id, fingerprint)
+    while not await cache.aadd(lease, True, _lease_seconds()):
+        await asyncio.sleep(LEASE_POLL_SECONDS)
+
+    try:
+        stored = await _stored_query(resume_data.id, fingerprint).afirst()
+        if stored is not None:
+            return _use(resume_data, stored, fingerprint)
+
+        try:
+            recommendations = await agenerate_interview_recommendations(digest)
+        except Exception as e:
+            print(f"Error getting recommendations with Gemini: {e}")
+            return default_recommendations("Default recommendation")
+
+        await ResumeData.objects.filter(id=resume_data.id).aupdate(
+            recommendations=recommendations,
+            recommendations_fingerprint=fingerprint,
+        )
+        return _use(resume_data, recommendations, fingerprint)
+    finally:
+        await cache.adelete(lease)
+
+
+def _lease_key(resume_id, fingerprint):
+    return f"recommendations-lease:{resume_id}:{fingerprint}"
+
+
+def _lease_seconds():
+    """Longest one generation can take with every retry, after which the lease lapses"""
+    attempts = settings.LLM_MAX_RETRIES + 1
+    backoff = settings.LLM_RETRY_BACKOFF_SECONDS * (2 ** settings.LLM_MAX_RETRIES - 1)
+    return int(settings.LLM_TIMEOUT_SECONDS * attempts + backoff) + 1
+
+
+def _stored_query(resume_id, fingerprint):
+    return ResumeData.objects.filter(
+        id=resume_id, recommendations_fingerprint=fingerprint,
+    ).values_list('recommendations', flat=True)
+
+
+def _use(resume_data, recommendations, fingerprint):
+    resume_data.recommendations = recommendations
+    resume_data.recommendations_fingerprint = fingerprint
+    return recommendations
+
+
+def _claim(key):
+    """Return (future, owner); owner is True if the caller must compute the result"""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return future, False
+        future = Future()
+        _inflight[key] = future
+        return future, True
+
+
+def _fail(future, error):
+    if not future.done():
+        if not isinstance(error, Exception):  # e.g. the owning request was cancelled
+            error = RuntimeError("Recommendation generation was interrupted")
+        future.set_exception(error)
+
+
+def _release(key):
+    with _inflight_lock:
+        _inflight.pop(key, None)
+
+
+def schedule_recommendations(resume_data):
+    """Generate recommendations in the background right after a resume upload"""
+    return background.submit(ensure_recommendations, resume_data)
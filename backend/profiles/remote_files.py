@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import RemoteRecordingFile
+
+# Don't hand out a Gemini file that is about to expire mid-analysis
+EXPIRY_MARGIN = timedelta(minutes=30)
+
+
+def lookup(content_hash, backend):
+    """Remote copy of an identical recording that is still usable, or None"""
+    if not content_hash:
+        return None
+
+    entry = RemoteRecordingFile.objects.filter(content_hash=content_hash, backend=backend).first()
+    if entry is None:
+        return None
+
+    if entry.expires_at and entry.expires_at <= timezone.now() + EXPIRY_MARGIN:
+        entry.delete()
+        return None
+
+    RemoteRecordingFile.objects.filter(id=entry.id).update(
+        last_used_at=timezone.now(),
+        hit_count=F('hit_count') + 1,
+    )
+    return entry
+
+
+def store(content_hash, backend, remote_name, mime_type=None, expires_at=None):
+    """Remember the remote copy of a recording for later analyses of the same content"""
+    if not content_hash:
+        return None
+
+    entry, _ = RemoteRecordingFile.objects.update_or_create(
+        content_hash=content_hash,
+        backend=backend,
+        defaults={
+            'remote_name': remote_name,
+            'mime_type': mime_type,
+            'expires_at': expires_at,
+            'last_used_at': timezone.now(),
+        }
+    )
+    return entry
+
+
+def forget(entry):
+    """Drop an entry whose remote file turned out to be gone or unusable"""
+    RemoteRecordingFile.objects.filter(id=entry.id).delete()
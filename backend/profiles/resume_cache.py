@@ -0,0 +1,83 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ResumeExtractionCache
+from .gemini_analyzer import RESUME_EXTRACTION_PROMPT_VERSION
+
+
+def hash_bytes(data):
+    """SHA-256 of the uploaded file bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(raw_text):
+    """SHA-256 of the resume text with whitespace normalized"""
+    normalized = ' '.join(raw_text.split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def lookup_by_file(file_hash):
+    """Cached entry for an identical previous upload, or None"""
+    entry = ResumeExtractionCache.objects.filter(
+        file_hash=file_hash,
+        prompt_version=RESUME_EXTRACTION_PROMPT_VERSION,
+    ).first()
+    if entry:
+        _touch(entry)
+    return entry
+
+
+def lookup_by_text(text_hash):
+    """Cached entry for a resume with the same normalized text, or None"""
+    entry = ResumeExtractionCache.objects.filter(
+        text_hash=text_hash,
+        prompt_version=RESUME_EXTRACTION_PROMPT_VERSION,
+    ).first()
+    if entry:
+        _touch(entry)
+    return entry
+
+
+def store(file_hash, text_hash, raw_text, ai_data):
+    """
+    Save (or refresh) a cache entry and evict the least recently used overflow.
+    A refreshed entry keeps the file hash it was created with, so the bytes
+    first uploaded keep hitting lookup_by_file.
+    """
+    fields = {
+        'raw_text': raw_text,
+        'ai_data': ai_data,
+        'last_used_at': timezone.now(),
+    }
+    entry, _ = ResumeExtractionCache.objects.update_or_create(
+        text_hash=text_hash,
+        prompt_version=RESUME_EXTRACTION_PROMPT_VERSION,
+        defaults=fields,
+        create_defaults={**fields, 'file_hash': file_hash},
+    )
+    evict()
+    return entry
+
+
+def evict(max_entries=None):
+    """Delete the least recently used entries beyond the configured size"""
+    if max_entries is None:
+        max_entries = settings.RESUME_CACHE_MAX_ENTRIES
+
+    overflow_ids = list(
+        ResumeExtractionCache.objects.order_by('-last_used_at')
+        .values_list('id', flat=True)[max_entries:]
+    )
+    if overflow_ids:
+        ResumeExtractionCache.objects.filter(id__in=overflow_ids).delete()
+    return len(overflow_ids)
+
+
+def _touch(entry):
+    ResumeExtractionCache.objects.filter(id=entry.id).update(
+        last_used_at=timezone.now(),
+        hit_count=F('hit_count') + 1,
+    )
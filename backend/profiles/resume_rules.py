@@ -0,0 +1,563 @@
+"""
+Local, section-aware resume parser: the first tier of resume extraction.
+
+The text is split into sections at recognised headings (Experience, Education,
+Projects, ...), each field is read from its section with rules, and each is
+scored with a confidence between 0 and 1 that the rules got it right (an
+empty value included: a resume without a Certifications heading most likely
+has no certifications). parse_resume keeps the fields at or above
+RESUME_RULES_MIN_CONFIDENCE and asks the LLM only for the rest, giving it just
+the sections those fields come from.
+"""
+import re
+from datetime import date
+
+from .skill_matcher import match_skills, skill_category
+
+RESUME_FIELDS = (
+    'full_name', 'email', 'phone', 'location', 'linkedin', 'github', 'website',
+    'summary', 'years_of_experience', 'skills', 'education', 'experience',
+    'projects', 'certifications', 'languages', 'key_strengths',
+)
+
+SECTION_HEADINGS = {
+    'summary': (
+        'summary', 'professional summary', 'career summary', 'profile', 'professional profile',
+        'about', 'about me', 'objective', 'career objective',
+    ),
+    'experience': (
+        'experience', 'work experience', 'professional experience', 'relevant experience',
+        'employment', 'employment history', 'work history', 'career history',
+        'internships', 'internship', 'internship experience',
+    ),
+    'education': (
+        'education', 'academic background', 'academics', 'academic qualifications',
+        'educational qualifications', 'qualifications', 'education and training',
+    ),
+    'projects': (
+        'projects', 'personal projects', 'academic projects', 'key projects', 'selected projects',
+        'side projects', 'project experience',
+    ),
+    'skills': (
+        'skills', 'technical skills', 'core skills', 'key skills', 'core competencies', 'competencies',
+        'technologies', 'tech stack', 'tools and technologies', 'skills and tools', 'skills and technologies',
+    ),
+    'certifications': (
+        'certifications', 'certification', 'certificates', 'licenses and certifications', 'courses',
+        'courses and certifications', 'certifications and courses',
+    ),
+    'languages': ('languages', 'spoken languages', 'language proficiency', 'language skills'),
+    'other': (
+        'achievements', 'awards', 'honors', 'honours', 'awards and achievements', 'accomplishments',
+        'publications', 'activities', 'extracurricular activities', 'extra curricular activities',
+        'volunteering', 'volunteer experience', 'leadership', 'positions of responsibility',
+        'interests', 'hobbies', 'references',
+    ),
+}
+HEADING_SECTIONS = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+# Where the LLM finds each field when it is asked for it; fields not listed get the whole text
+FIELD_SECTIONS = {
+    'full_name': ('header',),
+    'phone': ('header',),
+    'location': ('header',),
+    'experience': ('experience',),
+    'years_of_experience': ('experience',),
+    'education': ('education',),
+    'projects': ('projects',),
+    'certifications': ('certifications',),
+    'languages': ('languages',),
+}
+
+EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+PHONE = re.compile(r'(?<![\w/])\+?\(?\d[\d ().-]{7,}\d(?![\w/])')
+URL = re.compile(r'https?://(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9()@:%_\+.~#?&/=]*)')
+BARE_PROFILE_URL = re.compile(r'(?<![/\w.])(?:www\.)?(?:linkedin\.com/in|github\.com)/[-\w%]+/?', re.IGNORECASE)
+
+MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+DATE = rf'(?:{MONTH}\s*,?\s*(?:19|20)\d{{2}}|(?:0?[1-9]|1[0-2])[/.-](?:19|20)\d{{2}}|(?:19|20)\d{{2}})'
+DATE_RANGE = re.compile(
+    rf'({DATE})\s*(?:-|–|—|to|until)\s*({DATE}|present|current|now|today|till date|ongoing)',
+    re.IGNORECASE,
+)
+SINGLE_DATE = re.compile(DATE, re.IGNORECASE)
+YEAR = re.compile(r'\b(?:19|20)\d{2}\b')
+MONTHS = {name: number for number, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1
+)}
+
+BULLET = re.compile(r'^\s*(?:[-•*▪●◦‣∙·–]|\d+[.)])\s*')
+# Between the parts of an entry's header line ("Engineer | Acme, Pune | 2020 - 2022")
+SEPARATORS = re.compile(r'\s*(?:\||•|·|\t|\s{3,}|\s[-–—]\s|,\s|\bat\b|@)\s*')
+# Between the parts of a contact line, where "City, Country" stays whole
+CONTACT_SEPARATORS = re.compile(r'\s*(?:\||•|·|\t|\s{3,}|\s[-–—]\s)\s*')
+LABEL = re.compile(r'^\s*([A-Za-z][A-Za-z &/]{1,38}?)\s*:\s*(.+)$')
+
+JOB_TITLE_WORDS = {
+    'engineer', 'developer', 'manager', 'intern', 'analyst', 'designer', 'consultant', 'lead',
+    'architect', 'scientist', 'specialist', 'associate', 'officer', 'director', 'head', 'administrator',
+    'assistant', 'coordinator', 'researcher', 'teacher', 'trainee', 'fellow', 'programmer', 'founder',
+    'co-founder', 'cto', 'ceo', 'vp', 'president', 'tester', 'sde', 'swe', 'technician', 'executive',
+    'instructor', 'tutor', 'volunteer', 'freelancer', 'contractor', 'member', 'representative', 'owner',
+}
+NOT_A_NAME = {'resume', 'curriculum', 'vitae', 'cv', 'profile', 'summary', 'contact', 'portfolio'} | JOB_TITLE_WORDS
+
+DEGREE = re.compile(
+    r"\b(?:[BM]\.?\s?(?:Tech|Sc|Com|E|S|A)\.?|BCA|MCA|BBA|MBA|Ph\.?\s?D\.?|HSC|SSC|CBSE|ICSE)(?![A-Za-z])"
+    r"|(?i:\b(?:bachelor'?s?|master'?s?|doctor(?:ate)?|associate degree|diploma|high school|higher secondary|"
+    r"senior secondary|secondary school|matriculation|12th|10th|class (?:x|xii))\b)",
+)
+INSTITUTION = re.compile(
+    r'\b(?:university|college|institute|institution|school|academy|polytechnic|iit|nit|iiit|bits)\b',
+    re.IGNORECASE,
+)
+TECHNOLOGIES_LABEL = re.compile(r'^\s*(?:tech(?:nologies|nology| stack)?|tools|built with|stack)\s*[:\-–]\s*', re.IGNORECASE)
+CITY = re.compile(r"^[A-Z][A-Za-z .'-]+,\s*[A-Z][A-Za-z .'-]+$")
+LOCATION_LABEL = re.compile(r'^\s*(?:location|address|based in)\s*[:\-–]?\s*(.+)$', re.IGNORECASE)
+SPACED_CAPITALS = re.compile(r'^(?:[A-Z] ){3,}[A-Z]$')
+EMPTY_BRACKETS = re.compile(r'\(\s*\)')
+
+
+class RuleExtraction:
+    """Field values read by the rules, their confidences and the resume's sections"""
+
+    def __init__(self, data, confidence, sections):
+        self.data = data
+        self.confidence = confidence
+        self.sections = sections
+
+    def gaps(self, threshold):
+        """Fields the rules are not confident enough about, in RESUME_FIELDS order"""
+        return [field for field in RESUME_FIELDS if self.confidence[field] < threshold]
+
+    def context_for(self, fields, full_text):
+        """The resume text the LLM needs to fill these fields: their sections, or all of it"""
+        names = []
+        for field in fields:
+            sections = [name for name in FIELD_SECTIONS.get(field, ()) if self.sections.get(name)]
+            if not sections:
+                return full_text
+            names.extend(name for name in sections if name not in names)
+        return "\n\n".join(
+            ("\n".join(self.sections[name]) if name == 'header' else f"{name.upper()}\n" + "\n".join(self.sections[name]))
+            for name in names
+        )
+
+
+def extract(text):
+    """Run every field rule over resume text and return a RuleExtraction"""
+    sections = split_sections(text)
+    lines = [line for section in sections.values() for line in section]
+    header = sections.get('header') or lines[:8]
+    data, confidence = {}, {}
+
+    def put(field, value, score):
+        data[field] = value
+        confidence[field] = score
+
+    email = _first_match(EMAIL, header) or _first_match(EMAIL, lines)
+    put('email', email, 1.0)  # A regex finds every address the model could
+    put('full_name', *_full_name(header, email))
+
+    phone = _phone(header) or _phone(lines)
+    put('phone', phone, 0.9 if phone else 0.8)
+
+    linkedin, github, website = _links(text)
+    put('linkedin', linkedin, 1.0)
+    put('github', github, 1.0)
+    put('website', website, 1.0)
+    put('location', *_location(header))
+
+    skill_counts = match_skills(BARE_PROFILE_URL.sub(' ', URL.sub(' ', text)))
+    put('skills', *_skills(sections.get('skills'), skill_counts))
+    put('experience', *_experience(sections.get('experience'), text))
+    years, years_confidence = _years_of_experience(data['experience'], confidence['experience'])
+    put('years_of_experience', years, years_confidence)
+    put('education', *_education(sections.get('education'), lines))
+    put('projects', *_projects(sections.get('projects')))
+    put('certifications', *_list_section(sections.get('certifications'), missing_confidence=0.8))
+    put('languages', *_languages(sections.get('languages')))
+    put('key_strengths', *_key_strengths(skill_counts))
+    put('summary', *_summary(sections.get('summary'), data))
+
+    return RuleExtraction(data, confidence, sections)
+
+
+def split_sections(text):
+    """{section: [line, ...]} with 'header' holding the lines before the first heading"""
+    sections = {'header': []}
+    current = 'header'
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        if SPACED_CAPITALS.match(line):
+            line = line.replace(' ', '')
+
+        section = _heading_section(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+
+        # "Skills: Python, Java" heads a section inline, except inside a skills
+        # section, where "Languages: ..." is a skill category
+        label = LABEL.match(line)
+        if label and current != 'skills':
+            section = HEADING_SECTIONS.get(_heading_key(label.group(1)))
+            if section:
+                current = section
+                sections.setdefault(current, []).append(label.group(2).strip())
+                continue
+
+        sections[current].append(line)
+    return sections
+
+
+def _heading_key(line):
+    key = BULLET.sub('', line).replace('&', ' and ').lower()
+    key = re.sub(r'[^a-z ]', ' ', key)
+    return ' '.join(key.split())
+
+
+def _heading_section(line):
+    if len(line.split()) > 5 or line.endswith(('.', ',')):
+        return None
+    return HEADING_SECTIONS.get(_heading_key(line))
+
+
+def _first_match(pattern, lines):
+    for line in lines:
+        match = pattern.search(line)
+        if match:
+            return match.group(0)
+    return None
+
+
+def _phone(lines):
+    """First run of 10-15 digits (with spaces, dots, dashes, brackets) that isn't a date range"""
+    for line in lines:
+        for match in PHONE.finditer(line):
+            candidate = match.group(0).strip()
+            if 10 <= sum(char.isdigit() for char in candidate) <= 15 and not DATE_RANGE.search(candidate):
+                return candidate
+    return None
+
+
+def _clean_part(part):
+    part = part.strip(' |,;')
+    if part.startswith('(') and part.endswith(')'):
+        part = part[1:-1].strip()
+    return part
+
+
+def _full_name(header, email):
+    email_tokens = set()
+    if email:
+        local_part = re.sub(r'^\d{4}\.', '', email.split('@')[0])
+        email_tokens = {part.lower() for part in re.split(r'[._\-\d]', local_part) if len(part) > 1}
+
+    for position, line in enumerate(header[:6]):
+        candidate = CONTACT_SEPARATORS.split(line)[0].strip()
+        if not _looks_like_name(candidate):
+            continue
+        name = candidate.title() if candidate.isupper() else candidate
+        words = {word.lower() for word in name.split()}
+        if email_tokens & words:
+            return name, 0.95
+        return name, 0.8 if position == 0 else 0.6
+
+    if email_tokens:
+        return ' '.join(part.capitalize() for part in sorted(email_tokens, key=email.lower().find)), 0.5
+    return None, 0.0
+
+
+def _looks_like_name(text):
+    words = text.split()
+    if not 2 <= len(words) <= 4:
+        return False
+    for word in words:
+        bare = word.replace('-', '').replace("'", '').replace('.', '')
+        if not bare.isalpha() or not word[0].isupper() or word.lower().strip('.') in NOT_A_NAME:
+            return False
+    return not match_skills(text)
+
+
+def _links(text):
+    urls = URL.findall(text) + [
+        match if match.lower().startswith('http') else f"https://{match}"
+        for match in BARE_PROFILE_URL.findall(text)
+    ]
+    linkedin = github = website = None
+    for url in urls:
+        lowered = url.lower()
+        if 'linkedin.com' in lowered:
+            linkedin = linkedin or url
+        elif 'github.com' in lowered:
+            github = github or url
+        elif not website:
+            website = url
+    return linkedin, github, website
+
+
+def _location(header):
+    for line in header:
+        labelled = LOCATION_LABEL.match(line)
+        if labelled:
+            return labelled.group(1).strip(), 0.85
+    for line in header:
+        for part in CONTACT_SEPARATORS.split(line):
+            part = part.strip()
+            if CITY.match(part) and not EMAIL.search(part) and len(part) <= 40:
+                return part, 0.7
+    # Most resumes that give a location put it in the header in one of the forms above
+    return None, 0.6
+
+
+def _skills(skills_section, skill_counts):
+    skills = [skill for skill, _ in skill_counts.most_common()]
+    known = {skill.lower() for skill in skills}
+
+    # Items listed under a skills heading count even when the taxonomy lacks them
+    for line in skills_section or ():
+        label = LABEL.match(line)
+        items = label.group(2) if label else BULLET.sub('', line)
+        for item in re.split(r'\s*[,;|•/]\s*', items):
+            item = item.strip(' .')
+            if not item or len(item) > 40 or len(item.split()) > 4 or item.lower() in known:
+                continue
+            if not match_skills(item):
+                skills.append(item)
+                known.add(item.lower())
+
+    if skills_section:
+        return skills, 0.9
+    if len(skills) >= 5:
+        return skills, 0.8
+    return skills, 0.6 if skills else 0.3
+
+
+def _entry_groups(lines):
+    """
+    Split a section into entries: each is a run of short header lines (title,
+    company, dates) followed by its bullet/description lines.
+    """
+    groups = []
+    for line in lines:
+        # Bullets, sentences and "Label: value" lines describe the entry above them
+        is_bullet = bool(BULLET.match(line)) or len(line.split()) > 12 or bool(groups and LABEL.match(line))
+        if is_bullet and groups:
+            groups[-1]['body'].append(BULLET.sub('', line))
+        elif is_bullet:
+            groups.append({'head': [], 'body': [BULLET.sub('', line)]})
+        elif not groups or groups[-1]['body']:
+            groups.append({'head': [line], 'body': []})
+        else:
+            groups[-1]['head'].append(line)
+    return groups
+
+
+def _experience(section, text):
+    if not section:
+        # No heading: dated entries elsewhere mean the rules missed the section
+        undated = not DATE_RANGE.search(text)
+        return [], 0.7 if undated else 0.3
+
+    entries = []
+    for group in _entry_groups(section):
+        duration = None
+        parts = []
+        for line in group['head']:
+            found = DATE_RANGE.search(line)
+            if found and not duration:
+                duration = _clean_range(found)
+                line = EMPTY_BRACKETS.sub(' ', line[:found.start()] + ' ' + line[found.end():])
+            parts.extend(_clean_part(part) for part in SEPARATORS.split(line))
+        parts = [part for part in parts if part and not CITY.match(part) and not YEAR.fullmatch(part)]
+
+        title = next((part for part in parts if JOB_TITLE_WORDS & set(re.findall(r"[a-z-]+", part.lower()))), None)
+        company = next((part for part in parts if part != title), None)
+        if not (title or company or duration):
+            continue
+        if entries and title and not company:
+            company = entries[-1]['company']  # Another role at the same company
+        entries.append({
+            'title': title or '',
+            'company': company or '',
+            'duration': duration,
+            'description': _sentences(group['body']),
+        })
+
+    if not entries:
+        return [], 0.3
+    complete = sum(1 for entry in entries if entry['title'] and entry['company'] and entry['duration'])
+    return entries, round(0.5 + 0.45 * complete / len(entries), 2)
+
+
+def _sentences(lines):
+    """Bullet lines joined into one description, or None"""
+    text = ' '.join(line if line.endswith(('.', '!', '?')) else f"{line}." for line in lines)
+    return text or None
+
+
+def _clean_range(match):
+    """"Jan 2020 - Present" from a DATE_RANGE match"""
+    start, end = (' '.join(part.split()) for part in match.groups())
+    if not SINGLE_DATE.fullmatch(end):
+        end = end.title()
+    return f"{start} - {end}"
+
+
+def _years_of_experience(experience, experience_confidence):
+    """Whole years covered by non-internship roles, overlapping roles counted once"""
+    intervals = []
+    for entry in experience:
+        title = entry['title'].lower()
+        if not entry['duration'] or 'intern' in title or 'trainee' in title:
+            continue
+        start_text, _, end_text = entry['duration'].partition(' - ')
+        start, end = _month_index(start_text), _month_index(end_text)
+        if start is not None and end is not None and end >= start:
+            intervals.append((start, end))
+
+    months = 0
+    covered_until = None
+    for start, end in sorted(intervals):
+        if covered_until is not None and start <= covered_until:
+            if end > covered_until:
+                months += end - covered_until
+                covered_until = end
+            continue
+        months += end - start + 1
+        covered_until = end
+    return round(months / 12), experience_confidence
+
+
+def _month_index(text):
+    """Months since year 0 for "Jan 2020", "01/2020", "2020" or "Present" (years alone: mid-year)"""
+    text = text.strip().lower()
+    if text in ('present', 'current', 'now', 'today', 'till date', 'ongoing'):
+        today = date.today()
+        return today.year * 12 + today.month
+    year = YEAR.search(text)
+    if not year:
+        return None
+    month = MONTHS.get(text[:3])
+    numeric = re.match(r'(\d{1,2})[/.-]', text)
+    if numeric:
+        month = int(numeric.group(1))
+    return int(year.group(0)) * 12 + (month or 6)
+
+
+def _education(section, lines):
+    source = section or [line for line in lines if DEGREE.search(line)]
+    entries = []
+    entry = None
+    for line in source:
+        line = BULLET.sub('', line)
+        degree = DEGREE.search(line)
+        institution = INSTITUTION.search(line)
+        if entry is None or (degree and entry['degree']) or (institution and entry['institution'] and not degree):
+            entry = {'degree': '', 'institution': '', 'year': None}
+            entries.append(entry)
+        parts = [_clean_part(part) for part in SEPARATORS.split(EMPTY_BRACKETS.sub(' ', DATE_RANGE.sub(' ', line)))]
+        for part in parts:
+            if not part or YEAR.fullmatch(part):
+                continue
+            if YEAR.search(part):
+                part = ' '.join(YEAR.sub(' ', part).split()).rstrip(' .,')
+            if DEGREE.search(part) and not entry['degree']:
+                entry['degree'] = part
+            elif INSTITUTION.search(part) and not entry['institution']:
+                entry['institution'] = part
+        years = YEAR.findall(line)
+        if years:
+            entry['year'] = max(years)
+
+    entries = [entry for entry in entries if entry['degree'] or entry['institution']]
+    if not section:
+        return entries, 0.4 if entries else 0.7
+    if not entries:
+        return [], 0.3
+    complete = sum(1 for entry in entries if entry['degree'] and entry['institution'])
+    return entries, round(0.5 + 0.45 * complete / len(entries), 2)
+
+
+def _projects(section):
+    if not section:
+        return [], 0.7
+
+    projects = []
+    for group in _entry_groups(section):
+        head = [line for line in group['head'] if not TECHNOLOGIES_LABEL.match(line)]
+        body = [line for line in group['body'] if not TECHNOLOGIES_LABEL.match(line)]
+        labelled = [
+            TECHNOLOGIES_LABEL.sub('', line)
+            for line in group['head'] + group['body'] if TECHNOLOGIES_LABEL.match(line)
+        ]
+        if not head:
+            if projects:
+                projects[-1]['description'] = _sentences(filter(None, [projects[-1]['description'], *body]))
+            continue
+
+        name = CONTACT_SEPARATORS.split(DATE_RANGE.sub('', head[0]), maxsplit=1)[0]
+        description = _sentences([*head[1:], *body])
+        if labelled:
+            technologies = [item.strip() for item in re.split(r'\s*[,;|/]\s*', ', '.join(labelled)) if item.strip()]
+        else:
+            technologies = list(match_skills(' '.join(group['head'] + group['body'])))
+        projects.append({'name': name.strip(' :-–|'), 'description': description, 'technologies': technologies})
+
+    return projects, 0.85 if projects else 0.3
+
+
+def _list_section(section, missing_confidence):
+    if not section:
+        return [], missing_confidence
+    items = [BULLET.sub('', line).strip() for line in section]
+    return [item for item in items if len(item) > 2], 0.9
+
+
+def _languages(section):
+    if not section:
+        return [], 0.7
+    languages = []
+    for line in section:
+        for item in re.split(r'\s*[,;|•]\s*', BULLET.sub('', line)):
+            language = re.split(r'\s*[(\-–:]', item, maxsplit=1)[0].strip()
+            if language and language.replace(' ', '').isalpha() and not match_skills(language):
+                languages.append(language)
+    return languages, 0.9 if languages else 0.4
+
+
+def _key_strengths(skill_counts):
+    """Strongest skill areas: the taxonomy categories with the most skill mentions"""
+    by_category = {}
+    for skill, count in skill_counts.most_common():
+        category = skill_category(skill)
+        if category:
+            by_category.setdefault(category, []).append((skill, count))
+    ranked = sorted(by_category.items(), key=lambda item: -sum(count for _, count in item[1]))
+    strengths = [f"{category} ({', '.join(skill for skill, _ in skills[:3])})" for category, skills in ranked[:4]]
+    return strengths, 0.65 if len(strengths) >= 2 else 0.4
+
+
+def _summary(section, data):
+    if section:
+        return ' '.join(section), 0.9
+
+    # No summary written: compose a short one from the other fields
+    top_skills = data['skills'][:3]
+    if not top_skills:
+        return None, 0.3
+    skills_text = ', '.join(top_skills[:-1]) + f" and {top_skills[-1]}" if len(top_skills) > 1 else top_skills[0]
+    title = next((entry['title'] for entry in data['experience'] if entry['title']), None)
+    if title and data['years_of_experience']:
+        years = data['years_of_experience']
+        return f"{title} with {years} year{'s' if years != 1 else ''} of experience in {skills_text}.", 0.65
+    if title:
+        return f"{title} experienced in {skills_text}.", 0.65
+    degree = next((entry['degree'] for entry in data['education'] if entry['degree']), None)
+    if degree:
+        return f"{degree} candidate skilled in {skills_text}.", 0.65
+    return f"Candidate skilled in {skills_text}.", 0.5
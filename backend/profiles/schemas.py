@@ -0,0 +1,283 @@
+"""
+Response schemas for every JSON-producing LLM task.
+
+Each task pairs a schema (the OpenAPI subset Gemini's JSON mode accepts: type,
+properties, required, items, enum, nullable) with an output token cap. The
+schema is sent as `response_schema` with `response_mime_type` set to JSON, so
+the model returns bare, well-formed JSON, and the same schema is compiled once
+at import into a validator for the parsed result. The caps bound generation
+time per task; gemini-2.5 models count their thinking tokens against them too,
+so they leave headroom above the JSON itself.
+"""
+import functools
+import json
+
+
+class SchemaValidationError(ValueError):
+    """A model response did not match its task's schema"""
+
+
+def _string(**extra):
+    return {'type': 'string', **extra}
+
+
+def _integer():
+    return {'type': 'integer'}
+
+
+def _strings():
+    return {'type': 'array', 'items': _string()}
+
+
+def _object(properties, required=None):
+    schema = {'type': 'object', 'properties': properties}
+    if required:
+        schema['required'] = list(required)
+    return schema
+
+
+LEVEL = _string(enum=['low', 'moderate', 'high'])
+
+QUESTION_SET_SCHEMA = {
+    'type': 'array',
+    'items': _object({
+        'question': _string(),
+        'type': _string(enum=['conceptual', 'coding', 'scenario']),
+        'difficulty': _string(enum=['easy', 'medium', 'hard']),
+        'topics': _strings(),
+        'expected_answer_points': _strings(),
+    }, required=['question', 'type', 'difficulty']),
+}
+
+RECOMMENDATIONS_SCHEMA = _object({
+    'goal': _string(enum=['Full Technical Interview', 'Focused Practice', 'Quick Mock']),
+    'target_level': _string(enum=['Entry Level', 'Mid Level', 'Senior Level']),
+    'domain': _string(),
+    'reasoning': _object({
+        'goal_reason': _string(),
+        'level_reason': _string(),
+        'domain_reason': _string(),
+    }, required=['goal_reason', 'level_reason', 'domain_reason']),
+}, required=['goal', 'target_level', 'domain', 'reasoning'])
+
+RESUME_DATA_SCHEMA = _object({
+    'full_name': _string(nullable=True),
+    'email': _string(nullable=True),
+    'phone': _string(nullable=True),
+    'location': _string(nullable=True),
+    'linkedin': _string(nullable=True),
+    'github': _string(nullable=True),
+    'website': _string(nullable=True),
+    'summary': _string(nullable=True),
+    'years_of_experience': {'type': 'number'},
+    'skills': _strings(),
+    'education': {'type': 'array', 'items': _object({
+        'degree': _string(),
+        'institution': _string(),
+        'year': _string(nullable=True),
+    })},
+    'experience': {'type': 'array', 'items': _object({
+        'title': _string(),
+        'company': _string(),
+        'duration': _string(nullable=True),
+        'description': _string(nullable=True),
+    })},
+    'projects': {'type': 'array', 'items': _object({
+        'name': _string(),
+        'description': _string(nullable=True),
+        'technologies': _strings(),
+    })},
+    'certifications': _strings(),
+    'languages': _strings(),
+    'key_strengths': _strings(),
+}, required=['full_name', 'skills', 'education', 'experience', 'projects'])
+
+PERFORMANCE_ANALYSIS_SCHEMA = _object({
+    'response_delay_average': _string(),
+    'response_delay_range': _string(),
+    'response_pattern': _string(),
+    'response_timing': _string(),
+    'speaking_pace_wpm': _string(),
+    'speaking_pace': _string(),
+    'filler_words': _string(),
+    'filler_word_count': _integer(),
+    'confidence_score': _integer(),
+    'confidence_breakdown': _object({
+        'introduction': _integer(),
+        'technical_questions': _integer(),
+        'problem_solving': _integer(),
+        'behavioral_round': _integer(),
+    }),
+    'emotion_trend': _string(),
+    'voice_tone_analysis': _string(),
+    'communication_analysis': _string(),
+    'strengths': _strings(),
+    'improvements': _strings(),
+}, required=['confidence_score', 'emotion_trend', 'communication_analysis', 'strengths', 'improvements'])
+
+INTEGRITY_ANALYSIS_SCHEMA = _object({
+    'eye_contact_percentage': _string(),
+    'eye_movement_breakdown': _object({
+        'direct_contact': _string(),
+        'thinking_away': _string(),
+        'reading_down': _string(),
+        'distraction': _string(),
+    }),
+    'gaze_behavior': _string(),
+    'eye_movement_pattern': _string(),
+    'attention_level': LEVEL,
+    'cheating_risk_score': _integer(),
+    'suspicion_risk': LEVEL,
+    'integrity_notes': _string(),
+    'cheating_indicators': _object({
+        'reading_behavior': _string(),
+        'off_screen_looking': _string(),
+        'audio_anomalies': _string(),
+        'unnatural_pauses': _string(),
+        'fluency_changes': _string(),
+    }),
+    'head_movement': _string(),
+    'body_language_metrics': _object({
+        'posture_changes': _string(),
+        'fidgeting_level': _string(),
+        'hand_gestures': _string(),
+        'facial_expressions': _string(),
+    }),
+}, required=['eye_movement_pattern', 'attention_level', 'suspicion_risk', 'integrity_notes'])
+
+TECHNICAL_ANALYSIS_SCHEMA = _object({
+    'technical_analysis': _string(),
+    'technical_accuracy': _string(),
+    'technical_accuracy_score': _integer(),
+    'knowledge_depth': _string(),
+    'missing_concepts': _strings(),
+    'technical_tips': _strings(),
+    'learning_resources': {'type': 'array', 'items': _object({
+        'topic': _string(),
+        'description': _string(),
+    }, required=['topic', 'description'])},
+}, required=['technical_accuracy_score', 'technical_accuracy'])
+
+
+def compile_validator(schema):
+    """
+    Turn a schema into a function that checks a parsed JSON value against it
+    and raises SchemaValidationError naming the first offending path. The
+    schema is walked once here, not on every call.
+    """
+    kind = schema.get('type')
+    nullable = schema.get('nullable', False)
+    checks = []
+
+    if kind == 'object':
+        required = tuple(schema.get('required', ()))
+        properties = {name: compile_validator(sub) for name, sub in schema.get('properties', {}).items()}
+
+        def check_object(value, path):
+            if not isinstance(value, dict):
+                raise SchemaValidationError(f"{path}: expected an object")
+            for name in required:
+                if name not in value:
+                    raise SchemaValidationError(f"{path}.{name}: required")
+            for name, validate in properties.items():
+                if name in value:
+                    validate(value[name], f"{path}.{name}")
+        checks.append(check_object)
+
+    elif kind == 'array':
+        validate_item = compile_validator(schema['items']) if 'items' in schema else None
+
+        def check_array(value, path):
+            if not isinstance(value, list):
+                raise SchemaValidationError(f"{path}: expected an array")
+            if validate_item:
+                for index, item in enumerate(value):
+                    validate_item(item, f"{path}[{index}]")
+        checks.append(check_array)
+
+    elif kind in _SCALAR_TYPES:
+        expected = _SCALAR_TYPES[kind]
+
+        def check_scalar(value, path):
+            if not isinstance(value, expected) or (kind != 'boolean' and isinstance(value, bool)):
+                raise SchemaValidationError(f"{path}: expected {kind}, got {type(value).__name__}")
+        checks.append(check_scalar)
+
+    if 'enum' in schema:
+        allowed = frozenset(schema['enum'])
+
+        def check_enum(value, path):
+            if value not in allowed:
+                raise SchemaValidationError(f"{path}: {value!r} is not one of {sorted(allowed)}")
+        checks.append(check_enum)
+
+    def validate(value, path='$'):
+        if value is None:
+            if nullable:
+                return
+            raise SchemaValidationError(f"{path}: must not be null")
+        for check in checks:
+            check(value, path)
+
+    return validate
+
+
+_SCALAR_TYPES = {
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool,
+}
+
+
+class JsonTask:
+    """A JSON-producing LLM task: its response schema, output cap and validator"""
+
+    def __init__(self, name, schema, max_output_tokens):
+        self.name = name
+        self.schema = schema
+        self.max_output_tokens = max_output_tokens
+        self.validate = compile_validator(schema)
+
+    @property
+    def generation_config(self):
+        return {
+            'response_mime_type': 'application/json',
+            'response_schema': self.schema,
+            'max_output_tokens': self.max_output_tokens,
+        }
+
+    def parse(self, response_text):
+        """Parse and validate a response; raises SchemaValidationError if it doesn't fit"""
+        try:
+            data = json.loads(response_text)
+        except json.JSONDecodeError as e:
+            # Only happens when the output was cut off at max_output_tokens
+            raise SchemaValidationError(f"{self.name}: invalid JSON ({e})")
+        self.validate(data)
+        return data
+
+
+QUESTION_SET = JsonTask('question_set', QUESTION_SET_SCHEMA, max_output_tokens=8192)
+RECOMMENDATIONS = JsonTask('recommendations', RECOMMENDATIONS_SCHEMA, max_output_tokens=2048)
+RESUME_DATA = JsonTask('resume_data', RESUME_DATA_SCHEMA, max_output_tokens=8192)
+PERFORMANCE_ANALYSIS = JsonTask('performance_analysis', PERFORMANCE_ANALYSIS_SCHEMA, max_output_tokens=8192)
+INTEGRITY_ANALYSIS = JsonTask('integrity_analysis', INTEGRITY_ANALYSIS_SCHEMA, max_output_tokens=8192)
+TECHNICAL_ANALYSIS = JsonTask('technical_analysis', TECHNICAL_ANALYSIS_SCHEMA, max_output_tokens=8192)
+
+
+@functools.lru_cache(maxsize=None)
+def _resume_fields_task(fields):
+    properties = RESUME_DATA_SCHEMA['properties']
+    return JsonTask(
+        'resume_fields',
+        _object({name: properties[name] for name in fields}, required=fields),
+        max_output_tokens=RESUME_DATA.max_output_tokens,
+    )
+
+
+def resume_data_task(fields=None):
+    """The resume extraction task, narrowed to `fields` when only some are asked for"""
+    if not fields:
+        return RESUME_DATA
+    return _resume_fields_task(tuple(fields))
@@ -0,0 +1,154 @@
+"""
+Splitting long interview recordings into segments for map-reduce analysis.
+
+Uses the ffmpeg binary when it is installed (on the PATH, or the static build
+that ships with the imageio-ffmpeg package): cut points are placed on a
+silence near every ANALYSIS_SEGMENT_SECONDS (so no answer is cut mid-sentence),
+and the streams are copied without re-encoding, which makes each cut land on
+the next keyframe. The real segment boundaries are read back from ffmpeg's
+segment list. Without ffmpeg, recordings are analyzed in one piece.
+"""
+import csv
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+
+from django.conf import settings
+
+try:
+    import imageio_ffmpeg
+except ImportError:  # Only an ffmpeg on the PATH is used without it
+    imageio_ffmpeg = None
+
+
+def _find_ffmpeg():
+    """The system ffmpeg, else the one bundled with imageio-ffmpeg, else None"""
+    path = shutil.which('ffmpeg')
+    if path is None and imageio_ffmpeg is not None:
+        try:
+            path = imageio_ffmpeg.get_ffmpeg_exe()
+        except RuntimeError:
+            path = None
+    return path
+
+
+FFMPEG = _find_ffmpeg()
+
+# Silences at least this long (seconds) and this quiet (dB) are cut candidates
+SILENCE_MIN_SECONDS = 0.5
+SILENCE_NOISE_DB = -35
+
+FFMPEG_TIMEOUT_SECONDS = 600
+
+SILENCE_PATTERN = re.compile(r'silence_(start|end): (-?[\d.]+)')
+
+
+class SegmentationError(Exception):
+    """ffmpeg could not split the recording"""
+
+
+def is_available():
+    return FFMPEG is not None
+
+
+def should_segment(duration_seconds):
+    """True if a recording of this length should be analyzed in segments"""
+    return bool(duration_seconds) and duration_seconds > settings.ANALYSIS_SEGMENT_THRESHOLD_SECONDS
+
+
+def find_silences(path):
+    """Midpoints (seconds) of the silent stretches in the recording's audio"""
+    command = [
+        FFMPEG, '-hide_banner', '-nostats', '-i', path, '-vn',
+        '-af', f'silencedetect=noise={SILENCE_NOISE_DB}dB:d={SILENCE_MIN_SECONDS}',
+        '-f', 'null', '-',
+    ]
+    result = subprocess.run(command, capture_output=True, text=True, timeout=FFMPEG_TIMEOUT_SECONDS)
+
+    silences = []
+    start = None
+    for kind, value in SILENCE_PATTERN.findall(result.stderr):
+        if kind == 'start':
+            start = max(0.0, float(value))
+        elif start is not None:
+            silences.append((start + float(value)) / 2)
+            start = None
+    return silences
+
+
+def plan_cut_points(duration, segment_seconds, silences):
+    """
+    Cut times roughly every segment_seconds, moved to the nearest silence within
+    15% of the segment length. A short remainder is folded into the last segment.
+    """
+    tolerance = segment_seconds * 0.15
+    cuts = []
+    target = segment_seconds
+    while target < duration - segment_seconds / 4:
+        nearby = [silence for silence in silences if abs(silence - target) <= tolerance]
+        cut = min(nearby, key=lambda silence: abs(silence - target)) if nearby else target
+        cuts.append(cut)
+        target = cut + segment_seconds
+    return cuts
+
+
+def split(path, duration, output_dir):
+    """
+    Split the recording into output_dir and return its segments in order as
+    dicts: {'index', 'path', 'start', 'end'} (times in seconds). Raises
+    SegmentationError if ffmpeg is missing or fails.
+    """
+    if not is_available():
+        raise SegmentationError("ffmpeg not installed")
+    segment_seconds = settings.ANALYSIS_SEGMENT_SECONDS
+
+    try:
+        silences = find_silences(path)
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"⚠️  Silence detection failed ({e}), cutting at fixed intervals")
+        silences = []
+
+    cuts = plan_cut_points(duration, segment_seconds, silences)
+    if not cuts:
+        raise SegmentationError("Recording is too short to split")
+
+    extension = os.path.splitext(path)[1] or '.webm'
+    list_path = os.path.join(output_dir, 'segments.csv')
+    command = [
+        FFMPEG, '-hide_banner', '-loglevel', 'error', '-i', path,
+        '-map', '0', '-c', 'copy',
+        '-f', 'segment', '-segment_times', ','.join(f'{cut:.3f}' for cut in cuts),
+        '-reset_timestamps', '1',
+        '-segment_list', list_path, '-segment_list_type', 'csv',
+        os.path.join(output_dir, f'segment_%03d{extension}'),
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=FFMPEG_TIMEOUT_SECONDS)
+    except (OSError, subprocess.SubprocessError) as e:
+        raise SegmentationError(str(e))
+    if result.returncode != 0 or not os.path.exists(list_path):
+        raise SegmentationError(result.stderr.strip()[-500:] or f"ffmpeg exited with {result.returncode}")
+
+    segments = []
+    with open(list_path, newline='') as fh:
+        for index, (filename, start, end) in enumerate(csv.reader(fh)):
+            segments.append({
+                'index': index,
+                'path': os.path.join(output_dir, filename),
+                'start': float(start),
+                'end': float(end),
+            })
+
+    if not segments:
+        raise SegmentationError("ffmpeg produced no segments")
+    return segments
+
+
+def segment_hash(content_hash, segment):
+    """Content key for one segment of a recording, for reusing its upload"""
+    if not content_hash:
+        return None
+    key = f"{content_hash}:{segment['start']:.3f}-{segment['end']:.3f}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
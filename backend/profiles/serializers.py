@@ -1,11 +1,12 @@
 from rest_framework import serializers
 from .models import UserProfile, ResumeData, InterviewAnalysis
+from .candidate_digest import ensure_digest, public_digest
 
 
 class ResumeDataSerializer(serializers.ModelSerializer):
     class Meta:
         model = ResumeData
-        fields = '__all__'
+        exclude = ('digest',)
         read_only_fields = ('user', 'uploaded_at', 'updated_at')
 
 
@@ -30,9 +31,14 @@ class InterviewAnalysisSerializer(serializers.ModelSerializer):
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
-    resume = ResumeDataSerializer(read_only=True, required=False)
+    # The candidate digest, not the whole parsed resume (GET /resume/ returns that)
+    resume = serializers.SerializerMethodField()
     
     class Meta:
         model = UserProfile
         fields = '__all__'
         read_only_fields = ('created_at', 'updated_at')
+    
+    def get_resume(self, instance):
+        resume = ResumeData.objects.defer('raw_text').filter(user=instance).first()
+        return public_digest(ensure_digest(resume)) if resume else None
@@ -0,0 +1,145 @@
+"""
+Finding skills in resume text with one precompiled regular expression.
+
+The taxonomy (data/skills_taxonomy.json) maps each canonical skill to its
+aliases ("k8s" -> Kubernetes, "JS" -> JavaScript, "postgres" -> PostgreSQL).
+Every surface form goes into a prefix trie, built once at import and written
+out as a single regex, so a resume is scanned in one pass by the C regex
+engine however many skills the taxonomy holds (about 730 skills and 1,160
+surface forms today).
+
+A match only counts at word boundaries ("Go" is not found in "Google", "Java"
+not in "JavaScript"), and where matches overlap the longest wins ("C++" over
+"C", "React Native" over "React"). Short or everyday words listed under
+case_sensitive in the taxonomy ("Go", "R", "Spring", "Express") only count
+with the casing they're listed in.
+"""
+import json
+import os
+import re
+from collections import Counter
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), 'data', 'skills_taxonomy.json')
+
+# Characters that extend a word: a match next to one of these is part of a longer token
+WORD_JOINERS = frozenset('_&@')
+WORD_CHAR = r'[\w' + re.escape(''.join(sorted(WORD_JOINERS))) + ']'
+
+
+def _fold(text):
+    """Lowercase character by character, keeping offsets aligned with the original"""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return ''.join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+
+def _char_pattern(char):
+    """A folded character matching either case"""
+    upper = char.upper()
+    if upper == char or len(upper) != 1:
+        return re.escape(char)
+    return f'[{re.escape(char)}{re.escape(upper)}]'
+
+
+class SkillMatcher:
+    """Regex over a prefix trie of the surface forms of a skill taxonomy"""
+
+    def __init__(self, surface_forms, case_sensitive=()):
+        """
+        surface_forms: {surface form: canonical skill}
+        case_sensitive: surface forms that only match with exactly this casing
+
+        Forms that differ only in case are one pattern; raises ValueError if
+        they belong to different skills.
+        """
+        exact_forms = {}
+        for form in case_sensitive:
+            exact_forms.setdefault(_fold(form), set()).add(form)
+
+        # Trie over folded characters; the None key marks the end of a form and
+        # holds the exact spellings it's limited to (empty for any casing)
+        trie = {}
+        self.canonical_by_folded = {}
+        for form, canonical in surface_forms.items():
+            folded = _fold(form.strip())
+            if not folded:
+                continue
+            if folded in self.canonical_by_folded:
+                if self.canonical_by_folded[folded] != canonical:
+                    raise ValueError(
+                        f"{form!r} is listed for both {self.canonical_by_folded[folded]!r} and {canonical!r}"
+                    )
+                continue
+            self.canonical_by_folded[folded] = canonical
+            node = trie
+            for char in folded:
+                node = node.setdefault(char, {})
+            node[None] = sorted(exact_forms.get(folded, ()))
+
+        first_chars = ''.join(sorted({variant for char in trie for variant in (char, char.upper()) if len(variant) == 1}))
+        # The lookahead lets the engine skip positions no form starts with
+        # before it tries the trie's branches
+        self.pattern = re.compile(
+            f'(?<!{WORD_CHAR})(?=[{re.escape(first_chars)}]){self._alternation(trie)}(?!{WORD_CHAR})'
+        ) if trie else re.compile('(?!)')
+
+    @classmethod
+    def _alternation(cls, node):
+        """
+        The regex for a trie node. Longer forms are tried first and the engine
+        backtracks to shorter ones, so the longest form that ends at a word
+        boundary wins. A case-sensitive form checks its exact spelling with a
+        lookbehind once all of it has matched.
+        """
+        branches = [
+            _char_pattern(char) + cls._alternation(child)
+            for char, child in sorted((key, child) for key, child in node.items() if key is not None)
+        ]
+        if None in node:
+            exact = node[None]
+            branches.append(f"(?<={'|'.join(map(re.escape, exact))})" if exact else '')
+        if len(branches) == 1:
+            return branches[0]
+        return f"(?:{'|'.join(branches)})"
+
+    @classmethod
+    def from_taxonomy(cls, path=TAXONOMY_PATH):
+        with open(path, encoding='utf-8') as f:
+            taxonomy = json.load(f)
+        surface_forms = {}
+        categories = {}
+        for category, skills in taxonomy['categories'].items():
+            for canonical, aliases in skills.items():
+                categories[canonical] = category
+                for form in (canonical, *aliases):
+                    surface_forms.setdefault(form, canonical)
+        matcher = cls(surface_forms, taxonomy.get('case_sensitive', ()))
+        matcher.categories = categories
+        return matcher
+
+    def find(self, text):
+        """[(start, end, canonical), ...] for every skill mention, in text order"""
+        if not text:
+            return []
+        canonical = self.canonical_by_folded
+        return [(match.start(), match.end(), canonical[_fold(match.group())]) for match in self.pattern.finditer(text)]
+
+    def count(self, text):
+        """Counter of canonical skill -> mentions, in order of first mention"""
+        if not text:
+            return Counter()
+        return Counter(map(self.canonical_by_folded.__getitem__, map(_fold, self.pattern.findall(text))))
+
+
+MATCHER = SkillMatcher.from_taxonomy()
+
+
+def match_skills(text):
+    """Canonical skills mentioned in text with their mention counts"""
+    return MATCHER.count(text)
+
+
+def skill_category(skill):
+    """Taxonomy category of a canonical skill, or None"""
+    return MATCHER.categories.get(skill)
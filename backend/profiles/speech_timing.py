@@ -0,0 +1,360 @@
+"""
+Measuring speech timing locally from the recording's audio.
+
+The audio is decoded to PCM (WAV files with the wave module, anything else
+through ffmpeg as 16 kHz mono) and reduced on the fly to one energy value per
+10 ms frame, so even an hour-long recording only keeps a few hundred thousand
+floats in memory. Everything after that is vectorized NumPy over the frame
+energies:
+- energy VAD: frames well above the recording's own noise floor are speech,
+  with short gaps bridged and tiny blips dropped
+- pauses: silent runs between the first and last speech, as a length histogram
+- talk ratio: speech time over the active span of the recording
+- syllable rate: peaks of the smoothed energy envelope inside speech
+
+The numbers are approximate but deterministic, and they take a fraction of a
+second per minute of audio. Without NumPy (or a decoder) nothing is measured.
+"""
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+
+try:
+    import numpy as np
+except ImportError:  # Measurement is skipped without NumPy
+    np = None
+
+from .analysis_merge import format_timestamp
+from .segmenter import FFMPEG, FFMPEG_TIMEOUT_SECONDS
+
+FRAME_SECONDS = 0.01
+DECODE_SAMPLE_RATE = 16000
+
+# VAD: speech is this many dB above the noise floor (or this share of the way
+# from the floor to the loud speech level, whichever is higher)
+MIN_SPEECH_DB_ABOVE_FLOOR = 6.0
+SPEECH_THRESHOLD_SHARE = 0.3
+MIN_GAP_SECONDS = 0.15     # Shorter silences inside speech are not pauses
+MIN_SPEECH_SECONDS = 0.06  # Shorter bursts above the threshold are noise
+
+# Pauses shorter than the first edge aren't counted
+PAUSE_HISTOGRAM_EDGES = [0.25, 0.5, 1.0, 2.0, 5.0, 10.0]
+LONG_PAUSE_SECONDS = 5.0
+MAX_LONG_PAUSES_LISTED = 10
+
+# Syllable nuclei: envelope peaks at least this far apart and this loud
+SYLLABLE_SMOOTHING_SECONDS = 0.05
+MIN_SYLLABLE_SPACING_SECONDS = 0.1
+SYLLABLE_PEAK_DB_ABOVE_THRESHOLD = 3.0
+SYLLABLES_PER_WORD = 1.5  # Average for conversational English
+
+READ_CHUNK_FRAMES = 6000  # One minute of frames per read
+STDERR_TAIL_BYTES = 4096  # Of ffmpeg's error log, only the end is reported
+
+
+class SpeechTimingError(Exception):
+    """The recording's audio could not be decoded"""
+
+
+def is_available():
+    return np is not None
+
+
+def unavailable_reason(media_info=None):
+    """Why speech timing can't be measured for this recording here, or None"""
+    if not is_available():
+        return "NumPy not installed"
+    if not FFMPEG and (media_info or {}).get('format') != 'wav':
+        return "ffmpeg not installed"
+    return None
+
+
+def frame_energies(path, media_info=None):
+    """
+    Mean-square energy of each 10 ms frame of the recording's audio (mono),
+    as a float64 array. Raises SpeechTimingError if it can't be decoded.
+    """
+    if (media_info or {}).get('format') == 'wav':
+        try:
+            return _wav_frame_energies(path)
+        except (wave.Error, EOFError, SpeechTimingError) as e:
+            if not FFMPEG:
+                raise SpeechTimingError(f"Unsupported WAV file: {e}")
+    if not FFMPEG:
+        raise SpeechTimingError("ffmpeg not installed")
+    return _ffmpeg_frame_energies(path)
+
+
+def _wav_frame_energies(path):
+    with wave.open(path, 'rb') as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        frame_length = max(1, round(wav.getframerate() * FRAME_SECONDS))
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}.get(width)
+        if dtype is None:
+            raise SpeechTimingError(f"{width * 8}-bit samples")
+
+        full_scale = float(2 ** (width * 8 - 1))
+        energies = []
+        while True:
+            data = wav.readframes(frame_length * READ_CHUNK_FRAMES)
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype=dtype).astype(np.float64)
+            if width == 1:
+                samples -= 128.0  # 8-bit WAV is unsigned
+            samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+            energies.append(_chunk_energies(samples / full_scale, frame_length))
+
+    return np.concatenate(energies) if energies else np.zeros(0)
+
+
+def _ffmpeg_frame_energies(path):
+    frame_length = round(DECODE_SAMPLE_RATE * FRAME_SECONDS)
+    command = [
+        FFMPEG, '-hide_banner', '-loglevel', 'error', '-i', path,
+        '-vn', '-ac', '1', '-ar', str(DECODE_SAMPLE_RATE), '-f', 's16le', '-',
+    ]
+    # stderr goes to a file: a damaged recording can log an error per packet,
+    # and an undrained pipe would stall ffmpeg while we wait on stdout
+    with tempfile.TemporaryFile() as stderr_file:
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+        except OSError as e:
+            raise SpeechTimingError(str(e))
+
+        # The watchdog kills ffmpeg when it runs too long, even while a read blocks
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            process.kill()
+
+        watchdog = threading.Timer(FFMPEG_TIMEOUT_SECONDS, kill)
+        watchdog.daemon = True
+        watchdog.start()
+
+        energies = []
+        try:
+            chunk_bytes = frame_length * READ_CHUNK_FRAMES * 2
+            while True:
+                data = process.stdout.read(chunk_bytes)
+                if not data:
+                    break
+                samples = np.frombuffer(data[:len(data) - len(data) % 2], dtype='<i2') / 32768.0
+                energies.append(_chunk_energies(samples, frame_length))
+            process.wait()
+        finally:
+            watchdog.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+
+        if timed_out.is_set():
+            raise SpeechTimingError("Decoding timed out")
+        if process.returncode != 0 or not energies:
+            stderr_file.seek(max(0, stderr_file.seek(0, 2) - STDERR_TAIL_BYTES))
+            stderr = stderr_file.read().decode('utf-8', 'replace')
+            raise SpeechTimingError(stderr.strip()[-500:] or f"ffmpeg exited with {process.returncode}")
+    return np.concatenate(energies)
+
+
+def _chunk_energies(samples, frame_length):
+    """Mean square per frame; a trailing partial frame is averaged on its own"""
+    whole = len(samples) - len(samples) % frame_length
+    energies = np.square(samples[:whole]).reshape(-1, frame_length).mean(axis=1)
+    if whole < len(samples):
+        energies = np.append(energies, np.square(samples[whole:]).mean())
+    return energies
+
+
+def _runs(mask):
+    """(starts, lengths) of the runs of True in a boolean array"""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+    return starts, ends - starts
+
+
+def _fill_runs(mask, value, max_frames):
+    """Flip runs of `value` no longer than max_frames to the opposite value"""
+    starts, lengths = _runs(mask == value)
+    short = lengths <= max_frames
+    if not short.any():
+        return mask
+    index = np.repeat(starts[short], lengths[short]) + _ranges(lengths[short])
+    mask = mask.copy()
+    mask[index] = not value
+    return mask
+
+
+def _ranges(lengths):
+    """Concatenated 0..n-1 ranges for each n in lengths, without a Python loop"""
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.arange(lengths.sum()) - offsets
+
+
+def voice_activity(energies):
+    """Boolean speech mask over frames, and the dB threshold used"""
+    db = 10.0 * np.log10(energies + 1e-10)
+    floor, loud = np.percentile(db, [10, 95])
+    threshold = floor + max(MIN_SPEECH_DB_ABOVE_FLOOR, SPEECH_THRESHOLD_SHARE * (loud - floor))
+
+    speech = db > threshold
+    speech = _fill_runs(speech, False, round(MIN_GAP_SECONDS / FRAME_SECONDS))
+    speech = _fill_runs(speech, True, round(MIN_SPEECH_SECONDS / FRAME_SECONDS))
+    return speech, db, threshold
+
+
+def count_syllables(db, speech, threshold):
+    """Syllable nuclei: local maxima of the smoothed envelope inside speech"""
+    width = max(1, round(SYLLABLE_SMOOTHING_SECONDS / FRAME_SECONDS))
+    envelope = np.convolve(db, np.ones(width) / width, mode='same')
+
+    peak = np.zeros(len(envelope), dtype=bool)
+    peak[1:-1] = (envelope[1:-1] > envelope[:-2]) & (envelope[1:-1] >= envelope[2:])
+    peak &= speech & (envelope > threshold + SYLLABLE_PEAK_DB_ABOVE_THRESHOLD)
+
+    positions = np.flatnonzero(peak)
+    if len(positions) < 2:
+        return len(positions)
+
+    # Of peaks closer than the minimum spacing, only the first counts
+    min_spacing = round(MIN_SYLLABLE_SPACING_SECONDS / FRAME_SECONDS)
+    count, last = 1, positions[0]
+    for position in positions[1:]:
+        if position - last >= min_spacing:
+            count += 1
+            last = position
+    return count
+
+
+def measure_energies(energies, offset_seconds=0.0):
+    """
+    Timing metrics for a run of frame energies (the whole recording, or a slice
+    of it for one segment). Times in the result are relative to the recording
+    start when offset_seconds is the slice's start.
+    """
+    duration = len(energies) * FRAME_SECONDS
+    if len(energies) == 0 or not energies.any():
+        return {'duration_seconds': round(duration, 1), 'speech_detected': False}
+
+    speech, db, threshold = voice_activity(energies)
+    speech_starts, speech_lengths = _runs(speech)
+    if len(speech_starts) == 0:
+        return {'duration_seconds': round(duration, 1), 'speech_detected': False}
+
+    first, last = speech_starts[0], speech_starts[-1] + speech_lengths[-1]
+    active_seconds = (last - first) * FRAME_SECONDS
+    speech_seconds = speech_lengths.sum() * FRAME_SECONDS
+
+    # Pauses: silent runs strictly between the first and last speech
+    silence_starts, silence_lengths = _runs(~speech[first:last])
+    pauses = silence_lengths * FRAME_SECONDS
+    counted = pauses >= PAUSE_HISTOGRAM_EDGES[0]
+    pauses, pause_starts = pauses[counted], (silence_starts[counted] + first) * FRAME_SECONDS + offset_seconds
+
+    histogram_counts, _ = np.histogram(pauses, bins=PAUSE_HISTOGRAM_EDGES + [np.inf])
+    histogram = {
+        _bin_label(low, high): int(count)
+        for low, high, count in zip(PAUSE_HISTOGRAM_EDGES, PAUSE_HISTOGRAM_EDGES[1:] + [None], histogram_counts)
+    }
+
+    long_pauses = pauses >= LONG_PAUSE_SECONDS
+    syllables = count_syllables(db, speech, threshold)
+    syllable_rate = syllables / speech_seconds if speech_seconds else 0.0
+
+    return {
+        'speech_detected': True,
+        'duration_seconds': round(duration, 1),
+        'speech_seconds': round(float(speech_seconds), 1),
+        'silence_seconds': round(float(duration - speech_seconds), 1),
+        'talk_ratio': round(float(speech_seconds / active_seconds), 3) if active_seconds else 1.0,
+        'pause_count': int(len(pauses)),
+        'mean_pause_seconds': round(float(pauses.mean()), 2) if len(pauses) else 0.0,
+        'median_pause_seconds': round(float(np.median(pauses)), 2) if len(pauses) else 0.0,
+        'longest_pause_seconds': round(float(pauses.max()), 2) if len(pauses) else 0.0,
+        'pause_histogram': histogram,
+        'long_pause_count': int(long_pauses.sum()),
+        'long_pauses': [
+            {'start': round(float(start), 1), 'duration': round(float(length), 1)}
+            for start, length in zip(pause_starts[long_pauses][:MAX_LONG_PAUSES_LISTED],
+                                     pauses[long_pauses][:MAX_LONG_PAUSES_LISTED])
+        ],
+        'syllables_per_second': round(float(syllable_rate), 2),
+        'estimated_wpm': round(float(syllable_rate) * 60 / SYLLABLES_PER_WORD),
+    }
+
+
+def _bin_label(low, high):
+    return f"{low:g}s+" if high is None else f"{low:g}-{high:g}s"
+
+
+class SpeechTiming:
+    """Frame energies of one recording, measured as a whole or per time range"""
+
+    def __init__(self, energies, decode_seconds=0.0):
+        self.energies = energies
+        self.decode_seconds = decode_seconds
+
+    def metrics(self, start=0.0, end=None, relative=False):
+        """Metrics for start..end seconds; pause times relative to `start` if relative"""
+        first = int(start / FRAME_SECONDS)
+        last = None if end is None else int(end / FRAME_SECONDS)
+        started = time.monotonic()
+        metrics = measure_energies(self.energies[first:last], offset_seconds=0.0 if relative else start)
+        metrics['processing_seconds'] = round(self.decode_seconds + time.monotonic() - started, 3)
+        metrics['method'] = 'energy VAD over 10 ms frames'
+        return metrics
+
+
+def analyze(path, media_info=None):
+    """
+    Decode the recording's audio and return a SpeechTiming for it, or None if
+    NumPy is missing or the audio can't be decoded
+    """
+    if not is_available():
+        return None
+
+    started = time.monotonic()
+    try:
+        energies = frame_energies(path, media_info)
+    except SpeechTimingError as e:
+        print(f"⚠️  Speech timing skipped: {e}")
+        return None
+
+    decode_seconds = time.monotonic() - started
+    print(f"⏱️  Decoded {len(energies) * FRAME_SECONDS:.0f}s of audio for speech timing in {decode_seconds:.2f}s")
+    return SpeechTiming(energies, decode_seconds)
+
+
+GROUNDING_TEMPLATE = """**MEASURED SPEECH TIMING** (computed from the audio signal; use these numbers, do not re-estimate them):
+- Speaking time: {speech_seconds}s of {duration_seconds}s (talk ratio {talk_ratio_percent}% of the active span)
+- Pauses of 0.25s or more: {pause_count} (median {median_pause_seconds}s, mean {mean_pause_seconds}s, longest {longest_pause_seconds}s)
+- Pause lengths: {histogram}
+- Pauses of {long_pause_threshold:g}s or more: {long_pause_count}{long_pause_times}
+- Approximate syllable rate: {syllables_per_second}/s of speech (about {estimated_wpm} WPM)
+Base response_delay_*, speaking_pace_wpm and pause-related judgements on these measurements.
+
+"""
+
+
+def grounding_text(metrics):
+    """Prompt preamble stating the measured timing, or '' if there is nothing to state"""
+    if not metrics or not metrics.get('speech_detected'):
+        return ''
+    long_pause_times = ''
+    if metrics['long_pauses']:
+        long_pause_times = ' at ' + ', '.join(
+            f"{format_timestamp(pause['start'])} ({pause['duration']}s)" for pause in metrics['long_pauses']
+        )
+    return GROUNDING_TEMPLATE.format(
+        talk_ratio_percent=round(metrics['talk_ratio'] * 100),
+        histogram=', '.join(f"{label}: {count}" for label, count in metrics['pause_histogram'].items()),
+        long_pause_threshold=LONG_PAUSE_SECONDS,
+        long_pause_times=long_pause_times,
+        **metrics,
+    )
@@ -1,3 +1,1048 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import Future
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock, skipIf
 
-# Create your tests here.
+import google.generativeai as genai
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from . import (
+    file_poller, jobs, llm_client, media_probe, question_bank, question_prefetch, question_sets, recommendations,
+    resume_cache, resume_parser, schemas, speech_timing,
+)
+from .analysis_merge import format_timestamp, merge_segment_analyses
+from .json_stream import IncrementalJsonArrayParser, IncrementalJsonObjectParser
+from .models import AnalysisJob, QuestionSet, ResumeData, ResumeExtractionCache, UserProfile
+from .resume_rules import _years_of_experience, extract, split_sections
+from .skill_matcher import MATCHER, SkillMatcher, match_skills
+
+
+RESUME = """Jane Doe
+jane@example.com | +91 98765 43210 | Pune, India
+
+E X P E R I E N C E
+Senior Engineer | Acme Corp | Jan 2015 - Dec 2016
+- Built services with Python and Django
+Software Engineer | Beta Labs | Jan 2016 - Dec 2017
+- Wrote services in Go
+Software Intern | Gamma | Jun 2013 - Aug 2014
+- Tested releases
+
+Skills: Python, Django, Go
+Languages: English, Hindi
+"""
+
+
+class SplitSectionsTests(SimpleTestCase):
+    def test_lines_before_first_heading_are_the_header(self):
+        sections = split_sections(RESUME)
+        self.assertEqual(sections['header'], [
+            'Jane Doe',
+            'jane@example.com | +91 98765 43210 | Pune, India',
+        ])
+
+    def test_spaced_capitals_heading_starts_a_section(self):
+        sections = split_sections(RESUME)
+        self.assertEqual(len(sections['experience']), 6)
+        self.assertEqual(sections['experience'][0], 'Senior Engineer | Acme Corp | Jan 2015 - Dec 2016')
+
+    def test_inline_heading_keeps_its_content(self):
+        sections = split_sections(RESUME)
+        self.assertEqual(sections['skills'][0], 'Python, Django, Go')
+
+    def test_labels_inside_skills_stay_in_skills(self):
+        sections = split_sections(RESUME)
+        self.assertIn('Languages: English, Hindi', sections['skills'])
+        self.assertNotIn('languages', sections)
+
+    def test_sentences_are_not_headings(self):
+        sections = split_sections('Jane Doe\nEducation.\nLed the education team for five whole years\n')
+        self.assertEqual(list(sections), ['header'])
+
+
+class RuleExtractionTests(SimpleTestCase):
+    def test_contact_confidence(self):
+        result = extract(RESUME)
+        self.assertEqual(result.data['email'], 'jane@example.com')
+        self.assertEqual(result.confidence['email'], 1.0)
+        self.assertEqual(result.data['phone'], '+91 98765 43210')
+        self.assertEqual(result.confidence['phone'], 0.9)
+
+    def test_missing_phone_is_still_fairly_confident(self):
+        result = extract('Jane Doe\njane@example.com\n')
+        self.assertEqual(result.confidence['phone'], 0.8)
+
+    def test_complete_experience_entries_score_high(self):
+        result = extract(RESUME)
+        self.assertEqual(len(result.data['experience']), 3)
+        self.assertEqual(result.data['experience'][0]['company'], 'Acme Corp')
+        self.assertEqual(result.data['experience'][0]['duration'], 'Jan 2015 - Dec 2016')
+        self.assertEqual(result.confidence['experience'], 0.95)
+
+    def test_missing_experience_section(self):
+        self.assertEqual(extract('Jane Doe\njane@example.com\n').confidence['experience'], 0.7)
+        # Dates without an experience heading mean the section was missed
+        dated = extract('Jane Doe\njane@example.com\nAcme Corp, Jan 2015 - Dec 2016\n')
+        self.assertEqual(dated.confidence['experience'], 0.3)
+
+    def test_missing_certifications_are_usually_absent(self):
+        result = extract(RESUME)
+        self.assertEqual(result.data['certifications'], [])
+        self.assertEqual(result.confidence['certifications'], 0.8)
+
+    def test_gaps_lists_low_confidence_fields(self):
+        result = extract('Jane Doe\njane@example.com\nAcme Corp, Jan 2015 - Dec 2016\n')
+        gaps = result.gaps(0.6)
+        self.assertIn('experience', gaps)
+        self.assertNotIn('email', gaps)
+
+
+class YearsOfExperienceTests(SimpleTestCase):
+    def _years(self, *roles):
+        experience = [{'title': title, 'duration': duration} for title, duration in roles]
+        return _years_of_experience(experience, 0.95)
+
+    def test_overlapping_roles_count_once(self):
+        years, _ = self._years(
+            ('Senior Engineer', 'Jan 2015 - Dec 2016'),
+            ('Software Engineer', 'Jan 2016 - Dec 2017'),
+        )
+        self.assertEqual(years, 3)
+
+    def test_disjoint_roles_add_up(self):
+        years, _ = self._years(
+            ('Engineer', 'Jan 2010 - Dec 2010'),
+            ('Engineer', 'Jan 2012 - Dec 2012'),
+        )
+        self.assertEqual(years, 2)
+
+    def test_internships_are_excluded(self):
+        years, _ = self._years(
+            ('Engineer', 'Jan 2016 - Dec 2017'),
+            ('Software Intern', 'Jan 2010 - Dec 2013'),
+            ('Graduate Trainee', 'Jan 2014 - Dec 2015'),
+        )
+        self.assertEqual(years, 2)
+
+    def test_extracted_resume_merges_and_skips_internship(self):
+        self.assertEqual(extract(RESUME).data['years_of_experience'], 3)
+
+
+def _feed_in_chunks(parser, text, size):
+    results = []
+    for i in range(0, len(text), size):
+        results.extend(parser.feed(text[i:i + size]))
+    return results
+
+
+class IncrementalJsonObjectParserTests(SimpleTestCase):
+    TEXT = (
+        '```json\n{"summary": "Says \\"hi\\", then {braces} and [brackets]",'
+        ' "skills": ["Python", "Go"], "meta": {"a": [1, {"b": null}]},'
+        ' "score": 4.5, "ok": true}\n```'
+    )
+    EXPECTED = [
+        ('summary', 'Says "hi", then {braces} and [brackets]'),
+        ('skills', ['Python', 'Go']),
+        ('meta', {'a': [1, {'b': None}]}),
+        ('score', 4.5),
+        ('ok', True),
+    ]
+
+    def test_members_are_the_same_for_any_chunking(self):
+        for size in (1, 2, 3, 7, 16, len(self.TEXT)):
+            with self.subTest(size=size):
+                parser = IncrementalJsonObjectParser()
+                self.assertEqual(_feed_in_chunks(parser, self.TEXT, size), self.EXPECTED)
+                self.assertEqual(parser.text, self.TEXT)
+
+    def test_member_is_reported_once_it_is_complete(self):
+        parser = IncrementalJsonObjectParser()
+        self.assertEqual(parser.feed('{"name": "Ja'), [])
+        self.assertEqual(parser.feed('ne", "age"'), [('name', 'Jane')])
+        self.assertEqual(parser.feed(': 30}'), [('age', 30)])
+
+
+class IncrementalJsonArrayParserTests(SimpleTestCase):
+    TEXT = '[{"q": "What is a \\"closure\\"?", "tags": ["js", "]"]}, "plain", 42, {"q": "Next"}]'
+    EXPECTED = [
+        {'q': 'What is a "closure"?', 'tags': ['js', ']']},
+        'plain',
+        42,
+        {'q': 'Next'},
+    ]
+
+    def test_elements_are_the_same_for_any_chunking(self):
+        for size in (1, 2, 5, 11, len(self.TEXT)):
+            with self.subTest(size=size):
+                parser = IncrementalJsonArrayParser()
+                self.assertEqual(_feed_in_chunks(parser, self.TEXT, size), self.EXPECTED)
+                self.assertEqual(parser.text, self.TEXT)
+
+    def test_element_is_reported_once_it_is_complete(self):
+        parser = IncrementalJsonArrayParser()
+        self.assertEqual(parser.feed('[{"q": "One"'), [])
+        self.assertEqual(parser.feed('}, {"q"'), [{'q': 'One'}])
+        self.assertEqual(parser.feed(': "Two"}]'), [{'q': 'Two'}])
+
+
+class MergeSegmentAnalysesTests(SimpleTestCase):
+    FIRST = {
+        'confidence_score': 60,
+        'filler_word_count': 3,
+        'attention_level': 'High',
+        'suspicion_risk': 'Low',
+        'response_delay_range': '1-2s',
+        'strengths': ['Answered 3 questions clearly', 'Good pace'],
+        'emotion_trend': 'Calm',
+        'speaking_rate': '40%',
+    }
+    SECOND = {
+        'confidence_score': 90,
+        'filler_word_count': 4,
+        'attention_level': 'Low',
+        'suspicion_risk': 'High',
+        'response_delay_range': '3-5s',
+        'strengths': ['Answered 5 questions clearly', 'Structured'],
+        'emotion_trend': 'Nervous',
+        'speaking_rate': '70%',
+    }
+
+    def setUp(self):
+        self.merged = merge_segment_analyses([
+            ({'start': 0, 'end': 600}, self.FIRST),
+            ({'start': 600, 'end': 1800}, self.SECOND),
+        ])
+
+    def test_scores_are_weighted_by_segment_duration(self):
+        self.assertEqual(self.merged['confidence_score'], 80)
+        self.assertEqual(self.merged['speaking_rate'], '60%')
+
+    def test_counts_are_summed(self):
+        self.assertEqual(self.merged['filler_word_count'], 7)
+
+    def test_levels_and_ranges(self):
+        self.assertEqual(self.merged['attention_level'], 'moderate')
+        self.assertEqual(self.merged['suspicion_risk'], 'moderate')
+        self.assertEqual(self.merged['response_delay_range'], '1s - 5s')
+
+    def test_lists_are_deduplicated_ignoring_numbers(self):
+        self.assertEqual(self.merged['strengths'], ['Answered 3 questions clearly', 'Good pace', 'Structured'])
+
+    def test_differing_text_becomes_a_timeline(self):
+        self.assertEqual(self.merged['emotion_trend'], '[00:00-10:00] Calm\n[10:00-30:00] Nervous')
+        self.assertEqual(self.merged['emotion_timeline'], [
+            {'start': 0, 'end': 600, 'emotion_trend': 'Calm', 'confidence_score': 60},
+            {'start': 600, 'end': 1800, 'emotion_trend': 'Nervous', 'confidence_score': 90},
+        ])
+        self.assertEqual(self.merged['segments_analyzed'], 2)
+
+    def test_single_segment_is_unchanged(self):
+        merged = merge_segment_analyses([({'start': 0, 'end': 60}, self.FIRST)])
+        for key, value in self.FIRST.items():
+            self.assertEqual(merged[key], value)
+        self.assertEqual(merged['segments_analyzed'], 1)
+
+    def test_format_timestamp(self):
+        self.assertEqual(format_timestamp(65), '01:05')
+        self.assertEqual(format_timestamp(3725), '1:02:05')
+
+
+class InvalidJsonBodyTests(SimpleTestCase):
+    URLS = (
+        '/api/questions/generate/',
+        '/api/interview/ai/question/',
+        '/api/interview/ai/question/stream/',
+        '/api/interview/ai/question/prefetch/',
+        '/api/interview/ai/analyze/',
+        '/api/interview/ai/transition/',
+        '/api/interview/ai/conclude/',
+    )
+
+    def test_malformed_body_is_a_bad_request(self):
+        for url in self.URLS:
+            with self.subTest(url=url):
+                response = self.client.post(url, '{"uid": ', content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()['error'], 'Invalid JSON')
+
+
+class LlmClientTests(SimpleTestCase):
+    def test_each_event_loop_gets_its_own_async_client(self):
+        if not llm_client.is_configured():
+            genai.configure(api_key='test-key')  # Clients are only built, never called
+
+        # get_async_model relies on google-generativeai internals (see
+        # llm_client._make_async_client); this fails if an SDK upgrade drops them
+        async def handle():
+            return llm_client.get_async_model('gemini-test-model')
+
+        first, second = asyncio.run(handle()), asyncio.run(handle())
+        self.assertIsNotNone(first._async_client)
+        self.assertIsNot(first._async_client, second._async_client)
+        self.assertIn('_async_client', vars(genai.GenerativeModel('gemini-test-model')))
+
+
+@mock.patch.object(recommendations, 'is_configured', return_value=True)
+class RecommendationsTests(TestCase):
+    GENERATED = {'focus_areas': ['System design']}
+
+    def setUp(self):
+        cache.clear()
+        user = UserProfile.objects.create(uid='u1', email='jane@example.com', name='Jane Doe')
+        self.resume = ResumeData.objects.create(user=user, full_name='Jane Doe', skills=['Python'])
+
+    @mock.patch.object(recommendations, 'generate_interview_recommendations', return_value=GENERATED)
+    def test_generated_once_per_resume_content(self, generate, _):
+        self.assertEqual(recommendations.ensure_recommendations(self.resume), self.GENERATED)
+        fresh = ResumeData.objects.get(id=self.resume.id)
+        self.assertEqual(recommendations.ensure_recommendations(fresh), self.GENERATED)
+        generate.assert_called_once()
+
+    @mock.patch.object(recommendations, 'generate_interview_recommendations')
+    def test_waits_for_the_worker_holding_the_lease(self, generate, _):
+        fingerprint = recommendations.resume_fingerprint(recommendations.ensure_digest(self.resume))
+        lease = recommendations._lease_key(self.resume.id, fingerprint)
+        cache.add(lease, True)
+
+        def other_worker_finishes(seconds):
+            ResumeData.objects.filter(id=self.resume.id).update(
+                recommendations=self.GENERATED, recommendations_fingerprint=fingerprint,
+            )
+            cache.delete(lease)
+
+        with mock.patch.object(recommendations.time, 'sleep', side_effect=other_worker_finishes):
+            self.assertEqual(recommendations.ensure_recommendations(self.resume), self.GENERATED)
+        generate.assert_not_called()
+        self.assertIsNone(cache.get(lease))
+
+    @mock.patch.object(recommendations, 'agenerate_interview_recommendations', return_value=GENERATED)
+    async def test_async_generation_stores_and_releases_the_lease(self, agenerate, _):
+        self.assertEqual(await recommendations.aensure_recommendations(self.resume), self.GENERATED)
+        stored = await ResumeData.objects.aget(id=self.resume.id)
+        self.assertEqual(stored.recommendations, self.GENERATED)
+        self.assertEqual(stored.recommendations_fingerprint, self.resume.recommendations_fingerprint)
+        agenerate.assert_awaited_once()
+
+
+@override_settings(QUESTION_PREFETCH_MATCH_RATIO=0.85, QUESTION_PREFETCH_WAIT_SECONDS=0.2)
+class QuestionPrefetchTests(SimpleTestCase):
+    PARTIAL = 'I used Redis as a cache in front of Postgres to cut read latency'
+
+    def setUp(self):
+        cache.clear()
+        self.key = question_prefetch.cache_key('s1', 'Technical', 'history')
+
+    def _speculate(self, question):
+        answer = question_prefetch.normalize_answer(self.PARTIAL)
+        cache.set(self.key, [{'answer': answer, 'question': question}])
+
+    def _take(self, final_answer):
+        return asyncio.run(question_prefetch.atake('s1', 'history', 'Technical', final_answer))
+
+    def test_answers_match_threshold(self):
+        speculated = question_prefetch.normalize_answer(self.PARTIAL)
+        self.assertTrue(question_prefetch.answers_match(speculated, speculated + ' mostly'))
+        self.assertFalse(question_prefetch.answers_match(speculated, speculated + ' and then we moved the whole service to Go'))
+        self.assertFalse(question_prefetch.answers_match(speculated, ''))
+
+    def test_close_final_answer_takes_the_speculation(self):
+        self._speculate('How did you invalidate it?')
+        self.assertEqual(self._take(self.PARTIAL + '.'), 'How did you invalidate it?')
+        self.assertIsNone(cache.get(self.key))
+
+    def test_different_final_answer_is_a_miss(self):
+        self._speculate('How did you invalidate it?')
+        self.assertIsNone(self._take('I have never worked with databases'))
+
+    def test_waits_for_a_speculation_in_flight(self):
+        future = Future()
+        future.set_result('What was the hit rate?')
+        answer = question_prefetch.normalize_answer(self.PARTIAL)
+        with mock.patch.dict(question_prefetch._inflight, {(self.key, answer): future}):
+            self.assertEqual(self._take(self.PARTIAL), 'What was the hit rate?')
+
+    def test_hung_speculation_times_out_without_cancelling_it(self):
+        future = Future()
+        answer = question_prefetch.normalize_answer(self.PARTIAL)
+        with mock.patch.dict(question_prefetch._inflight, {(self.key, answer): future}):
+            self.assertIsNone(self._take(self.PARTIAL))
+        self.assertFalse(future.cancelled())
+
+
+def _bank_question(domain, difficulty, question, topics, type='conceptual'):
+    return {
+        'domain': domain, 'difficulty': difficulty, 'question': question, 'type': type,
+        'topics': topics, 'expected_answer_points': [],
+    }
+
+
+class QuestionBankTests(SimpleTestCase):
+    QUESTIONS = [
+        _bank_question('web', 'easy', 'What does HTTP caching do?', ['http']),
+        _bank_question('web', 'easy', 'Explain the CSS box model.', ['css']),
+        _bank_question('web', 'medium', 'How would you paginate a REST API?', ['rest']),
+        _bank_question('web', 'medium', 'Where would you put Redis in a Django app?', ['redis', 'django']),
+        _bank_question('dsa', 'hard', 'Find the median of two sorted arrays.', ['arrays']),
+    ]
+
+    def setUp(self):
+        self.bank = question_bank.QuestionBank(self.QUESTIONS)
+
+    def test_difficulty_plan_follows_the_level_mix(self):
+        plan = question_bank.difficulty_plan('Mid Level', 10)
+        self.assertEqual([plan.count(d) for d in question_bank.DIFFICULTIES], [2, 5, 3])
+        self.assertEqual(plan, sorted(plan, key=question_bank.DIFFICULTIES.index))
+        self.assertEqual(question_bank.level_key('Internship'), 'internship')
+        self.assertEqual(question_bank.level_key(None), 'entry')
+
+    def test_selection_is_easiest_first_with_only_question_fields(self):
+        picked = self.bank.select('web', 'entry', 2)
+        self.assertEqual([q['difficulty'] for q in picked], ['easy', 'medium'])
+        self.assertEqual(set(picked[0]), set(question_bank.QUESTION_FIELDS))
+
+    def test_missing_difficulty_falls_back_within_the_domain(self):
+        # The web questions have no hard ones; a senior set takes other web questions first
+        picked = self.bank.select('web', 'senior', 4)
+        self.assertEqual(len(picked), 4)
+        self.assertTrue(all('arrays' not in q['topics'] for q in picked))
+
+    def test_unknown_domain_and_short_bank_fall_back_to_everything(self):
+        self.assertEqual(len(self.bank.select('ml', 'entry', 3)), 3)
+        self.assertEqual(len(self.bank.select('web', 'entry', 10)), len(self.QUESTIONS))
+
+    @skipIf(question_bank.np is None, 'ranking needs NumPy')
+    def test_questions_are_ranked_against_the_candidate(self):
+        digest = {'top_skills': ['Redis', 'Django'], 'key_strengths': [], 'recent_projects': []}
+        picked = self.bank.select('web', 'internship', 2, digest)
+        self.assertEqual(picked[1]['question'], 'Where would you put Redis in a Django app?')
+
+    def test_without_numpy_questions_come_in_bank_order(self):
+        with mock.patch.object(question_bank, 'np', None):
+            bank = question_bank.QuestionBank(self.QUESTIONS)
+        with mock.patch.object(question_bank, 'np', None):
+            picked = bank.select('web', 'internship', 2, {'top_skills': ['Redis']})
+        self.assertEqual([q['question'] for q in picked], [
+            'What does HTTP caching do?', 'How would you paginate a REST API?',
+        ])
+
+    def test_shipped_bank_covers_every_domain(self):
+        bank = question_bank.get_bank()
+        for domain in ('dsa', 'web', 'ml', 'core'):
+            with self.subTest(domain=domain):
+                self.assertEqual(len(bank.select(domain, 'mid', 8)), 8)
+
+
+def _set_question(source, number):
+    return {'question': f'{source} question {number}', 'type': 'conceptual', 'difficulty': 'easy'}
+
+
+@override_settings(QUESTION_SOURCE='llm', QUESTION_FIRST_BATCH=2, QUESTION_FIRST_BATCH_TIMEOUT_SECONDS=2)
+@mock.patch.object(question_sets, 'is_configured', return_value=True)
+@mock.patch.object(question_sets, 'bank_questions', return_value=[_set_question('bank', n) for n in range(1, 4)])
+class QuestionSetDeliveryTests(TransactionTestCase):
+    """astart_question_set with the model stream replaced by a fake"""
+
+    def setUp(self):
+        self.tasks = []
+        submit = question_sets.background.submit
+        patcher = mock.patch.object(
+            question_sets.background, 'submit',
+            side_effect=lambda *args: self.tasks.append(submit(*args)) or self.tasks[-1],
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _start(self, stream):
+        with mock.patch.object(question_sets, 'stream_interview_questions', side_effect=stream):
+            question_set, first = asyncio.run(question_sets.astart_question_set('u1', 'quick', 'entry', 'web'))
+            for task in self.tasks:
+                task.result(timeout=5)
+        return first, QuestionSet.objects.get(id=question_set.id)
+
+    def test_first_batch_returns_before_the_set_is_done(self, *_):
+        release = threading.Event()
+
+        def stream(goal, level, domain, digest, on_item):
+            on_item(_set_question('model', 1))
+            on_item(_set_question('model', 2))
+            release.wait(5)
+            on_item(_set_question('model', 3))
+
+        with mock.patch.object(question_sets, 'stream_interview_questions', side_effect=stream):
+            question_set, first = asyncio.run(question_sets.astart_question_set('u1', 'quick', 'entry', 'web'))
+            self.assertEqual(first, [_set_question('model', 1), _set_question('model', 2)])
+            self.assertEqual(QuestionSet.objects.get(id=question_set.id).status, QuestionSet.STATUS_GENERATING)
+            release.set()
+            self.tasks[0].result(timeout=5)
+
+        stored = QuestionSet.objects.get(id=question_set.id)
+        self.assertEqual(stored.status, QuestionSet.STATUS_DONE)
+        self.assertEqual(stored.questions, [_set_question('model', n) for n in range(1, 4)])
+
+        response = self.client.get(f'/api/questions/sets/{question_set.id}/?after=2')
+        self.assertEqual(response.json()['questions'], [_set_question('model', 3)])
+
+    @override_settings(QUESTION_FIRST_BATCH_TIMEOUT_SECONDS=0.1)
+    def test_slow_model_starts_with_the_bank(self, *_):
+        def stream(goal, level, domain, digest, on_item):
+            # Hold the model back until the bank has filled the first batch
+            for _ in range(100):
+                if QuestionSet.objects.get().questions:
+                    break
+                time.sleep(0.05)
+            for number in range(1, 4):
+                on_item(_set_question('model', number))
+
+        first, stored = self._start(stream)
+        self.assertEqual(first, [_set_question('bank', 1), _set_question('bank', 2)])
+        # The model's questions for positions the bank filled are skipped
+        self.assertEqual(stored.questions, [_set_question('bank', 1), _set_question('bank', 2), _set_question('model', 3)])
+
+    def test_failed_model_is_completed_from_the_bank(self, *_):
+        def stream(goal, level, domain, digest, on_item):
+            on_item(_set_question('model', 1))
+            on_item({'question': ''})  # Incomplete items are ignored
+            on_item(_set_question('model', 2))
+            raise RuntimeError('quota exceeded')
+
+        first, stored = self._start(stream)
+        self.assertEqual(first, [_set_question('model', 1), _set_question('model', 2)])
+        self.assertEqual(stored.status, QuestionSet.STATUS_DONE)
+        self.assertEqual(stored.questions[-1], _set_question('bank', 3))
+        self.assertEqual(stored.error, 'quota exceeded')
+
+    def test_bank_source_is_done_immediately(self, *_):
+        with override_settings(QUESTION_SOURCE='bank'):
+            first, stored = self._start(None)
+        self.assertEqual(first, [_set_question('bank', n) for n in range(1, 4)])
+        self.assertEqual(stored.status, QuestionSet.STATUS_DONE)
+        self.assertEqual(self.tasks, [])
+
+
+class SkillMatcherTests(SimpleTestCase):
+    def _found(self, text):
+        return [(text[start:end], canonical) for start, end, canonical in MATCHER.find(text)]
+
+    def test_aliases_map_to_canonical_skills(self):
+        self.assertEqual(self._found('k8s and JS, postgres'), [
+            ('k8s', 'Kubernetes'), ('JS', 'JavaScript'), ('postgres', 'PostgreSQL'),
+        ])
+
+    def test_matches_only_whole_words(self):
+        self.assertEqual(self._found('Worked at Google on Go services'), [('Go', 'Go')])
+        self.assertEqual(self._found('javascript, not java_script'), [('javascript', 'JavaScript')])
+        self.assertEqual(self._found('node_modules and R&D'), [])
+
+    def test_longest_overlapping_form_wins(self):
+        self.assertEqual(self._found('C/C++ and C#'), [('C', 'C'), ('C++', 'C++'), ('C#', 'C#')])
+        self.assertEqual(self._found('React Native and React'), [
+            ('React Native', 'React Native'), ('React', 'React'),
+        ])
+        self.assertEqual(self._found('Spring Boot'), [('Spring Boot', 'Spring Boot')])
+
+    def test_case_sensitive_forms_need_their_casing(self):
+        self.assertEqual(self._found('go to the store, then spring cleaning'), [])
+        self.assertEqual(self._found('MACHINE learning'), [('MACHINE learning', 'Machine Learning')])
+
+    def test_counts_mentions(self):
+        counts = match_skills('Python, Django and more python')
+        self.assertEqual(counts['Python'], 2)
+        self.assertEqual(counts['Django'], 1)
+        self.assertEqual(match_skills(''), {})
+
+    def test_conflicting_aliases_are_rejected(self):
+        with self.assertRaises(ValueError):
+            SkillMatcher({'Postgres': 'PostgreSQL', 'postgres': 'Postgres DB'})
+        matcher = SkillMatcher({'Go': 'Go', 'golang': 'Go'}, case_sensitive=['Go'])
+        self.assertEqual(matcher.count('Go and golang and go'), {'Go': 2})
+
+
+def _speech_energies(*runs, floor=1e-6, level=1e-2):
+    """10 ms frame energies for alternating (silence, speech, silence, ...) seconds"""
+    return speech_timing.np.concatenate([
+        speech_timing.np.full(round(seconds * 100), level if i % 2 else floor)
+        for i, seconds in enumerate(runs)
+    ])
+
+
+def _fake_ffmpeg(directory, body):
+    """An executable standing in for ffmpeg that runs the given Python code"""
+    path = os.path.join(directory, 'ffmpeg')
+    with open(path, 'w') as script:
+        script.write(f"#!{sys.executable}\nimport sys, time\n{body}\n")
+    os.chmod(path, 0o755)
+    return path
+
+
+@skipIf(speech_timing.np is None, 'speech timing needs NumPy')
+class SpeechTimingTests(SimpleTestCase):
+    def test_measures_speech_and_pauses(self):
+        metrics = speech_timing.measure_energies(_speech_energies(0.5, 2, 1, 1, 6, 1, 0.5))
+        self.assertTrue(metrics['speech_detected'])
+        self.assertEqual(metrics['duration_seconds'], 12.0)
+        self.assertEqual(metrics['speech_seconds'], 4.0)
+        self.assertEqual(metrics['talk_ratio'], 0.364)  # 4s of the 11s from first to last speech
+        self.assertEqual(metrics['pause_count'], 2)
+        self.assertEqual(metrics['longest_pause_seconds'], 6.0)
+        self.assertEqual(metrics['pause_histogram']['0.5-1s'], 0)
+        self.assertEqual(metrics['pause_histogram']['1-2s'], 1)
+        self.assertEqual(metrics['pause_histogram']['5-10s'], 1)
+        self.assertEqual(metrics['long_pauses'], [{'start': 4.5, 'duration': 6.0}])
+
+    def test_offset_shifts_pause_times(self):
+        metrics = speech_timing.SpeechTiming(_speech_energies(0.5, 1, 6, 1)).metrics(start=0.5)
+        self.assertEqual(metrics['long_pauses'], [{'start': 1.5, 'duration': 6.0}])
+        metrics = speech_timing.SpeechTiming(_speech_energies(0.5, 1, 6, 1)).metrics(start=0.5, relative=True)
+        self.assertEqual(metrics['long_pauses'], [{'start': 1.0, 'duration': 6.0}])
+
+    def test_short_gaps_and_blips_are_not_pauses_or_speech(self):
+        metrics = speech_timing.measure_energies(_speech_energies(0.5, 1, 0.1, 1, 2, 0.03, 2, 1))
+        self.assertEqual(metrics['speech_seconds'], 3.1)  # The 0.1s gap is bridged, the 0.03s blip dropped
+        self.assertEqual(metrics['pause_count'], 1)
+        self.assertEqual(metrics['longest_pause_seconds'], 4.03)
+
+    def test_silence_has_no_speech(self):
+        self.assertEqual(speech_timing.measure_energies(speech_timing.np.zeros(300)),
+                         {'duration_seconds': 3.0, 'speech_detected': False})
+        self.assertEqual(speech_timing.measure_energies(speech_timing.np.zeros(0)),
+                         {'duration_seconds': 0.0, 'speech_detected': False})
+
+    def test_reads_wav_frames(self):
+        np = speech_timing.np
+        rate = 8000
+        t = np.arange(rate) / rate
+        tone = (0.5 * np.sin(2 * np.pi * 220 * t) * 32767).astype('<i2')
+        samples = np.concatenate([np.zeros(rate // 2, dtype='<i2'), tone, np.zeros(rate // 2, dtype='<i2')])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'answer.wav')
+            with wave.open(path, 'wb') as wav:
+                wav.setnchannels(2)
+                wav.setsampwidth(2)
+                wav.setframerate(rate)
+                wav.writeframes(np.repeat(samples, 2).tobytes())  # Same signal on both channels
+            energies = speech_timing.frame_energies(path, {'format': 'wav'})
+
+        self.assertEqual(len(energies), 200)
+        self.assertAlmostEqual(energies[50:150].mean(), 0.125, places=3)  # Mean square of a 0.5 sine
+        self.assertEqual(energies[:50].max(), 0.0)
+        metrics = speech_timing.measure_energies(energies)
+        self.assertEqual((metrics['speech_seconds'], metrics['pause_count']), (1.0, 0))
+
+    def test_grounding_text_states_the_measurements(self):
+        text = speech_timing.grounding_text(speech_timing.measure_energies(_speech_energies(0.5, 2, 1, 1, 6, 1)))
+        self.assertIn('Speaking time: 4.0s of 11.5s', text)
+        self.assertIn('Pauses of 5s or more: 1 at 00:04 (6.0s)', text)
+        self.assertEqual(speech_timing.grounding_text({'speech_detected': False}), '')
+        self.assertEqual(speech_timing.grounding_text(None), '')
+
+
+@skipIf(os.name != 'posix', 'the stand-in ffmpeg is a script with a shebang')
+class SpeechTimingDecodeTests(SimpleTestCase):
+    def test_stalled_decoder_is_killed(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(speech_timing, 'FFMPEG', _fake_ffmpeg(directory, 'time.sleep(30)')), \
+                mock.patch.object(speech_timing, 'FFMPEG_TIMEOUT_SECONDS', 0.5):
+            started = time.monotonic()
+            with self.assertRaisesMessage(speech_timing.SpeechTimingError, 'Decoding timed out'):
+                speech_timing.frame_energies('answer.webm')
+        self.assertLess(time.monotonic() - started, 10)
+
+    def test_flood_of_errors_does_not_block_the_decode(self):
+        body = "sys.stderr.write('error decoding packet\\n' * 200000)\nsys.exit(1)"
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(speech_timing, 'FFMPEG', _fake_ffmpeg(directory, body)), \
+                mock.patch.object(speech_timing, 'FFMPEG_TIMEOUT_SECONDS', 10):
+            with self.assertRaises(speech_timing.SpeechTimingError) as raised:
+                speech_timing.frame_energies('answer.webm')
+        self.assertTrue(str(raised.exception).endswith('error decoding packet'))
+        self.assertLessEqual(len(str(raised.exception)), 500)
+
+
+class SpeechTimingAvailabilityTests(SimpleTestCase):
+    def test_unavailable_reason(self):
+        with mock.patch.object(speech_timing, 'np', None):
+            self.assertEqual(speech_timing.unavailable_reason(), 'NumPy not installed')
+            self.assertIsNone(speech_timing.analyze('answer.webm'))
+        with mock.patch.object(speech_timing, 'np', object()), mock.patch.object(speech_timing, 'FFMPEG', None):
+            self.assertEqual(speech_timing.unavailable_reason({'format': 'webm'}), 'ffmpeg not installed')
+            self.assertIsNone(speech_timing.unavailable_reason({'format': 'wav'}))
+
+
+def _job(user, seconds_ago=0, **fields):
+    return AnalysisJob.objects.create(
+        user=user, recording_path='/nonexistent/answer.webm', recording_filename='answer.webm',
+        created_at=timezone.now() - timedelta(seconds=seconds_ago), **fields,
+    )
+
+
+@override_settings(ANALYSIS_JOB_STALE_SECONDS=300, ANALYSIS_JOB_MAX_ATTEMPTS=3)
+class AnalysisJobQueueTests(TestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create(uid='u1', email='jane@example.com', name='Jane Doe')
+
+    def test_claims_oldest_queued_job_once(self):
+        newer = _job(self.user, seconds_ago=10)
+        older = _job(self.user, seconds_ago=20)
+        _job(self.user, seconds_ago=30, status=AnalysisJob.STATUS_RUNNING)
+
+        claimed = jobs.claim_next_job()
+        self.assertEqual(claimed.id, older.id)
+        self.assertEqual((claimed.status, claimed.attempts), (AnalysisJob.STATUS_RUNNING, 1))
+        self.assertIsNotNone(claimed.started_at)
+        self.assertEqual(claimed.heartbeat_at, claimed.started_at)
+
+        self.assertEqual(jobs.claim_next_job().id, newer.id)
+        self.assertIsNone(jobs.claim_next_job())
+
+    def test_requeues_jobs_whose_heartbeat_stopped(self):
+        long_ago = timezone.now() - timedelta(hours=2)
+        stopped = _job(self.user, status=AnalysisJob.STATUS_RUNNING, attempts=1, started_at=long_ago,
+                       heartbeat_at=timezone.now() - timedelta(seconds=301), partial_result={'confidence_score': 7})
+        legacy = _job(self.user, status=AnalysisJob.STATUS_RUNNING, attempts=1, started_at=long_ago)
+        alive = _job(self.user, status=AnalysisJob.STATUS_RUNNING, attempts=1, started_at=long_ago,
+                     heartbeat_at=timezone.now() - timedelta(seconds=30))
+
+        self.assertEqual(jobs.requeue_stale_jobs(), (2, 0))
+        stopped.refresh_from_db()
+        self.assertEqual(stopped.status, AnalysisJob.STATUS_QUEUED)
+        self.assertIsNone(stopped.partial_result)
+        legacy.refresh_from_db()
+        self.assertEqual(legacy.status, AnalysisJob.STATUS_QUEUED)
+        # Running for two hours is fine while the heartbeat is fresh
+        alive.refresh_from_db()
+        self.assertEqual(alive.status, AnalysisJob.STATUS_RUNNING)
+
+    def test_fails_stale_jobs_out_of_attempts(self):
+        stale = timezone.now() - timedelta(seconds=600)
+        job = _job(self.user, status=AnalysisJob.STATUS_RUNNING, attempts=3, started_at=stale, heartbeat_at=stale)
+
+        self.assertEqual(jobs.requeue_stale_jobs(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalysisJob.STATUS_FAILED)
+        self.assertEqual(job.error, 'Analysis worker stopped responding')
+        self.assertIsNotNone(job.finished_at)
+
+
+class JobHeartbeatTests(TransactionTestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create(uid='u1', email='jane@example.com', name='Jane Doe')
+
+    @override_settings(ANALYSIS_JOB_HEARTBEAT_SECONDS=0.05, ANALYSIS_JOB_STALE_SECONDS=0.3)
+    def test_long_running_job_is_not_requeued(self):
+        _job(self.user)
+        job = jobs.claim_next_job()
+        requeued = []
+
+        def analyze(*args, **kwargs):
+            for _ in range(4):
+                time.sleep(0.2)
+                requeued.append(jobs.requeue_stale_jobs())
+            return {'error': 'model unavailable'}
+
+        with mock.patch.object(jobs, 'analyze_interview_recording', analyze):
+            jobs.run_job(job)
+
+        self.assertEqual(requeued, [(0, 0)] * 4)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (AnalysisJob.STATUS_FAILED, 'model unavailable'))
+        self.assertGreater(job.heartbeat_at, job.started_at + timedelta(seconds=0.5))
+        self.assertFalse(any(thread.name.endswith('-heartbeat') for thread in threading.enumerate()))
+
+
+class ResumeCacheTests(TestCase):
+    def test_text_hash_ignores_whitespace(self):
+        self.assertEqual(resume_cache.hash_text('Jane  Doe\n\tPython '), resume_cache.hash_text('Jane Doe Python'))
+        self.assertNotEqual(resume_cache.hash_text('Jane Doe'), resume_cache.hash_text('Jane Dot'))
+
+    def test_lookup_hits_by_file_or_text(self):
+        resume_cache.store('file-1', 'text-1', RESUME, {'full_name': 'Jane Doe'})
+
+        entry = resume_cache.lookup_by_file('file-1')
+        self.assertEqual((entry.raw_text, entry.ai_data), (RESUME, {'full_name': 'Jane Doe'}))
+        self.assertEqual(resume_cache.lookup_by_text('text-1').id, entry.id)
+        self.assertIsNone(resume_cache.lookup_by_file('file-2'))
+        self.assertIsNone(resume_cache.lookup_by_text('text-2'))
+        entry.refresh_from_db()
+        self.assertEqual(entry.hit_count, 2)
+
+    def test_refresh_keeps_the_original_file_hash(self):
+        resume_cache.store('file-1', 'text-1', RESUME, None)
+        resume_cache.store('file-2', 'text-1', RESUME, {'full_name': 'Jane Doe'})
+
+        self.assertEqual(ResumeExtractionCache.objects.count(), 1)
+        self.assertEqual(resume_cache.lookup_by_file('file-1').ai_data, {'full_name': 'Jane Doe'})
+        self.assertIsNone(resume_cache.lookup_by_file('file-2'))
+
+    def test_entries_from_another_prompt_version_miss(self):
+        resume_cache.store('file-1', 'text-1', RESUME, {'full_name': 'Jane Doe'})
+        with mock.patch.object(resume_cache, 'RESUME_EXTRACTION_PROMPT_VERSION', 'next'):
+            self.assertIsNone(resume_cache.lookup_by_file('file-1'))
+            self.assertIsNone(resume_cache.lookup_by_text('text-1'))
+
+    @override_settings(RESUME_CACHE_MAX_ENTRIES=2)
+    def test_evicts_least_recently_used(self):
+        for n in range(3):
+            resume_cache.store(f'file-{n}', f'text-{n}', RESUME, {})
+            resume_cache.lookup_by_file('file-0')  # Keep the first entry in use
+
+        self.assertEqual(
+            sorted(ResumeExtractionCache.objects.values_list('file_hash', flat=True)), ['file-0', 'file-2']
+        )
+
+    def test_parse_resume_reuses_cached_extraction(self):
+        extract_fields = mock.Mock(side_effect=[({'full_name': 'Jane'}, False), ({'full_name': 'Jane Doe'}, True)])
+        with mock.patch.object(resume_parser, 'extract_text', return_value=RESUME) as extract_text, \
+                mock.patch.object(resume_parser, '_extract_fields', extract_fields):
+            # An incomplete extraction isn't cached, so the second upload asks again
+            for expected in ['Jane', 'Jane Doe', 'Jane Doe']:
+                parsed = resume_parser.parse_resume(io.BytesIO(b'%PDF resume'), 'resume.pdf')
+                self.assertEqual(parsed['full_name'], expected)
+            # Different bytes with the same text still skip the extraction
+            self.assertEqual(resume_parser.parse_resume(io.BytesIO(b'%PDF re-export'), 'resume.pdf')['full_name'],
+                             'Jane Doe')
+
+        self.assertEqual(extract_text.call_count, 2)  # The identical re-uploads reused the stored text
+        self.assertEqual(extract_fields.call_count, 2)
+
+
+def _gemini_file(state, name='files/answer'):
+    return SimpleNamespace(name=name, state=SimpleNamespace(name=state))
+
+
+@override_settings(GEMINI_FILE_POLL_MIN_SECONDS=0.01, GEMINI_FILE_POLL_MAX_SECONDS=0.04)
+class FilePollerTests(SimpleTestCase):
+    def _poll(self, *states):
+        """Patch genai.get_file to report the given states in turn (an exception is raised)"""
+        def get_file(name):
+            state = states[min(get_file.calls, len(states) - 1)]
+            get_file.calls += 1
+            if isinstance(state, Exception):
+                raise state
+            return _gemini_file(state, name)
+        get_file.calls = 0
+        patcher = mock.patch.object(file_poller.genai, 'get_file', get_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return get_file
+
+    def test_settled_files_are_not_polled(self):
+        get_file = self._poll('ACTIVE')
+        active = _gemini_file('ACTIVE')
+        self.assertIs(file_poller.await_active(active), active)
+        with self.assertRaisesMessage(file_poller.FileProcessingError, 'Video processing failed'):
+            file_poller.await_active(_gemini_file('FAILED'))
+        self.assertEqual(get_file.calls, 0)
+
+    def test_waiters_share_one_poll_until_active(self):
+        get_file = self._poll('PROCESSING', RuntimeError('503'), 'PROCESSING', 'ACTIVE')
+        first = file_poller.wait_for_active(_gemini_file('PROCESSING'), timeout=5)
+        second = file_poller.wait_for_active(_gemini_file('PROCESSING'), timeout=5)
+
+        self.assertIs(first, second)
+        self.assertEqual(first.result(timeout=5).state.name, 'ACTIVE')
+        self.assertEqual(get_file.calls, 4)  # The lookup error counted as one more PROCESSING poll
+        self.assertEqual(file_poller.pending_count(), 0)
+
+    def test_failed_processing_is_raised(self):
+        self._poll('PROCESSING', 'FAILED')
+        with self.assertRaisesMessage(file_poller.FileProcessingError, 'Video processing failed'):
+            file_poller.await_active(_gemini_file('PROCESSING'), timeout=5)
+
+    def test_times_out_at_the_deadline(self):
+        self._poll('PROCESSING')
+        started = time.monotonic()
+        with self.assertRaisesMessage(file_poller.FileProcessingError, 'Video processing timeout exceeded'):
+            file_poller.await_active(_gemini_file('PROCESSING'), timeout=0.2)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(file_poller.pending_count(), 0)
+
+    def test_poll_interval_backs_off_to_the_cap(self):
+        self._poll('PROCESSING')
+        pending = file_poller._Pending('files/answer', timeout=60)
+        intervals = []
+        for _ in range(4):
+            file_poller._check(pending)
+            intervals.append(pending.interval)
+        self.assertEqual(intervals, [0.02, 0.04, 0.04, 0.04])
+
+
+def _ebml(element_id, payload=b'', unknown_size=False):
+    """One EBML element; the size is written as a 1-byte or 8-byte vint"""
+    size = b'\x01\xff\xff\xff\xff\xff\xff\xff' if unknown_size else (
+        bytes([0x80 | len(payload)]) if len(payload) < 0x7F else b'\x01' + len(payload).to_bytes(7, 'big')
+    )
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, 'big') + size + payload
+
+
+def _webm(duration_ms=None, clusters=((0, [0, 40]),), block_bytes=10):
+    """WebM with a VP8 and an Opus track and SimpleBlocks at (timecode, [relative timecodes]) clusters"""
+    info = _ebml(media_probe.TIMECODE_SCALE, (1000000).to_bytes(3, 'big'))
+    if duration_ms is not None:
+        info += _ebml(media_probe.DURATION, struct.pack('>d', duration_ms))
+    video = _ebml(media_probe.TRACK_ENTRY, (
+        _ebml(media_probe.TRACK_TYPE, b'\x01') + _ebml(media_probe.CODEC_ID, b'V_VP8')
+        + _ebml(media_probe.VIDEO, _ebml(media_probe.PIXEL_WIDTH, (1280).to_bytes(2, 'big'))
+                + _ebml(media_probe.PIXEL_HEIGHT, (720).to_bytes(2, 'big')))
+    ))
+    audio = _ebml(media_probe.TRACK_ENTRY, (
+        _ebml(media_probe.TRACK_TYPE, b'\x02') + _ebml(media_probe.CODEC_ID, b'A_OPUS')
+        + _ebml(media_probe.AUDIO, _ebml(media_probe.SAMPLING_FREQUENCY, struct.pack('>f', 48000.0))
+                + _ebml(media_probe.CHANNELS, b'\x01'))
+    ))
+    body = _ebml(media_probe.INFO, info) + _ebml(media_probe.TRACKS, video + audio)
+    for timecode, blocks in clusters:
+        body += _ebml(media_probe.CLUSTER, _ebml(media_probe.CLUSTER_TIMECODE, timecode.to_bytes(2, 'big')) + b''.join(
+            _ebml(media_probe.SIMPLE_BLOCK, b'\x81' + struct.pack('>h', relative) + b'\x80' + b'\x00' * block_bytes)
+            for relative in blocks
+        ))
+    return _ebml(0x1A45DFA3, _ebml(media_probe.EBML_DOC_TYPE, b'webm')) + _ebml(media_probe.SEGMENT, body,
+                                                                               unknown_size=True)
+
+
+def _box(box_type, payload=b''):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def _mp4(mvhd_version=0):
+    if mvhd_version == 1:
+        mvhd = b'\x01' + b'\x00' * 19 + struct.pack('>IQ', 600, 600 * 90) + b'\x00' * 80
+    else:
+        mvhd = b'\x00' * 12 + struct.pack('>II', 1000, 61500) + b'\x00' * 80
+
+    def trak(handler, sample_entry):
+        stsd = _box(b'stsd', b'\x00' * 4 + struct.pack('>I', 1) + sample_entry)
+        return _box(b'trak', _box(b'tkhd', b'\x00' * 84) + _box(b'mdia', (
+            _box(b'hdlr', b'\x00' * 8 + handler + b'\x00' * 12)
+            + _box(b'minf', _box(b'stbl', stsd))
+        )))
+
+    video = struct.pack('>I4s', 86, b'avc1') + b'\x00' * 24 + struct.pack('>HH', 1280, 720) + b'\x00' * 50
+    audio = struct.pack('>I4s', 36, b'mp4a') + b'\x00' * 16 + struct.pack('>H', 2) + b'\x00' * 6 + struct.pack(
+        '>I', 44100 << 16)
+    moov = _box(b'moov', _box(b'mvhd', mvhd) + trak(b'vide', video) + trak(b'soun', audio))
+    return _box(b'ftyp', b'isom\x00\x00\x02\x00isomiso2mp41') + _box(b'mdat', b'\x00' * 1000) + moov
+
+
+class MediaProbeTests(SimpleTestCase):
+    def _probe(self, data):
+        return media_probe.probe_file(io.BytesIO(data), len(data))
+
+    def test_webm_header(self):
+        info = self._probe(_webm(duration_ms=12345.0))
+        self.assertEqual((info['format'], info['doc_type'], info['duration_seconds']), ('webm', 'webm', 12.345))
+        self.assertEqual(info['tracks'], [
+            {'type': 'video', 'codec': 'V_VP8', 'width': 1280, 'height': 720},
+            {'type': 'audio', 'codec': 'A_OPUS', 'sample_rate': 48000, 'channels': 1},
+        ])
+        self.assertTrue(info['has_video'] and info['has_audio'])
+        self.assertTrue(media_probe.matches_content_type(info, 'video/webm'))
+        self.assertFalse(media_probe.matches_content_type(info, 'video/mp4'))
+
+    def test_live_webm_duration_from_last_block(self):
+        # No Duration (MediaRecorder): the last cluster, past the 64 KB head, gives 5s + 980ms
+        data = _webm(clusters=[(0, [0, 40]), (5000, [0, 500, 980])], block_bytes=100 * 1024)
+        self.assertGreater(len(data), 3 * media_probe.HEAD_BYTES)
+        with tempfile.NamedTemporaryFile(suffix='.webm') as recording:
+            recording.write(data)
+            recording.flush()
+            self.assertEqual(media_probe.probe(recording.name)['duration_seconds'], 5.98)
+
+    def test_truncated_webm_keeps_what_was_read(self):
+        data = _webm(duration_ms=12345.0)
+        info = self._probe(data[:data.index(media_probe.TRACKS.to_bytes(4, 'big')) + 20])
+        self.assertEqual((info['format'], info['duration_seconds']), ('webm', 12.345))
+        self.assertEqual(info['tracks'], [])
+
+    def test_invalid_matroska_is_not_an_error(self):
+        info = self._probe(b'\x1a\x45\xdf\xa3' + b'\x00' * 100)
+        self.assertEqual(info['format'], 'matroska')
+        self.assertIsNone(info['duration_seconds'])
+        self.assertFalse(info['has_video'] or info['has_audio'])
+
+    def test_mp4_header(self):
+        info = self._probe(_mp4())
+        self.assertEqual((info['format'], info['duration_seconds']), ('mp4', 61.5))
+        self.assertEqual(info['tracks'], [
+            {'type': 'video', 'codec': 'avc1', 'width': 1280, 'height': 720},
+            {'type': 'audio', 'codec': 'mp4a', 'channels': 2, 'sample_rate': 44100},
+        ])
+        self.assertEqual(self._probe(_mp4(mvhd_version=1))['duration_seconds'], 90.0)
+        self.assertTrue(media_probe.matches_content_type(info, 'video/quicktime'))
+
+    def test_truncated_mp4_keeps_what_was_read(self):
+        data = _mp4()
+        info = self._probe(data[:data.index(b'soun') + 10])
+        self.assertEqual((info['format'], info['duration_seconds']), ('mp4', 61.5))
+        # The audio handler was read but its sample description was cut off
+        self.assertEqual(info['tracks'][0]['codec'], 'avc1')
+        self.assertEqual(info['tracks'][1], {'type': 'audio', 'codec': None})
+
+        info = self._probe(data[:data.index(b'moov') + 4])
+        self.assertEqual((info['format'], info['duration_seconds'], info['tracks']), ('mp4', None, []))
+
+    def test_unknown_bytes(self):
+        info = self._probe(b'<html>not a recording</html>')
+        self.assertEqual((info['format'], info['duration_seconds'], info['tracks']), (None, None, []))
+        self.assertFalse(media_probe.matches_content_type(info, 'video/webm'))
+        self.assertIsNone(self._probe(b'')['format'])
+
+
+INTEGRITY = {
+    'eye_movement_pattern': 'Mostly steady',
+    'attention_level': 'high',
+    'suspicion_risk': 'low',
+    'integrity_notes': 'No concerns',
+    'cheating_risk_score': 10,
+}
+
+
+class SchemaValidationTests(SimpleTestCase):
+    def test_integrity_levels_accept_the_enum(self):
+        for level in ['low', 'moderate', 'high']:
+            response = {**INTEGRITY, 'attention_level': level, 'suspicion_risk': level}
+            self.assertEqual(schemas.INTEGRITY_ANALYSIS.parse(json.dumps(response)), response)
+
+    def test_integrity_levels_reject_other_values(self):
+        for field in ['attention_level', 'suspicion_risk']:
+            for value in ['High', 'medium', '', 3]:
+                with self.subTest(field=field, value=value):
+                    with self.assertRaises(schemas.SchemaValidationError) as raised:
+                        schemas.INTEGRITY_ANALYSIS.parse(json.dumps({**INTEGRITY, field: value}))
+                    self.assertTrue(str(raised.exception).startswith(f'$.{field}: '))
+
+    def test_integrity_levels_are_required_and_not_nullable(self):
+        for field in ['attention_level', 'suspicion_risk']:
+            missing = {name: value for name, value in INTEGRITY.items() if name != field}
+            with self.assertRaisesMessage(schemas.SchemaValidationError, f'$.{field}: required'):
+                schemas.INTEGRITY_ANALYSIS.validate(missing)
+            with self.assertRaisesMessage(schemas.SchemaValidationError, f'$.{field}: must not be null'):
+                schemas.INTEGRITY_ANALYSIS.validate({**INTEGRITY, field: None})
+
+    def test_levels_are_sent_as_enum_in_the_response_schema(self):
+        properties = schemas.INTEGRITY_ANALYSIS.generation_config['response_schema']['properties']
+        self.assertEqual(properties['attention_level'], {'type': 'string', 'enum': ['low', 'moderate', 'high']})
+        self.assertEqual(properties['suspicion_risk'], properties['attention_level'])
+
+    def test_reports_the_offending_path(self):
+        with self.assertRaisesMessage(schemas.SchemaValidationError, '$[1].difficulty: '):
+            schemas.QUESTION_SET.validate([
+                {'question': 'What is a closure?', 'type': 'conceptual', 'difficulty': 'easy'},
+                {'question': 'Design a cache', 'type': 'scenario', 'difficulty': 'extreme'},
+            ])
+        with self.assertRaisesMessage(schemas.SchemaValidationError, '$.cheating_risk_score: expected integer, got bool'):
+            schemas.INTEGRITY_ANALYSIS.validate({**INTEGRITY, 'cheating_risk_score': True})
+        with self.assertRaisesMessage(schemas.SchemaValidationError, 'integrity_analysis: invalid JSON'):
+            schemas.INTEGRITY_ANALYSIS.parse('{"attention_level": "hi')
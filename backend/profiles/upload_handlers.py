@@ -0,0 +1,54 @@
+import hashlib
+import tempfile
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class ScratchUploadedFile(TemporaryUploadedFile):
+    """
+    A TemporaryUploadedFile created in ANALYSIS_SCRATCH_DIR, so the queue can
+    take it over with a rename instead of a copy. Like any temporary upload it
+    is deleted when the request ends unless it was moved away first.
+    """
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        scratch_dir = Path(settings.ANALYSIS_SCRATCH_DIR)
+        scratch_dir.mkdir(parents=True, exist_ok=True)
+        file = tempfile.NamedTemporaryFile(suffix='.upload' + Path(name).suffix, dir=scratch_dir)
+        UploadedFile.__init__(self, file, name, content_type, size, charset, content_type_extra)
+
+
+class ScratchFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream every uploaded file straight to the analysis scratch directory,
+    hashing it on the way so the finished file carries its SHA-256 (`sha256`)
+    """
+    def new_file(self, *args, **kwargs):
+        super(TemporaryFileUploadHandler, self).new_file(*args, **kwargs)
+        self.file = ScratchUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.sha256 = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.sha256.hexdigest()
+        return file
+
+
+def scratch_file_uploads(view):
+    """
+    Use ScratchFileUploadHandler for this view's uploads (including small files,
+    which would otherwise be held in memory). Must wrap the DRF view, since the
+    handlers have to be set before the request body is parsed.
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        request.upload_handlers = [ScratchFileUploadHandler(request)]
+        return view(request, *args, **kwargs)
+    return wrapped
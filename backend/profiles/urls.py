@@ -9,15 +9,19 @@ urlpatterns = [
     path('resume/', views.get_resume, name='get_resume'),
     path('recommendations/', views.get_recommendations, name='get_recommendations'),
     path('questions/generate/', views.generate_questions, name='generate_questions'),
+    path('questions/sets/<uuid:set_id>/', views.get_question_set, name='get_question_set'),
     
     # AI Interview endpoints
     path('interview/ai/question/', interview_views.generate_question, name='ai_generate_question'),
+    path('interview/ai/question/stream/', interview_views.generate_question_stream, name='ai_generate_question_stream'),
+    path('interview/ai/question/prefetch/', interview_views.prefetch_question, name='ai_prefetch_question'),
     path('interview/ai/analyze/', interview_views.analyze_response, name='ai_analyze_response'),
     path('interview/ai/transition/', interview_views.transition_round, name='ai_transition_round'),
     path('interview/ai/conclude/', interview_views.conclude_interview, name='ai_conclude_interview'),
     
     # Interview Analysis endpoints (POST-interview recording analysis)
     path('interview/ai/recording/analyze/', views.analyze_interview, name='analyze_interview_recording'),
+    path('interview/ai/recording/jobs/<int:job_id>/', views.get_analysis_job, name='get_analysis_job'),
     path('interview/ai/analysis/<int:analysis_id>/', views.get_interview_analysis, name='get_interview_analysis'),
     path('interview/ai/analyses/', views.get_user_interview_analyses, name='get_user_interview_analyses'),
 ]
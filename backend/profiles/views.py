@@ -2,15 +2,24 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from django.conf import settings
+from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from .models import UserProfile, ResumeData, InterviewAnalysis
+from django.views.decorators.http import require_GET, require_POST
+from .models import UserProfile, ResumeData, InterviewAnalysis, AnalysisJob, QuestionSet
 from .serializers import UserProfileSerializer, ResumeDataSerializer, InterviewAnalysisSerializer
 from .resume_parser import parse_resume
-from .gemini_analyzer import get_interview_recommendations, analyze_interview_recording
-from .question_generator import generate_interview_questions
+from .recommendations import aensure_recommendations, schedule_recommendations
+from .candidate_digest import aensure_digest, build_digest
+from .jobs import enqueue_recording_analysis, find_duplicate_job, probe_recording, recording_hash
+from . import media_probe
+from .question_sets import astart_question_set
+from .http_utils import blocking_view, parse_json_body
+from .upload_handlers import scratch_file_uploads
 import json
 
 
+@blocking_view
 @api_view(['POST'])
 @permission_classes([AllowAny])
 @csrf_exempt
@@ -42,6 +51,7 @@ def create_profile(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@blocking_view
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_profile(request):
@@ -69,6 +79,7 @@ def get_profile(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@blocking_view
 @api_view(['POST'])
 @permission_classes([AllowAny])
 @csrf_exempt
@@ -97,6 +108,10 @@ def upload_resume(request):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         uploaded_file = request.FILES['file']
+        if uploaded_file.size > settings.RESUME_MAX_BYTES:
+            return Response({
+                'error': f'Resume file is too large. The maximum is {settings.RESUME_MAX_BYTES // (1024 * 1024)} MB.'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         # Parse resume and extract all important data
         # We don't store the file, just the extracted information!
@@ -107,12 +122,18 @@ def upload_resume(request):
         print(f"Parsed email: {parsed_data.get('email')}")
         print(f"Skills count: {len(parsed_data.get('skills', []))}")
         
+        # Summarize once for the prompts and the profile API
+        parsed_data['digest'] = build_digest(parsed_data)
+        
         # Update or create resume data in SQLite
         resume_data, created = ResumeData.objects.update_or_create(
             user=user,
             defaults=parsed_data
         )
         
+        # Warm the recommendations so the setup page doesn't wait on Gemini
+        schedule_recommendations(resume_data)
+        
         serializer = ResumeDataSerializer(resume_data)
         
         return Response({
@@ -126,6 +147,7 @@ def upload_resume(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@blocking_view
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_resume(request):
@@ -157,102 +179,90 @@ def get_resume(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def get_recommendations(request):
-    """Get AI-powered interview recommendations based on resume data"""
+@require_GET
+async def get_recommendations(request):
+    """Get AI-powered interview recommendations based on resume data (async view)"""
     try:
         uid = request.GET.get('uid') or request.headers.get('X-User-UID')
         
         if not uid:
-            return Response({
+            return JsonResponse({
                 'error': 'UID is required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            user = UserProfile.objects.get(uid=uid)
-            resume_data = ResumeData.objects.get(user=user)
-            
-            # Convert resume data to dict for analysis
-            resume_dict = {
-                'full_name': resume_data.full_name,
-                'email': resume_data.email,
-                'skills': resume_data.skills,
-                'experience': resume_data.experience,
-                'education': resume_data.education,
-                'projects': resume_data.projects,
-                'certifications': resume_data.certifications,
-                'years_of_experience': resume_data.years_of_experience,
-                'key_strengths': resume_data.key_strengths,
-            }
-            
-            # Get AI recommendations
-            recommendations = get_interview_recommendations(resume_dict)
+            # Single indexed read; recommendations are kept up to date with the resume digest
+            resume_data = await ResumeData.objects.defer('raw_text').aget(user_id=uid)
+            recommendations = await aensure_recommendations(resume_data)
+            digest = resume_data.digest
             
-            return Response({
+            return JsonResponse({
                 'recommendations': recommendations,
                 'resume_summary': {
-                    'name': resume_data.full_name,
-                    'years_experience': resume_data.years_of_experience,
-                    'skills_count': len(resume_data.skills),
-                    'projects_count': len(resume_data.projects),
-                    'key_strengths': resume_data.key_strengths
+                    'name': digest['name'],
+                    'years_experience': digest['years_of_experience'],
+                    'skills_count': digest['skill_count'],
+                    'projects_count': digest['project_count'],
+                    'key_strengths': digest['key_strengths']
                 }
             }, status=status.HTTP_200_OK)
             
-        except UserProfile.DoesNotExist:
-            return Response({
-                'error': 'User profile not found'
-            }, status=status.HTTP_404_NOT_FOUND)
         except ResumeData.DoesNotExist:
-            return Response({
+            if not await UserProfile.objects.filter(uid=uid).aexists():
+                return JsonResponse({
+                    'error': 'User profile not found'
+                }, status=status.HTTP_404_NOT_FOUND)
+            return JsonResponse({
                 'error': 'Resume not found. Please upload your resume first.'
             }, status=status.HTTP_404_NOT_FOUND)
             
     except Exception as e:
-        return Response({
+        return JsonResponse({
             'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
+
 @csrf_exempt
-def generate_questions(request):
-    """Generate interview questions based on configuration and resume"""
+@require_POST
+async def generate_questions(request):
+    """
+    Generate interview questions based on configuration and resume (async view).
+    Returns as soon as the first questions are ready; while `status` is
+    'generating', the rest are fetched from get_question_set.
+    """
     try:
-        data = request.data
+        try:
+            data = parse_json_body(request)
+        except ValueError:
+            return JsonResponse({
+                'error': 'Invalid JSON'
+            }, status=status.HTTP_400_BAD_REQUEST)
         uid = data.get('uid')
         goal = data.get('goal')  # full, focused, quick
         target_level = data.get('level')  # entry, mid, etc.
         domain = data.get('domain')  # dsa, web, ml, core
         
         if not all([uid, goal, target_level, domain]):
-            return Response({
+            return JsonResponse({
                 'error': 'Missing required parameters (uid, goal, level, domain)'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get user's resume data for personalization
-        resume_dict = None
+        # Get user's candidate digest for personalization
+        digest = None
         try:
-            user = UserProfile.objects.get(uid=uid)
-            resume_data = ResumeData.objects.get(user=user)
-            
-            resume_dict = {
-                'full_name': resume_data.full_name,
-                'years_of_experience': resume_data.years_of_experience,
-                'skills': resume_data.skills,
-                'key_strengths': resume_data.key_strengths,
-                'projects': resume_data.projects,
-            }
-        except (UserProfile.DoesNotExist, ResumeData.DoesNotExist):
+            resume_data = await ResumeData.objects.defer('raw_text').aget(user_id=uid)
+            digest = await aensure_digest(resume_data)
+        except ResumeData.DoesNotExist:
             print("No resume data found, generating generic questions")
         
-        # Generate questions using AI
-        questions = generate_interview_questions(goal, target_level, domain, resume_dict)
+        # Generate questions using AI, returning the first ones while the rest stream in
+        question_set, questions = await astart_question_set(uid, goal, target_level, domain, digest)
         
-        return Response({
+        return JsonResponse({
+            'question_set_id': str(question_set.id),
+            'status': QuestionSet.STATUS_DONE if len(questions) >= question_set.total else QuestionSet.STATUS_GENERATING,
             'questions': questions,
-            'total': len(questions),
+            'total': question_set.total,
             'config': {
                 'goal': goal,
                 'level': target_level,
@@ -264,20 +274,22 @@ def generate_questions(request):
         print(f"Error generating questions: {e}")
         import traceback
         traceback.print_exc()
-        return Response({
+        return JsonResponse({
             'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@blocking_view
+@scratch_file_uploads
 @api_view(['POST'])
 @permission_classes([AllowAny])
 @csrf_exempt
 def analyze_interview(request):
     """
-    POST /api/interview/analyze/
+    POST /api/interview/ai/recording/analyze/
     
-    Analyzes an uploaded interview recording (video/audio) using Gemini AI.
-    Generates:
+    Queues an uploaded interview recording (video/audio) for analysis with Gemini AI.
+    The `run_analysis_worker` process picks it up and generates:
     1. Personal performance analysis (emotion, confidence, communication)
     2. Integrity/behavioral indicators (eye movement, attention, risk assessment)
     3. Relative ranking among participants
@@ -286,10 +298,18 @@ def analyze_interview(request):
         - uid: Firebase user ID (query param or header X-User-UID)
         - recording: Video/audio file upload
         - participant_count: Number of participants in recording (optional, default: 1)
+        - analysis_mode: 'full' (default) or 'audio'. Audio mode sends only the
+          audio track to the model and fills the speech/communication fields;
+          integrity and eye-movement fields are left unassessed. Recordings
+          without a video track are always analyzed in audio mode.
+    
+    Response (202):
+        - job_id: ID of the queued job; poll /api/interview/ai/recording/jobs/<job_id>/
+        - status: 'queued'
     
-    Response:
-        - analysis: Complete analysis object
-        - analysis_id: ID of saved analysis record
+    Response (200), when the same recording was already submitted by this user:
+        - job_id, status, analysis_id of that earlier job
+        - deduplicated: true
     """
     try:
         # Get user UID from request
@@ -323,101 +343,160 @@ def analyze_interview(request):
                 'error': f'Invalid file type: {recording_file.content_type}. Allowed: video (mp4, webm, avi) or audio (mp3, wav, mpeg).'
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        # Check the file really is that kind of recording, and how long it is,
+        # from its container header before spending any upload or model time
+        media_info = probe_recording(recording_file)
+        if not media_probe.matches_content_type(media_info, recording_file.content_type):
+            return Response({
+                'error': f'File content does not match its type ({recording_file.content_type}). Please upload a valid video or audio recording.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        duration = media_info['duration_seconds']
+        if duration and duration > settings.ANALYSIS_MAX_RECORDING_SECONDS:
+            return Response({
+                'error': f'Recording is {duration / 60:.0f} minutes long. The maximum is {settings.ANALYSIS_MAX_RECORDING_SECONDS // 60} minutes.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
         # Get participant count (default to 1 for solo interview)
         participant_count = int(request.data.get('participant_count', 1))
         if participant_count < 1:
             participant_count = 1
         
-        print(f"🎬 Analyzing interview for user: {user.name} ({user.email})")
-        print(f"   File: {recording_file.name} ({recording_file.size} bytes)")
-        print(f"   Participants: {participant_count}")
-        
-        # Analyze recording using Gemini AI
-        analysis_result = analyze_interview_recording(recording_file, participant_count)
+        # Video analysis (integrity, eye movement) only when asked for and possible
+        analysis_mode = request.data.get('analysis_mode') or AnalysisJob.MODE_FULL
+        if analysis_mode not in dict(AnalysisJob.MODE_CHOICES):
+            return Response({
+                'error': f"Invalid analysis_mode: {analysis_mode}. Allowed: 'full' or 'audio'."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if media_info['tracks'] and not media_info['has_video']:
+            analysis_mode = AnalysisJob.MODE_AUDIO
         
-        # Check for errors in analysis
-        if 'error' in analysis_result:
+        print(f"🎬 Queueing interview analysis for user: {user.name} ({user.email})")
+        print(f"   File: {recording_file.name} ({recording_file.size} bytes)")
+        print(f"   Participants: {participant_count}, mode: {analysis_mode}")
+        print(f"   Format: {media_info['format']}, duration: {duration if duration is not None else 'unknown'}s")
+        
+        # Same recording submitted again (or a client retry): reuse that job
+        content_hash = recording_hash(recording_file)
+        duplicate = find_duplicate_job(user, content_hash, participant_count, analysis_mode)
+        if duplicate:
+            print(f"♻️  Identical recording already submitted as job {duplicate.id} ({duplicate.status})")
             return Response({
-                'error': analysis_result['error']
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                'message': 'Interview recording already submitted for analysis',
+                'job_id': duplicate.id,
+                'status': duplicate.status,
+                'analysis_id': duplicate.analysis_id,
+                'deduplicated': True,
+            }, status=status.HTTP_200_OK)
         
-        # New format: flat JSON with all fields directly
-        # Save analysis to database
-        interview_analysis = InterviewAnalysis.objects.create(
-            user=user,
-            recording_filename=recording_file.name,
-            recording_duration_seconds=0,  # Could extract from file metadata if needed
-            
-            # Map new fields to old model fields
-            emotion_trend=analysis_result.get('emotion_trend', ''),
-            confidence_score=analysis_result.get('confidence_score', 0),
-            communication_analysis=analysis_result.get('communication_analysis', ''),
-            strengths=analysis_result.get('strengths', []),
-            improvements=analysis_result.get('improvements', []),
-            
-            # Integrity analysis
-            eye_movement_pattern=analysis_result.get('eye_movement_pattern', ''),
-            attention_level=analysis_result.get('attention_level', ''),
-            suspicion_risk=analysis_result.get('suspicion_risk', ''),
-            integrity_notes=analysis_result.get('integrity_notes', ''),
-            
-            # Ranking
-            ranking_position=analysis_result.get('ranking_position', 1),
-            total_participants=analysis_result.get('total_participants', participant_count),
-            percentile_band=analysis_result.get('percentile_band', ''),
-            
-            # Store FULL raw response - this includes all the new detailed fields
-            raw_ai_response=analysis_result
+        # Hand the recording to the analysis worker instead of blocking this request
+        job = enqueue_recording_analysis(
+            user, recording_file, participant_count, content_hash, media_info, analysis_mode
         )
         
-        # Return serialized data including raw_ai_response
-        serializer = InterviewAnalysisSerializer(interview_analysis)
-        response_data = serializer.data
-        
-        # Merge raw_ai_response fields into the top level for easy frontend access
-        if interview_analysis.raw_ai_response:
-            response_data.update(interview_analysis.raw_ai_response)
-        
-        print(f"✅ Analysis saved with ID: {interview_analysis.id}")
-        print(f"   Confidence: {interview_analysis.confidence_score}/100")
-        print(f"   Suspicion Risk: {interview_analysis.suspicion_risk}")
-        print(f"   Ranking: {interview_analysis.ranking_position}/{interview_analysis.total_participants}")
+        print(f"✅ Queued analysis job {job.id}")
         
         return Response({
-            'message': 'Interview analysis completed successfully',
-            'analysis_id': interview_analysis.id,
-            'analysis': {
-                'personal_report': {
-                    'emotion_trend': interview_analysis.emotion_trend,
-                    'confidence_score': interview_analysis.confidence_score,
-                    'communication': interview_analysis.communication_analysis,
-                    'strengths': interview_analysis.strengths,
-                    'improvements': interview_analysis.improvements
-                },
-                'integrity_analysis': {
-                    'eye_movement': interview_analysis.eye_movement_pattern,
-                    'attention_level': interview_analysis.attention_level,
-                    'suspicion_risk': interview_analysis.suspicion_risk,
-                    'notes': interview_analysis.integrity_notes
-                },
-                'ranking': {
-                    'position': interview_analysis.ranking_position,
-                    'total_participants': interview_analysis.total_participants,
-                    'percentile': interview_analysis.percentile_band
-                },
-                'disclaimer': analysis_result.get('disclaimer', 'Behavioral insights only. Not a hiring decision.')
-            }
-        }, status=status.HTTP_201_CREATED)
+            'message': 'Interview recording queued for analysis',
+            'job_id': job.id,
+            'status': job.status,
+            'analysis_mode': job.analysis_mode,
+        }, status=status.HTTP_202_ACCEPTED)
         
     except Exception as e:
         print(f"❌ Error in analyze_interview endpoint: {e}")
         import traceback
         traceback.print_exc()
         return Response({
-            'error': f'Failed to analyze interview: {str(e)}'
+            'error': f'Failed to queue interview analysis: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@blocking_view
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_question_set(request, set_id):
+    """
+    GET /api/questions/sets/<set_id>/?after=<n>
+    
+    Report a question set started by generate_questions: the questions ready
+    so far (from position `after`, default 0) and whether more are coming
+    (status 'generating') or the set is complete ('done').
+    """
+    try:
+        question_set = QuestionSet.objects.get(id=set_id)
+        after = max(int(request.GET.get('after', 0)), 0)
+        
+        return Response({
+            'question_set_id': str(question_set.id),
+            'status': question_set.status,
+            'total': question_set.total,
+            'ready': len(question_set.questions),
+            'questions': question_set.questions[after:],
+            'config': {
+                'goal': question_set.goal,
+                'level': question_set.level,
+                'domain': question_set.domain
+            }
+        }, status=status.HTTP_200_OK)
+    except QuestionSet.DoesNotExist:
+        return Response({
+            'error': 'Question set not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    except ValueError:
+        return Response({
+            'error': 'after must be an integer'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@blocking_view
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_analysis_job(request, job_id):
+    """
+    GET /api/interview/ai/recording/jobs/<job_id>/
+    
+    Report the status of a queued recording analysis: queued, running, done or failed.
+    While running, partial_result holds the analysis fields generated so far
+    (e.g. confidence_score before the technical feedback is written).
+    Once done, the saved analysis is included (same shape as get_interview_analysis).
+    """
+    try:
+        job = AnalysisJob.objects.select_related('analysis').get(id=job_id)
+        
+        response_data = {
+            'job_id': job.id,
+            'status': job.status,
+            'analysis_mode': job.analysis_mode,
+            'analysis_id': job.analysis_id,
+            'error': job.error,
+            'created_at': job.created_at,
+            'started_at': job.started_at,
+            'finished_at': job.finished_at,
+        }
+        
+        if job.status == AnalysisJob.STATUS_RUNNING:
+            response_data['partial_result'] = job.partial_result or {}
+        
+        if job.status == AnalysisJob.STATUS_DONE and job.analysis:
+            response_data['analysis'] = InterviewAnalysisSerializer(job.analysis).data
+        
+        return Response(response_data, status=status.HTTP_200_OK)
+    except AnalysisJob.DoesNotExist:
+        return Response({
+            'error': 'Analysis job not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({
+            'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@blocking_view
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_interview_analysis(request, analysis_id):
@@ -442,6 +521,7 @@ def get_interview_analysis(request, analysis_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@blocking_view
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_user_interview_analyses(request):
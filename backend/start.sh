@@ -0,0 +1,13 @@
+#!/usr/bin/env bash
+set -o errexit
+
+# Serve the ASGI app so the async LLM views can keep many requests in flight
+# per worker. The sync DRF views are wrapped in http_utils.blocking_view so they
+# run on the worker's thread pool rather than Django's single sync thread. Use
+# this as the web start command; the recording analysis worker runs separately
+# with `python manage.py run_analysis_worker`.
+exec gunicorn backend.asgi:application \
+    --worker-class uvicorn_worker.UvicornWorker \
+    --workers "${WEB_CONCURRENCY:-2}" \
+    --bind "0.0.0.0:${PORT:-8000}" \
+    --timeout 120
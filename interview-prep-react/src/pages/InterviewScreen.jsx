@@ -34,10 +34,12 @@ export default function InterviewScreen() {
   const speechSynthesisRef = useRef(null)
   const recognitionRef = useRef(null)
   const silenceTimerRef = useRef(null)
+  const prefetchTimerRef = useRef(null)
   const isProcessingRef = useRef(false)
   const currentUtteranceRef = useRef(null)
   const isRecognitionActiveRef = useRef(false) // Track if recognition is running
   const shouldStopRecognitionRef = useRef(false) // Flag to stop all restarts
+  const interviewSessionIdRef = useRef(crypto.randomUUID()) // Keys pre-generated questions on the server
   
   // Camera consent & calibration states
   const [showCameraConsent, setShowCameraConsent] = useState(true)
@@ -96,14 +98,25 @@ export default function InterviewScreen() {
           setTranscript(prev => prev + final)
           setInterimTranscript('')
           
-          // Clear any existing silence timer
+          // Clear any existing silence and prefetch timers
           if (silenceTimerRef.current) {
             clearTimeout(silenceTimerRef.current)
           }
+          if (prefetchTimerRef.current) {
+            clearTimeout(prefetchTimerRef.current)
+          }
+          
+          // Once the user pauses, let the server start on the follow-up while
+          // we wait for silence (one LLM call per pause, not per sentence)
+          const fullTranscript = transcript + final
+          prefetchTimerRef.current = setTimeout(() => {
+            if (fullTranscript.trim() && !isProcessingRef.current) {
+              prefetchNextQuestion(fullTranscript.trim())
+            }
+          }, 1000)
           
           // Set a timer to detect end of speech (2 seconds of silence)
           silenceTimerRef.current = setTimeout(() => {
-            const fullTranscript = transcript + final
             if (fullTranscript.trim() && !isProcessingRef.current) {
               handleAutoSend(fullTranscript.trim())
             }
@@ -236,6 +249,10 @@ export default function InterviewScreen() {
   }, [isSpeaking, isConversationMode, showCameraConsent])
 
   
+  // Technical questions generated for this interview at setup; the rest of the
+  // set may still be filling in on the server when the interview starts
+  const generatedQuestions = (config?.questions || []).map(q => q.question).filter(Boolean)
+
   // Interview rounds - system-controlled
   const interviewRounds = [
     {
@@ -256,7 +273,7 @@ export default function InterviewScreen() {
     },
     {
       name: 'CS Fundamentals',
-      questions: [
+      questions: generatedQuestions.length ? generatedQuestions : [
         "Let's discuss some computer science fundamentals. What are the differences between a stack and a queue?",
         "Explain how hash tables work and their time complexity.",
         "What is the difference between process and thread?"
@@ -326,6 +343,49 @@ export default function InterviewScreen() {
     }
   }, [navigate])
 
+  // Fetch the rest of the generated question set until the server has completed it
+  useEffect(() => {
+    const setId = config?.question_set_id
+    if (!setId || config.question_set_status === 'done') return
+    
+    let questions = config.questions || []
+    let cancelled = false
+    let timer = null
+    
+    const poll = async () => {
+      try {
+        const response = await fetch(`${API_URL}/questions/sets/${setId}/?after=${questions.length}`)
+        if (response.status === 404) return
+        if (!response.ok) throw new Error(`Question set fetch failed (${response.status})`)
+        const data = await response.json()
+        if (cancelled) return
+        
+        if (data.questions.length || data.status === 'done') {
+          questions = [...questions, ...data.questions]
+          setConfig(prev => {
+            const updated = { ...prev, questions, question_set_status: data.status }
+            localStorage.setItem('interviewConfig', JSON.stringify(updated))
+            return updated
+          })
+        }
+        if (data.status !== 'done') {
+          timer = setTimeout(poll, 2000)
+        }
+      } catch (error) {
+        console.warn('Question set fetch failed:', error)
+        if (!cancelled) {
+          timer = setTimeout(poll, 5000)
+        }
+      }
+    }
+    
+    poll()
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
+    }
+  }, [config?.question_set_id])
+
   // Camera permission and calibration
   const requestCameraAccess = async () => {
     try {
@@ -497,11 +557,40 @@ export default function InterviewScreen() {
         throw new Error(errorMsg)
       }
 
-      const data = await response.json()
+      const { job_id: jobId } = await response.json()
+      console.log(`⏳ Analysis queued as job ${jobId}`)
+
+      // The backend analyzes in a worker process - poll the job until it finishes
+      let job = null
+      while (true) {
+        await new Promise(resolve => setTimeout(resolve, 3000))
+        const jobResponse = await fetch(`${API_URL}/interview/ai/recording/jobs/${jobId}/`)
+        job = await jobResponse.json()
+
+        if (!jobResponse.ok || job.status === 'failed') {
+          const errorMsg = job.error || 'Analysis failed'
+          if (errorMsg.includes('quota') || errorMsg.includes('429')) {
+            throw new Error('QUOTA_EXCEEDED: Gemini API daily quota reached. Please try again tomorrow or upgrade your API plan.')
+          }
+          throw new Error(errorMsg)
+        }
+        if (job.status === 'done') break
+
+        // Fields arrive one by one while the model is still generating
+        const partialFields = Object.keys(job.partial_result || {})
+        if (partialFields.length) {
+          console.log(`📝 ${partialFields.length} analysis fields ready:`, partialFields.join(', '))
+          if (job.partial_result.confidence_score !== undefined) {
+            console.log(`   Confidence score: ${job.partial_result.confidence_score}`)
+          }
+        }
+        setUploadProgress(job.status === 'running' ? Math.min(99, 90 + Math.floor(partialFields.length / 4)) : 85)
+      }
+
       setUploadProgress(100)
-      
-      console.log('✅ Analysis complete:', data)
-      return data.analysis_id
+
+      console.log('✅ Analysis complete:', job)
+      return job.analysis_id
     } catch (error) {
       console.error('❌ Failed to upload recording:', error)
       
@@ -637,30 +726,19 @@ export default function InterviewScreen() {
     
     addUserMessage(text)
     
-    // Add thinking delay for realism (1.5-3 seconds)
-    const thinkingDelay = 1500 + Math.random() * 1500
-    await new Promise(resolve => setTimeout(resolve, thinkingDelay))
-    
     try {
       const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api'
-      const response = await fetch(`${API_URL}/interview/ai/question/`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          conversation_history: chatMessages,
-          user_profile: config,
-          current_round: interviewRounds[currentRound].name,
-          previous_answer: text
-        })
+      const data = await streamAIQuestion(API_URL, {
+        session_id: interviewSessionIdRef.current,
+        conversation_history: chatMessages,
+        user_profile: config,
+        current_round: interviewRounds[currentRound].name,
+        previous_answer: text
       })
       
-      const data = await response.json()
-      
-      if (data.success && data.question) {
-        // Natural pause before asking next question
-        await new Promise(resolve => setTimeout(resolve, 1000))
+      if (data.streamed) {
+        finalizeStreamingAIMessage(data.question)
+      } else if (data.success && data.question) {
         addAIMessage(data.question)
       } else {
         // Fallback to predefined questions
@@ -676,6 +754,82 @@ export default function InterviewScreen() {
     }
   }
   
+  // Speculatively generate the follow-up to the answer so far; served by the
+  // question endpoint if the final answer matches. Fire and forget.
+  const prefetchNextQuestion = (partialAnswer) => {
+    fetch(`${API_URL}/interview/ai/question/prefetch/`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        session_id: interviewSessionIdRef.current,
+        conversation_history: chatMessages,
+        user_profile: config,
+        current_round: interviewRounds[currentRound].name,
+        partial_answer: partialAnswer
+      })
+    }).catch(error => console.warn('Question prefetch failed:', error))
+  }
+  
+  // Stream the next question over Server-Sent Events so it starts appearing
+  // as soon as the first tokens arrive. Resolves with the final question event.
+  const streamAIQuestion = async (API_URL, body) => {
+    const response = await fetch(`${API_URL}/interview/ai/question/stream/`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify(body)
+    })
+    
+    if (!response.ok || !response.body) {
+      throw new Error(`Question stream failed (${response.status})`)
+    }
+    
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    let streamedText = ''
+    let result = {}
+    
+    while (true) {
+      const { value, done } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+      
+      // SSE events are separated by a blank line
+      const events = buffer.split('\n\n')
+      buffer = events.pop()
+      
+      for (const rawEvent of events) {
+        const lines = rawEvent.split('\n')
+        const event = lines.find(line => line.startsWith('event: '))?.slice(7)
+        const data = lines.find(line => line.startsWith('data: '))?.slice(6)
+        if (!data) continue
+        
+        const payload = JSON.parse(data)
+        if (event === 'token') {
+          const isFirstToken = !streamedText
+          streamedText += payload.text
+          if (isFirstToken) {
+            addStreamingAIMessage(streamedText)
+          } else {
+            updateStreamingAIMessage(streamedText)
+          }
+        } else if (event === 'question') {
+          result = payload
+        }
+      }
+    }
+    
+    return {
+      ...result,
+      question: result.question || streamedText.trim(),
+      streamed: Boolean(streamedText)
+    }
+  }
+  
   // Fallback static question flow
   const handleStaticQuestionFlow = () => {
     const currentRoundData = interviewRounds[currentRound]
@@ -718,6 +872,31 @@ export default function InterviewScreen() {
     speakText(message)
   }
 
+  // Streamed AI message: shown as tokens arrive, spoken once complete
+  const addStreamingAIMessage = (message) => {
+    setChatMessages(prev => [...prev, {
+      type: 'ai',
+      message,
+      streaming: true,
+      timestamp: new Date().toISOString()
+    }])
+  }
+
+  const updateStreamingAIMessage = (message) => {
+    setChatMessages(prev => prev.map((msg, idx) =>
+      idx === prev.length - 1 && msg.streaming ? { ...msg, message } : msg
+    ))
+  }
+
+  const finalizeStreamingAIMessage = (message) => {
+    setChatMessages(prev => prev.map((msg, idx) =>
+      idx === prev.length - 1 && msg.streaming ? { ...msg, message, streaming: false } : msg
+    ))
+    
+    // Speak the AI message
+    speakText(message)
+  }
+
   const addUserMessage = (message) => {
     setChatMessages(prev => [...prev, {
       type: 'user',
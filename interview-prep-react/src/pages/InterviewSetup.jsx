@@ -155,6 +155,8 @@ export default function InterviewSetup() {
 
       const interviewConfig = {
         ...config,
+        question_set_id: response.data.question_set_id, // InterviewScreen fetches the rest of the set
+        question_set_status: response.data.status,
         questions: response.data.questions,
         total_questions: response.data.total,
         createdAt: new Date().toISOString()